@@ -4,12 +4,16 @@ This admin associated with its respective User model.
 """
 from django.contrib import admin
 from account.models import User
+from galleria.admin import LargeTableAdmin
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     """
-    Class UserAdmin display all the fields of User model in panel
+    Class UserAdmin display all the fields of User model in panel,
+    searched by the unique username and email
     """
     list_display = ('id', 'first_name', 'last_name', 'username', 'email', 'contact',
-                    'password', 'token', 'created_at', 'updated_at')
+                    'password', 'token', 'media_count', 'storage_bytes', 'created_at', 'updated_at')
+    list_only = list_display
+    search_fields = ('=id', '=username', '=email')
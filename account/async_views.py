@@ -0,0 +1,164 @@
+"""
+async views for Signup, Signin, EmailValidator and UsernameValidator
+
+These views run on the event loop when the project is served through ASGI.
+Database access goes through the async ORM and password hashing runs in the
+hashing pool, so a worker keeps serving other requests while they wait.
+"""
+import json
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from .hashing import arun, aauthenticate_user, HashingPoolSaturated
+from .membership import username_index, email_index
+from .messages import SIGNIN_VALIDATION_ERROR, EMAIL_VALIDATOR_VALIDATION_ERROR, \
+    USERNAME_VALIDATOR_VALIDATION_ERROR, BULK_SIGNUP_VALIDATION_ERROR
+from .models import User
+from .serializers import SignupSerializer, SigninSerializer, EmailValidatorSerializer, UsernameValidatorSerializer
+from .tokens import apersist_token
+
+
+class AsyncSigninSerializer(SigninSerializer):
+    """
+    field checks of SigninSerializer, the credentials are checked by the view
+    """
+
+    def validate(self, data):
+        return data
+
+
+class AsyncEmailValidatorSerializer(EmailValidatorSerializer):
+    """
+    field checks of EmailValidatorSerializer, the existence check is awaited by the view
+    """
+
+    @staticmethod
+    def validate_email(value):
+        return value
+
+
+class AsyncUsernameValidatorSerializer(UsernameValidatorSerializer):
+    """
+    field checks of UsernameValidatorSerializer, the existence check is awaited by the view
+    """
+
+    @staticmethod
+    def validate_username(value):
+        return value
+
+
+class AsyncAPIView(View):
+    """
+    Base class of the async views, answering JSON.
+    Like DRF views they are exempt from CSRF, they do not use session authentication.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    @staticmethod
+    def get_data(request):
+        """
+        request body as a dict, from JSON or form data
+        """
+        if request.content_type == 'application/json':
+            try:
+                return json.loads(request.body or b'{}')
+            except ValueError:
+                return {}
+        return request.POST
+
+    @staticmethod
+    def throttled(error):
+        response = JsonResponse({'detail': str(error.detail)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(error.wait)
+        return response
+
+
+class AsyncSignupView(AsyncAPIView):
+    """
+    AsyncSignupView class to register a new user
+    """
+    http_method_names = ['post']
+
+    async def post(self, request):
+        """
+        creates a new requested user
+        """
+        serializer = SignupSerializer(data=self.get_data(request))
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = dict(serializer.validated_data)
+        try:
+            data['password'] = await arun(make_password, data['password'])
+        except HashingPoolSaturated as error:
+            return self.throttled(error)
+        try:
+            await User.objects.acreate(**data)
+        except IntegrityError:
+            return JsonResponse({'non_field_errors': [BULK_SIGNUP_VALIDATION_ERROR['exits']]},
+                                status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class AsyncSigninView(AsyncAPIView):
+    """
+    AsyncSigninView class to provide the access and refresh token of a user
+    """
+    http_method_names = ['post']
+
+    async def post(self, request):
+        serializer = AsyncSigninSerializer(data=self.get_data(request))
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            user = await aauthenticate_user(serializer.validated_data['username'],
+                                            serializer.validated_data['password'])
+        except HashingPoolSaturated as error:
+            return self.throttled(error)
+        if not user:
+            return JsonResponse({'non_field_errors': [SIGNIN_VALIDATION_ERROR['invalid credentials']]},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        refresh = RefreshToken.for_user(user)
+        access = str(refresh.access_token)
+        await apersist_token(user, access)
+        return JsonResponse({'access': access, 'refresh': str(refresh)}, status=status.HTTP_201_CREATED)
+
+
+class AsyncEmailValidatorView(AsyncAPIView):
+    """
+    AsyncEmailValidatorView class to Validate email at runtime, `?email=`
+    """
+    http_method_names = ['get']
+
+    async def get(self, request):
+        serializer = AsyncEmailValidatorSerializer(data=request.GET)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if await email_index.aexists(serializer.validated_data['email']):
+            return JsonResponse({'email': [EMAIL_VALIDATOR_VALIDATION_ERROR['email']['exits']]},
+                                status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class AsyncUsernameValidatorView(AsyncAPIView):
+    """
+    AsyncUsernameValidatorView class to Validate username at runtime, `?username=`
+    """
+    http_method_names = ['get']
+
+    async def get(self, request):
+        serializer = AsyncUsernameValidatorSerializer(data=request.GET)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if await username_index.aexists(serializer.validated_data['username']):
+            return JsonResponse({'username': [USERNAME_VALIDATOR_VALIDATION_ERROR['username']['exits']]},
+                                status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(serializer.validated_data, status=status.HTTP_200_OK)
@@ -0,0 +1,48 @@
+"""
+This module defines `CachedJWTAuthentication`, the JWT authentication of the API.
+
+simplejwt loads the User row of the token on every request. Here the users are kept in
+an in-process LRU for AUTH_USER_CACHE['ttl'] seconds, so read traffic is authenticated
+without a query. Saving or deleting a user evicts it from the cache of the worker doing it.
+
+The cache is not shared, so a change is seen late by the other workers, and by every worker
+when it is made with QuerySet.update(), which sends no signal, e.g. deactivating users in bulk.
+Entries expire AUTH_USER_CACHE['ttl'] seconds after they were loaded whatever their use, so
+a deactivated or deleted user is refused by every worker at most that long after the change.
+"""
+import copy
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .caching import LRUCache
+from .constants import AUTH_USER_CACHE
+
+user_cache = LRUCache(AUTH_USER_CACHE['size'], AUTH_USER_CACHE['ttl'])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the user id claim through `user_cache`
+    """
+
+    def get_user(self, validated_token):
+        """
+        user of the token, from the cache when it was resolved in the last AUTH_USER_CACHE['ttl'] seconds
+        """
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            # the revocation claim is checked against the password hash of the row
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        # every request gets its own instance, views may change request.user
+        return copy.copy(user)
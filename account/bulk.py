@@ -0,0 +1,131 @@
+"""
+This module creates users in batches for the import_users command and the BulkSignup API.
+
+Rows are validated in one pass, passwords are hashed in a process pool and users are
+inserted with bulk_create, one transaction per chunk. Invalid rows are reported
+with their index and do not stop the other rows.
+"""
+from django.db import transaction, DatabaseError, IntegrityError
+from .constants import BULK_SIGNUP
+from .hashing import hash_passwords
+from .membership import username_index, email_index
+from .messages import SIGNUP_VALIDATION_ERROR, BULK_SIGNUP_VALIDATION_ERROR
+from .models import User
+from .serializers import SignupSerializer
+from .validation import check_records
+
+
+def validate_rows(rows, start=0):
+    """
+    validate rows with SignupSerializer and reject usernames or emails repeated in the rows.
+    The character rules of all the rows are checked first in one pass by check_records,
+    the rows breaking one are reported with those fields and skip the serializer.
+    :param rows: list of dicts
+    :param start: index of the first row, used in the errors
+    :return: (list of (index, validated_data), list of {'row': index, 'errors': {...}})
+    """
+    valid, errors = [], []
+    usernames, emails = set(), set()
+    rule_errors = check_records(rows)
+    for index, row in enumerate(rows, start):
+        if index - start in rule_errors:
+            errors.append({'row': index, 'errors': rule_errors[index - start]})
+            continue
+        serializer = SignupSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'row': index, 'errors': serializer.errors})
+            continue
+        data = serializer.validated_data
+        row_errors = {}
+        if data['username'] in usernames:
+            row_errors['username'] = [SIGNUP_VALIDATION_ERROR['username']['exits']]
+        if data['email'] in emails:
+            row_errors['email'] = [SIGNUP_VALIDATION_ERROR['email']['exits']]
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+        usernames.add(data['username'])
+        emails.add(data['email'])
+        valid.append((index, dict(data)))
+    return valid, errors
+
+
+def exclude_registered(valid):
+    """
+    reject rows whose username or email is already registered, with two queries
+    :return: (rows still valid, errors)
+    """
+    usernames = set(User.objects.filter(username__in=[data['username'] for _, data in valid])
+                    .values_list('username', flat=True))
+    emails = set(User.objects.filter(email__in=[data['email'] for _, data in valid])
+                 .values_list('email', flat=True))
+    remaining, errors = [], []
+    for index, data in valid:
+        row_errors = {}
+        if data['username'] in usernames:
+            row_errors['username'] = [SIGNUP_VALIDATION_ERROR['username']['exits']]
+        if data['email'] in emails:
+            row_errors['email'] = [SIGNUP_VALIDATION_ERROR['email']['exits']]
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            remaining.append((index, data))
+    return remaining, errors
+
+
+def insert_users(valid):
+    """
+    insert users with bulk_create, falling back to one insert per row to find the
+    rows violating a unique constraint when another request registered them meanwhile,
+    or refused by the database for another reason
+    :return: (created users, errors)
+    """
+    users = [User(**data) for _, data in valid]
+    try:
+        with transaction.atomic():
+            return User.objects.bulk_create(users), []
+    except DatabaseError:
+        pass
+
+    created, errors = [], []
+    for (index, _), user in zip(valid, users):
+        try:
+            with transaction.atomic():
+                user.save()
+            created.append(user)
+        except IntegrityError:
+            errors.append({'row': index, 'errors': {'non_field_errors': [BULK_SIGNUP_VALIDATION_ERROR['exits']]}})
+        except DatabaseError:
+            errors.append({'row': index, 'errors': {'non_field_errors': [BULK_SIGNUP_VALIDATION_ERROR['not_stored']]}})
+    return created, errors
+
+
+def bulk_signup(rows, start=0):
+    """
+    create the users described by rows
+    :param rows: list of dicts with the fields of SignupSerializer
+    :param start: index of the first row, used in the errors
+    :return: {'created': number of users created, 'errors': [{'row': index, 'errors': {...}}]}
+    """
+    created, errors = 0, []
+    valid, row_errors = validate_rows(rows, start)
+    errors.extend(row_errors)
+    batch_size = BULK_SIGNUP['batch_size']
+
+    for offset in range(0, len(valid), batch_size):
+        batch, row_errors = exclude_registered(valid[offset:offset + batch_size])
+        errors.extend(row_errors)
+        passwords = hash_passwords([data.pop('password') for _, data in batch])
+        for (_, data), password in zip(batch, passwords):
+            data['password'] = password
+
+        users, row_errors = insert_users(batch)
+        errors.extend(row_errors)
+        # bulk_create sends no post_save, index the new users here
+        for user in users:
+            username_index.add(user.username)
+            email_index.add(user.email)
+        created += len(users)
+
+    errors.sort(key=lambda error: error['row'])
+    return {'created': created, 'errors': errors}
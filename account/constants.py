@@ -1,6 +1,8 @@
 """
 It contains all constant values
 """
+from blob.constants import BLOB_DIRECTORY
+
 REGEX = {
     "first_name": r'^[a-zA-Z]+$',
     "last_name": r'^[a-zA-Z]+$',
@@ -10,9 +12,15 @@ REGEX = {
     "PASSWORD": r'^(?=.*\d)(?=.*[a-z])(?=.*[A-Z])(?=.*[!@#$%^&*()_+=-])[0-9a-zA-Z!@#$%^&*()_+=-]{8,16}$',
 }
 
+# special characters of the USERNAME and PASSWORD patterns, checked by account.validation
+USERNAME_SPECIALS = '!@#$%^&*()_+|~=`{}[]:";\'<>?,./'
+PASSWORD_SPECIALS = '!@#$%^&*()_+=-'
+
+# the lengths of the User columns
 MAX_LENGTH = {
-    'first_name': 30,
-    'last_name': 30,
+    'first_name': 20,
+    'last_name': 20,
+    'email': 254,
     'username': 16,
     'password': 16,
     'contact': 10
@@ -25,3 +33,46 @@ MIN_LENGTH = {
     'password': 8,
     'contact': 10,
 }
+
+# Bloom filter and LRU answering the username and email validators
+MEMBERSHIP = {
+    'error_rate': 0.01,
+    'min_capacity': 10000,
+    'refresh_interval': 300,
+    'chunk_size': 10000,
+    'lru_size': 10000,
+    'lru_ttl': 60,
+}
+
+BULK_SIGNUP = {
+    # users validated against the database, hashed and inserted together
+    'batch_size': 1000,
+    # rows accepted by one request of the BulkSignup API
+    'max_rows': 5000,
+}
+
+TOKEN_WRITE_BEHIND = {
+    # seconds between two writes of the queued signin tokens
+    'interval': 1.0,
+    # queued tokens triggering an early write
+    'max_pending': 500,
+}
+
+# users resolved by CachedJWTAuthentication, kept `ttl` seconds per worker,
+# the longest a deactivated user can still be authenticated by another worker
+AUTH_USER_CACHE = {
+    'size': 10000,
+    'ttl': 30,
+}
+
+SWEEP_MEDIA = {
+    # usernames checked against the database per query
+    'batch_size': 1000,
+    # directories removed concurrently, the removal is bound by the filesystem latency
+    'workers': 8,
+    # directories modified more recently are kept, they may belong to a signup in progress
+    'min_age': 3600,
+    # top level directories of MEDIA_ROOT not owned by a user
+    # the blob storage and the upload_to directory of the videos stored before it
+    'reserved': (BLOB_DIRECTORY, 'media'),
+}
@@ -0,0 +1,37 @@
+"""
+This module defines the password hashers configured in PASSWORD_HASHERS
+and the functions account.hashing runs in its process pool.
+
+The pool processes do not set up Django, this module must not import models.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher whose work factor is read from PASSWORD_HASHER_ITERATIONS.
+    Passwords hashed with another number of iterations are re-hashed on the next signin.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASHER_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
+
+
+def make_passwords(passwords):
+    """
+    hash a chunk of passwords, run in the pool
+    """
+    return [hashers.make_password(password) for password in passwords]
+
+
+def verify_password(password, encoded):
+    """
+    check a password against its hash, run in the pool
+    :return: (whether the password is correct, whether the hash must be upgraded)
+    """
+    if not hashers.check_password(password, encoded):
+        return False, False
+    preferred = hashers.get_hasher()
+    return True, hashers.identify_hasher(encoded).algorithm != preferred.algorithm or preferred.must_update(encoded)
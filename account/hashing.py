@@ -0,0 +1,161 @@
+"""
+This module hashes and verifies passwords in a pool of processes.
+
+PBKDF2 holds the CPU for the whole hash, running it in the web worker blocks every other request
+served by that worker. The pool runs it on other cores while the request thread waits without
+holding the GIL. At most PASSWORD_HASHING_QUEUE_DEPTH hashes are queued, beyond that requests
+are answered 429 instead of piling up behind a login storm. Bulk hashing takes its slots from the
+same queue, a few chunks at a time, so a large signup batch leaves room for the logins.
+
+The functions sent to the pool are unpickled in processes where Django is not set up, they must live
+in modules importing no models, see account.hashers.
+"""
+import asyncio
+import collections
+import multiprocessing
+import threading
+from asgiref.sync import sync_to_async
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import make_password
+from rest_framework.exceptions import Throttled
+from .hashers import make_passwords, verify_password
+from .messages import PASSWORD_HASHING_ERROR
+from .models import User
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+class HashingPoolSaturated(Throttled):
+    """
+    raised when PASSWORD_HASHING_QUEUE_DEPTH hashes are already waiting, answered with 429
+    """
+    default_detail = PASSWORD_HASHING_ERROR['saturated']
+
+
+def get_executor():
+    """
+    process pool shared by the requests of this worker, created on first use
+    """
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_QUEUE_DEPTH)
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def submit(function, *args, blocking=False):
+    """
+    queue function in the pool
+    :param blocking: wait for a free slot instead of raising
+    :return: concurrent.futures.Future
+    :raise HashingPoolSaturated: when the queue of the pool is full
+    """
+    executor = get_executor()
+    if not _slots.acquire(blocking=blocking):
+        raise HashingPoolSaturated(wait=1)
+    try:
+        future = executor.submit(function, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def run(function, *args):
+    """
+    run function in the pool and wait for its result
+    """
+    if not settings.PASSWORD_HASHING_OFFLOAD:
+        return function(*args)
+    return submit(function, *args).result()
+
+
+async def arun(function, *args):
+    """
+    async version of run, the event loop is not blocked while the pool works.
+    Without PASSWORD_HASHING_OFFLOAD the function runs in the default thread executor.
+    """
+    if not settings.PASSWORD_HASHING_OFFLOAD:
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+    return await asyncio.wrap_future(submit(function, *args))
+
+
+def hash_password(password):
+    """
+    hash a password in the pool
+    """
+    return run(make_password, password)
+
+
+def hash_passwords(passwords):
+    """
+    hash many passwords in the process pool, by chunks each holding one slot of the queue.
+    At most PASSWORD_HASHING_WORKERS chunks, and half of the queue, are pending at once.
+    :param passwords: list of raw passwords
+    :return: list of encoded passwords, in the same order
+    """
+    if not passwords:
+        return []
+    if not settings.PASSWORD_HASHING_OFFLOAD:
+        return [make_password(password) for password in passwords]
+    chunk_size = max(1, len(passwords) // (settings.PASSWORD_HASHING_WORKERS * 4))
+    pending_chunks = max(1, min(settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE_DEPTH // 2))
+    pending, encoded = collections.deque(), []
+    for start in range(0, len(passwords), chunk_size):
+        if len(pending) >= pending_chunks:
+            encoded.extend(pending.popleft().result())
+        pending.append(submit(make_passwords, passwords[start:start + chunk_size], blocking=True))
+    while pending:
+        encoded.extend(pending.popleft().result())
+    return encoded
+
+
+def authenticate_user(username, password):
+    """
+    same checks as django.contrib.auth.backends.ModelBackend with the hashing run in the pool
+    :return: the active user with these credentials, or None
+    """
+    try:
+        user = User.objects.get_by_natural_key(username)
+    except User.DoesNotExist:
+        # hash anyway, so that unknown usernames take as long as wrong passwords
+        hash_password(password)
+        user = None
+    else:
+        valid, must_update = run(verify_password, password, user.password)
+        if valid and must_update:
+            user.password = hash_password(password)
+            User.objects.filter(pk=user.pk).update(password=user.password)
+        if not valid or not user.is_active:
+            user = None
+    if user is None:
+        user_login_failed.send(sender=__name__, credentials={'username': username})
+    return user
+
+
+async def aauthenticate_user(username, password):
+    """
+    async version of authenticate_user using the async ORM
+    """
+    try:
+        user = await User.objects.aget(**{User.USERNAME_FIELD: username})
+    except User.DoesNotExist:
+        await arun(make_password, password)
+        user = None
+    else:
+        valid, must_update = await arun(verify_password, password, user.password)
+        if valid and must_update:
+            user.password = await arun(make_password, password)
+            await User.objects.filter(pk=user.pk).aupdate(password=user.password)
+        if not valid or not user.is_active:
+            user = None
+    if user is None:
+        await sync_to_async(user_login_failed.send)(sender=__name__, credentials={'username': username})
+    return user
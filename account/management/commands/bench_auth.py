@@ -0,0 +1,58 @@
+"""
+Management command measuring authenticated request latency with and without the user cache.
+"""
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+from account.authentication import CachedJWTAuthentication, user_cache
+from account.models import User
+from image.models import ImageGallery
+from image.views import ImageGalleryViewSet
+
+USERNAME = 'bench@auth'
+
+
+class Command(BaseCommand):
+    """
+    List the image galleries of a user repeatedly, authenticated by JWTAuthentication
+    and then by CachedJWTAuthentication, and print the latency percentiles and the
+    queries per request of both.
+    """
+    help = 'Benchmark gallery listing latency with JWTAuthentication and CachedJWTAuthentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def run(self, label, authentication_class, requests, headers):
+        ImageGalleryViewSet.authentication_classes = [authentication_class]
+        user_cache.clear()
+        client = Client()
+        url = reverse('ImageGallery-list')
+        latencies = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.get(url, **headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.content
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(f'{label:>6}: p50 {quantiles[49] * 1000:.2f} ms, p99 {quantiles[98] * 1000:.2f} ms, '
+                          f'{len(queries) / requests:.2f} queries per request')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': 'bench@auth.local'})
+        ImageGallery.objects.create(user=user, gallery_name='bench')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        authentication_classes = ImageGalleryViewSet.authentication_classes
+        try:
+            self.run('before', JWTAuthentication, options['requests'], headers)
+            self.run('after', CachedJWTAuthentication, options['requests'], headers)
+        finally:
+            ImageGalleryViewSet.authentication_classes = authentication_classes
+            user.delete()
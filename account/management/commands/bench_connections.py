@@ -0,0 +1,67 @@
+"""
+Management command comparing requests per second with and without persistent database connections.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+from account.models import User
+
+USERNAME = 'bench@connect'
+
+
+class Command(BaseCommand):
+    """
+    Send concurrent requests to the one-query Storage endpoint, once opening a connection
+    per request (CONN_MAX_AGE=0) and once reusing the connections of the worker threads,
+    and print the requests per second of both runs.
+
+    The test client does not send the request_started and request_finished signals to
+    close_old_connections, every request is wrapped in it here as the WSGI handler does,
+    otherwise the connections would be kept in both runs.
+    """
+    help = 'Benchmark requests/sec with CONN_MAX_AGE=0 and with persistent connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--conn-max-age', type=int, default=settings.DATABASES['default']['CONN_MAX_AGE'] or 60)
+
+    @staticmethod
+    def set_conn_max_age(conn_max_age):
+        # new connections of every thread read these settings
+        for alias in connections:
+            connections.settings[alias]['CONN_MAX_AGE'] = conn_max_age
+        connections.close_all()
+
+    def run(self, label, user, options):
+        def request(_):
+            client = APIClient()
+            client.force_authenticate(user)
+            close_old_connections()
+            try:
+                return client.get(reverse('Storage-list')).status_code
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            started = time.perf_counter()
+            statuses = list(executor.map(request, range(options['requests'])))
+            elapsed = time.perf_counter() - started
+        failed = sum(1 for status in statuses if status != 200)
+        self.stdout.write(f'{label:>10}: {options["requests"] / elapsed:.1f} req/s, {failed} failed')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': 'bench@connect.local'})
+        conn_max_age = settings.DATABASES['default']['CONN_MAX_AGE']
+        try:
+            self.set_conn_max_age(0)
+            self.run('per request', user, options)
+            self.set_conn_max_age(options['conn_max_age'])
+            self.run('persistent', user, options)
+        finally:
+            self.set_conn_max_age(conn_max_age)
+            user.delete()
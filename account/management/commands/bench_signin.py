@@ -0,0 +1,63 @@
+"""
+Management command measuring signin latency under concurrent load.
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from account.models import User
+
+USERNAME = 'bench@signin'
+PASSWORD = 'Bench@123'
+
+
+class Command(BaseCommand):
+    """
+    Send concurrent signin requests through the test client, once with the hashing
+    done in the request thread and once offloaded to the process pool, and print
+    the latency percentiles and the number of 429 answers of both runs.
+    """
+    help = 'Benchmark signin latency with and without the password hashing pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+
+    @staticmethod
+    def signin(_):
+        client = Client()
+        started = time.perf_counter()
+        response = client.post(reverse('signin-list'), {'username': USERNAME, 'password': PASSWORD})
+        elapsed = time.perf_counter() - started
+        connection.close()
+        return elapsed, response.status_code
+
+    def run(self, label, requests, concurrency):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            started = time.perf_counter()
+            results = list(executor.map(self.signin, range(requests)))
+            wall = time.perf_counter() - started
+        latencies = sorted(elapsed for elapsed, status in results if status == 201)
+        throttled = sum(1 for _, status in results if status == 429)
+        if not latencies:
+            self.stdout.write(f'{label}: no successful signin, {throttled} throttled')
+            return
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f'{label}: {len(latencies)} ok, {throttled} throttled, {requests / wall:.1f} req/s, '
+            f'p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': 'bench@signin.local'})
+        user.set_password(PASSWORD)
+        user.save()
+        try:
+            with override_settings(PASSWORD_HASHING_OFFLOAD=False):
+                self.run('inline', options['requests'], options['concurrency'])
+            self.run('offloaded', options['requests'], options['concurrency'])
+        finally:
+            user.delete()
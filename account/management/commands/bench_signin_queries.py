@@ -0,0 +1,65 @@
+"""
+Management command counting the queries issued by one signin in every token persistence mode.
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from account.models import User
+from account.serializers import SigninSerializer
+from account.tokens import writer
+
+USERNAME = 'bench@tokens'
+PASSWORD = 'Bench@123'
+
+
+def legacy_create(validated_data):
+    """
+    SigninSerializer.create before ACCOUNT_TOKEN_PERSISTENCE, kept as the baseline
+    """
+    user = validated_data['user']
+    refresh = RefreshToken.for_user(user)
+    user_token = User.objects.get(id=user.id)
+    user_token.token = str(refresh.access_token)
+    user_token.save()
+    return {'access': str(refresh.access_token), 'refresh': str(refresh)}
+
+
+class Command(BaseCommand):
+    """
+    Sign in repeatedly with every persistence mode and print the queries and
+    the time spent per signin. Write-behind writes are flushed in this thread
+    so that they are counted, amortized over the signins.
+    """
+    help = 'Count queries per signin for each ACCOUNT_TOKEN_PERSISTENCE mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--signins', type=int, default=50)
+
+    def measure(self, label, signins, create):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(signins):
+                serializer = SigninSerializer(data={'username': USERNAME, 'password': PASSWORD})
+                serializer.is_valid(raise_exception=True)
+                create(serializer.validated_data)
+            writer.flush()
+            elapsed = time.perf_counter() - started
+        writes = sum(1 for query in queries if query['sql'].startswith('UPDATE'))
+        self.stdout.write(f'{label:>13}: {len(queries) / signins:.2f} queries '
+                          f'({writes / signins:.2f} UPDATE) and {elapsed / signins * 1000:.1f} ms per signin')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': 'bench@tokens.local'})
+        user.set_password(PASSWORD)
+        user.save()
+        signins = options['signins']
+        try:
+            with override_settings(PASSWORD_HASHING_OFFLOAD=False):
+                self.measure('before', signins, legacy_create)
+                for mode in ('update', 'write_behind', 'off'):
+                    with override_settings(ACCOUNT_TOKEN_PERSISTENCE=mode):
+                        self.measure(mode, signins, SigninSerializer().create)
+        finally:
+            user.delete()
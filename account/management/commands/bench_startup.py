@@ -0,0 +1,74 @@
+"""
+Management command measuring the cold start of a worker: time to the first response and import-time profile.
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# run in a fresh interpreter, prints the seconds to django.setup() and to the first response
+WORKER = '''
+import sys, time
+started = time.perf_counter()
+import django
+django.setup()
+ready = time.perf_counter()
+from django.test import Client
+status = Client().get(sys.argv[1]).status_code
+print(ready - started, time.perf_counter() - started, status)
+'''
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    """
+    Start fresh interpreters like a new worker would, each importing django, the settings and the apps
+    and answering one request, then print the median time to django.setup() and to the first response,
+    and the top level imports costing the most with python -X importtime.
+    """
+    help = 'Benchmark worker cold start: time to first response and import-time profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/', help='path of the first request')
+        parser.add_argument('--top', type=int, default=15, help='number of imports of the profile')
+
+    @staticmethod
+    def start_worker(path, import_time=False):
+        command = [sys.executable] + (['-X', 'importtime'] if import_time else []) + ['-c', WORKER, path]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'galleria.settings'))
+        result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if result.returncode:
+            raise CommandError(result.stderr)
+        setup, first_response, status = result.stdout.split()[-3:]
+        return float(setup), float(first_response), status, result.stderr
+
+    @staticmethod
+    def import_profile(stderr):
+        """
+        top level imports of a -X importtime log with their cumulative microseconds
+        """
+        imports = []
+        for line in stderr.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match and len(match.group(3)) == 1:
+                imports.append((int(match.group(2)), match.group(4)))
+        return sorted(imports, reverse=True)
+
+    def handle(self, *args, **options):
+        runs = [self.start_worker(options['path']) for _ in range(options['runs'])]
+        setup = statistics.median(run[0] for run in runs)
+        first_response = statistics.median(run[1] for run in runs)
+        self.stdout.write(f'django.setup(): {setup * 1000:.1f} ms, first response: {first_response * 1000:.1f} ms '
+                          f'(median of {options["runs"]}, status {runs[-1][2]})')
+
+        *_, stderr = self.start_worker(options['path'], import_time=True)
+        imports = self.import_profile(stderr)
+        total = sum(cumulative for cumulative, _ in imports)
+        self.stdout.write(f'imports: {total / 1000:.1f} ms')
+        for cumulative, module in imports[:options['top']]:
+            self.stdout.write(f'{cumulative / 1000:>10.1f} ms  {module}')
@@ -0,0 +1,83 @@
+"""
+Management command comparing the account field validators with the raw pattern validators they replaced.
+"""
+import re
+import timeit
+from django.core.management.base import BaseCommand
+from account.constants import REGEX
+from account.validation import valid_username, valid_password, valid_first_name, check_records
+
+
+def legacy_username(value):
+    """
+    SignupSerializer.validate_username before account.validation, kept as the baseline
+    """
+    return bool(re.match(REGEX["USERNAME"], value)) and any(char.isalpha() for char in value)
+
+
+def legacy_password(value):
+    return bool(re.match(REGEX["PASSWORD"], value))
+
+
+def legacy_first_name(value):
+    return bool(re.match(REGEX["first_name"], value))
+
+
+# (field, case, value), the pathological values are long and only fail on their last character
+CASES = [
+    ('username', 'valid', 'gallery@user1'),
+    ('username', 'no special', 'galleryuser1'),
+    ('username', 'no letter', '12345678@'),
+    ('username', 'long, bad last', 'a@' * 5000 + ' '),
+    ('username', 'long, no special', 'a' * 10000),
+    ('password', 'valid', 'Gallery@123'),
+    ('password', 'no digit', 'Gallery@abc'),
+    ('password', 'bad character', 'Gallery@12 3'),
+    ('password', 'long, bad last', 'Aa1@' * 2500 + ' '),
+    ('first_name', 'valid', 'Gallery'),
+    ('first_name', 'long, bad last', 'a' * 10000 + '1'),
+]
+
+VALIDATORS = {
+    'username': (legacy_username, valid_username),
+    'password': (legacy_password, valid_password),
+    'first_name': (legacy_first_name, valid_first_name),
+}
+
+
+class Command(BaseCommand):
+    """
+    Time the legacy and the new validator of every case and print the microseconds per call,
+    then time check_records against validating the same records one by one with the legacy validators.
+    """
+    help = 'Benchmark the account field validators on valid and pathological inputs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=10000, help='calls per case')
+        parser.add_argument('--records', type=int, default=10000, help='records of the batch run')
+
+    @staticmethod
+    def per_call(function, value, number):
+        return min(timeit.repeat(lambda: function(value), number=number, repeat=3)) / number * 1e6
+
+    def handle(self, *args, **options):
+        number = options['number']
+        self.stdout.write(f'{"field":<11}{"case":<18}{"legacy us":>10}{"new us":>10}{"speedup":>9}')
+        for field, case, value in CASES:
+            legacy, new = VALIDATORS[field]
+            assert legacy(value) == new(value), (field, case)
+            before = self.per_call(legacy, value, number)
+            after = self.per_call(new, value, number)
+            self.stdout.write(f'{field:<11}{case:<18}{before:>10.2f}{after:>10.2f}{before / after:>8.1f}x')
+
+        records = [{'first_name': 'Gallery', 'last_name': 'User', 'contact': '9876543210',
+                    'username': f'gallery@{index}', 'password': 'Gallery@123'} for index in range(options['records'])]
+        legacy_rules = {'first_name': legacy_first_name, 'last_name': legacy_first_name,
+                        'contact': lambda value: bool(re.match(REGEX['contact'], value)),
+                        'username': legacy_username, 'password': legacy_password}
+        before = min(timeit.repeat(
+            lambda: [all(rule(record[field]) for field, rule in legacy_rules.items()) for record in records],
+            number=1, repeat=3))
+        after = min(timeit.repeat(lambda: check_records(records), number=1, repeat=3))
+        self.stdout.write(f'{len(records)} records: legacy {before * 1000:.1f} ms, '
+                          f'check_records {after * 1000:.1f} ms ({before / after:.1f}x)')
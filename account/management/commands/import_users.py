@@ -0,0 +1,54 @@
+"""
+Management command registering the users listed in a CSV or JSON lines file.
+"""
+import csv
+import json
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from account.bulk import bulk_signup
+from account.constants import BULK_SIGNUP
+
+FIELDS = ['first_name', 'last_name', 'username', 'email', 'contact', 'password']
+
+
+class Command(BaseCommand):
+    """
+    Read users from a file and create them in batches.
+    Rows are numbered from 1, invalid rows are reported and skipped.
+    """
+    help = 'Create the users of a CSV (with a header row) or JSON lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .jsonl file with the fields ' + ', '.join(FIELDS))
+        parser.add_argument('--batch-size', type=int, default=BULK_SIGNUP['batch_size'],
+                            help='rows read and created together')
+
+    @staticmethod
+    def read_rows(file, path):
+        if path.endswith(('.jsonl', '.json')):
+            return (json.loads(line) for line in file if line.strip())
+        return csv.DictReader(file)
+
+    def handle(self, *args, **options):
+        try:
+            file = open(options['path'], newline='', encoding='utf-8')
+        except OSError as error:
+            raise CommandError(error)
+
+        created = failed = 0
+        with file:
+            rows = self.read_rows(file, options['path'])
+            start = 1
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                result = bulk_signup(batch, start=start)
+                created += result['created']
+                failed += len(result['errors'])
+                for error in result['errors']:
+                    self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+                start += len(batch)
+                self.stdout.write(f'{start - 1} rows read, {created} users created')
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} users, {failed} rows rejected'))
@@ -0,0 +1,41 @@
+"""
+Management command writing the OpenAPI documents served at the root path, run at build time.
+"""
+import glob
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from galleria.schema import code_version, render_schema, schema_path, write_schema
+
+EXTENSIONS = ('json', 'yaml')
+
+
+class Command(BaseCommand):
+    """
+    Render the JSON and YAML documents of the current code version into SCHEMA_CACHE_DIR.
+    Documents already rendered for this version are kept unless --force is given,
+    so the schema is only regenerated when the code version changes.
+    """
+    help = 'Pre-render the OpenAPI schema of the current code version'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='render even if the documents exist')
+        parser.add_argument('--prune', action='store_true', help='delete the documents of other code versions')
+
+    def handle(self, *args, **options):
+        version = code_version()
+        for extension in EXTENSIONS:
+            path = schema_path(extension)
+            if os.path.exists(path) and not options['force']:
+                self.stdout.write(f'{path} is up to date')
+                continue
+            write_schema(extension, render_schema(extension))
+            self.stdout.write(f'rendered {path}')
+
+        if options['prune']:
+            current = {schema_path(extension) for extension in EXTENSIONS}
+            for path in glob.glob(os.path.join(settings.SCHEMA_CACHE_DIR, 'openapi-*.*')):
+                if path not in current:
+                    os.remove(path)
+                    self.stdout.write(f'removed {path}')
+        self.stdout.write(self.style.SUCCESS(f'schema of code version {version} is ready'))
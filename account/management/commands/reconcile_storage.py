@@ -0,0 +1,110 @@
+"""
+Management command repairing the storage counters of users and galleries.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from account.models import User
+from image.models import ImageGallery, Image
+from video.models import VideoGallery, Video, VideoUpload
+
+
+def file_size(name):
+    """
+    :return: size of a stored file, or None when it is missing
+    """
+    try:
+        return os.stat(default_storage.path(name)).st_size
+    except OSError:
+        return None
+
+
+def total(queryset, column, aggregate):
+    """
+    correlated subquery of an aggregate over queryset, 0 when it is empty
+    """
+    subquery = queryset.order_by().values(column).annotate(total=aggregate).values('total')[:1]
+    return Coalesce(Subquery(subquery), Value(0))
+
+
+class Command(BaseCommand):
+    """
+    Stat the file of every image and video in a thread pool and fix their byte_size,
+    then recompute the counters of galleries and users, and the quota reserved by the
+    uploads in progress, from the rows and rewrite the ones that drifted. Run it when
+    uploads are quiet, an upload committed while a counter is rewritten can be counted
+    twice until the next run.
+    """
+    help = 'Repair the storage counters of users and galleries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help='threads reading the disk')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--skip-disk', action='store_true', help='only recompute the counters')
+
+    def scan(self, model, field, options):
+        """
+        set byte_size to the size on disk of every row of model
+        """
+        fixed = missing = 0
+        last_id = 0
+        queryset = model.objects.filter(**{f'{field}__isnull': False}).exclude(**{field: ''})
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                rows = list(queryset.filter(id__gt=last_id).order_by('id')
+                            .only('id', field, 'byte_size')[:options['batch_size']])
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                changed = []
+                for row, size in zip(rows, executor.map(file_size, [getattr(row, field).name for row in rows])):
+                    if size is None:
+                        missing += 1
+                    elif size != row.byte_size:
+                        row.byte_size = size
+                        changed.append(row)
+                model.objects.bulk_update(changed, ['byte_size'])
+                fixed += len(changed)
+        self.stdout.write(f'{model.__name__}: {fixed} sizes fixed, {missing} files missing')
+
+    def reconcile_galleries(self, gallery_model, media_model, gallery_field):
+        media = media_model.objects.filter(**{gallery_field: OuterRef('pk')})
+        storage_bytes = total(media, gallery_field, Sum('byte_size'))
+        media_count = total(media, gallery_field, Count('id'))
+        with transaction.atomic():
+            drifted = gallery_model.objects.alias(actual_bytes=storage_bytes, actual_count=media_count).exclude(
+                storage_bytes=F('actual_bytes'), media_count=F('actual_count'))
+            repaired = gallery_model.objects.filter(pk__in=drifted.values('pk')).update(
+                storage_bytes=storage_bytes, media_count=media_count)
+        self.stdout.write(f'{gallery_model.__name__}: {repaired} counters repaired')
+
+    def reconcile_users(self):
+        image_galleries = ImageGallery.objects.filter(user=OuterRef('pk'))
+        video_galleries = VideoGallery.objects.filter(user=OuterRef('pk'))
+        storage_bytes = (total(image_galleries, 'user', Sum('storage_bytes'))
+                         + total(video_galleries, 'user', Sum('storage_bytes')))
+        media_count = (total(image_galleries, 'user', Sum('media_count'))
+                       + total(video_galleries, 'user', Sum('media_count')))
+        reserved_bytes = total(VideoUpload.objects.filter(user=OuterRef('pk')), 'user', Sum('size'))
+        with transaction.atomic():
+            drifted = User.objects.alias(actual_bytes=storage_bytes, actual_count=media_count,
+                                         actual_reserved=reserved_bytes).exclude(
+                storage_bytes=F('actual_bytes'), media_count=F('actual_count'), reserved_bytes=F('actual_reserved'))
+            repaired = User.objects.filter(pk__in=drifted.values('pk')).update(
+                storage_bytes=storage_bytes, media_count=media_count, reserved_bytes=reserved_bytes)
+        self.stdout.write(f'User: {repaired} counters repaired')
+
+    def handle(self, *args, **options):
+        try:
+            if not options['skip_disk']:
+                self.scan(Image, 'image', options)
+                self.scan(Video, 'video', options)
+            self.reconcile_galleries(ImageGallery, Image, 'image_gallery')
+            self.reconcile_galleries(VideoGallery, Video, 'video_gallery')
+            self.reconcile_users()
+        finally:
+            connection.close()
@@ -0,0 +1,65 @@
+"""
+Management command removing the media directories of users that do not exist.
+"""
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from account.constants import SWEEP_MEDIA
+from account.models import User
+
+
+class Command(BaseCommand):
+    """
+    List the top level directories of MEDIA_ROOT, look their names up as usernames in batches
+    and remove the directories without a user in a thread pool.
+    They are left by deleted users and by signups that failed after creating the directory.
+    """
+    help = 'Remove the media directories of users that do not exist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SWEEP_MEDIA['batch_size'])
+        parser.add_argument('--workers', type=int, default=SWEEP_MEDIA['workers'])
+        parser.add_argument('--min-age', type=int, default=SWEEP_MEDIA['min_age'],
+                            help='seconds since the last modification of a removed directory')
+        parser.add_argument('--dry-run', action='store_true', help='only print the orphan directories')
+
+    @staticmethod
+    def candidates(min_age):
+        """
+        names of the user directories of MEDIA_ROOT not modified for min_age seconds
+        """
+        threshold = time.time() - min_age
+        try:
+            entries = os.scandir(settings.MEDIA_ROOT)
+        except FileNotFoundError:
+            return []
+        with entries:
+            return [entry.name for entry in entries
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in SWEEP_MEDIA['reserved']
+                    and entry.stat(follow_symlinks=False).st_mtime < threshold]
+
+    @staticmethod
+    def orphans(names, batch_size):
+        for offset in range(0, len(names), batch_size):
+            batch = names[offset:offset + batch_size]
+            existing = set(User.objects.filter(username__in=batch).values_list('username', flat=True))
+            yield from (name for name in batch if name not in existing)
+
+    @staticmethod
+    def remove(name):
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, name), ignore_errors=True)
+        return name
+
+    def handle(self, *args, **options):
+        orphans = list(self.orphans(self.candidates(options['min_age']), options['batch_size']))
+        if options['dry_run']:
+            for name in orphans:
+                self.stdout.write(name)
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                for name in executor.map(self.remove, orphans):
+                    self.stdout.write(f'removed {name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(orphans)} orphan directories'))
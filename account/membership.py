@@ -0,0 +1,149 @@
+"""
+This module answers "is this username / email taken" without querying the User table
+for values that were never registered.
+
+Each worker keeps a Bloom filter of the registered values, built from the User table in a
+background thread and rebuilt periodically, the previous filter keeps answering meanwhile.
+A value missing from the filter is free, only possible positives are checked against the
+database, and positive answers are kept in an LRU. Until the first build completes every
+value is checked against the database.
+Registrations made by other workers are published in the django cache until the next rebuild.
+"""
+import hashlib
+import math
+import threading
+import time
+from django.core.cache import cache
+from django.db import connection
+from .caching import LRUCache
+from .constants import MEMBERSHIP
+from .models import User
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings sized for `capacity` values at the given false positive rate
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+class MembershipIndex:
+    """
+    Membership of the values of a unique User field
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.bloom = None
+        self.built_at = 0.0
+        self.lock = threading.Lock()
+        self.answers = LRUCache(MEMBERSHIP['lru_size'], MEMBERSHIP['lru_ttl'])
+
+    def cache_key(self, value):
+        return f'account:{self.field}:{hashlib.sha1(value.encode()).hexdigest()}'
+
+    def build(self):
+        """
+        rebuild the Bloom filter from the User table
+        """
+        capacity = max(MEMBERSHIP['min_capacity'], User.objects.count() * 2)
+        bloom = BloomFilter(capacity, MEMBERSHIP['error_rate'])
+        values = User.objects.exclude(**{f'{self.field}__isnull': True}).values_list(self.field, flat=True)
+        for value in values.iterator(chunk_size=MEMBERSHIP['chunk_size']):
+            bloom.add(value)
+        self.bloom, self.built_at = bloom, time.monotonic()
+
+    def is_stale(self):
+        return self.bloom is None or time.monotonic() - self.built_at > MEMBERSHIP['refresh_interval']
+
+    def refresh(self):
+        """
+        rebuild the Bloom filter in a background thread unless a rebuild is already running
+        """
+        if not self.lock.acquire(blocking=False):
+            return
+
+        def rebuild():
+            try:
+                self.build()
+            finally:
+                self.lock.release()
+                connection.close()
+
+        threading.Thread(target=rebuild, name=f'membership-{self.field}', daemon=True).start()
+
+    def get_bloom(self):
+        """
+        :return: the current Bloom filter, None until the first build completes
+        """
+        if self.is_stale():
+            self.refresh()
+        return self.bloom
+
+    def might_exist(self, value):
+        """
+        :return: False only when the value is certainly not registered
+        """
+        bloom = self.get_bloom()
+        return bloom is None or value in bloom or cache.get(self.cache_key(value)) is not None
+
+    def exists(self, value):
+        """
+        check that a value is registered, querying the database only for possible positives
+        """
+        if not self.might_exist(value):
+            return False
+        if self.answers.get(value):
+            return True
+        exists = User.objects.filter(**{self.field: value}).exists()
+        if exists:
+            self.answers.set(value, True)
+        return exists
+
+    async def aexists(self, value):
+        """
+        async version of exists
+        """
+        bloom = self.get_bloom()
+        if bloom is not None and value not in bloom and await cache.aget(self.cache_key(value)) is None:
+            return False
+        if self.answers.get(value):
+            return True
+        exists = await User.objects.filter(**{self.field: value}).aexists()
+        if exists:
+            self.answers.set(value, True)
+        return exists
+
+    def add(self, value):
+        """
+        record a registered value in this worker and publish it to the others
+        """
+        if self.bloom is not None:
+            self.bloom.add(value)
+        cache.set(self.cache_key(value), True, MEMBERSHIP['refresh_interval'] * 2)
+
+    def discard(self, value):
+        """
+        forget the cached answer of a value which may have been freed
+        """
+        self.answers.discard(value)
+
+
+username_index = MembershipIndex('username')
+email_index = MembershipIndex('email')
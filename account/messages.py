@@ -3,11 +3,13 @@ SIGNUP_VALIDATION_ERROR = {
         "blank": "first name can not be blank",
         "invalid": "first name must contain only alphabets",
         "required": "first name required",
+        "max_length": "first name can not be more than 20 characters",
     },
     'last_name': {
         "blank": "last name can not be blank",
         "invalid": "last name must contains only alphabets",
         "required": "last name required",
+        "max_length": "last name can not be more than 20 characters",
     },
     'username': {
         "blank": "username can not be blank",
@@ -18,6 +20,7 @@ SIGNUP_VALIDATION_ERROR = {
     'email': {
         "blank": "Email can not be blank",
         "required": "Email required",
+        "max_length": "Email can not be more than 254 characters",
         "exits": "email exist"
     },
     'contact': {
@@ -64,3 +67,21 @@ USERNAME_VALIDATOR_VALIDATION_ERROR = {
     }
 }
 
+BULK_SIGNUP_VALIDATION_ERROR = {
+    'users': {
+        "required": "users required",
+        "not_a_list": "users must be a list",
+        "empty": "users can not be empty",
+        "max_length": "too many users in one request",
+    },
+    "exits": "username or email exist",
+    "not_stored": "user could not be stored",
+}
+
+PASSWORD_HASHING_ERROR = {
+    "saturated": "Too many signin requests, try again shortly",
+}
+
+STORAGE_QUOTA_ERROR = {
+    "exceeded": "storage quota exceeded",
+}
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_user_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='reserved_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
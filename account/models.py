@@ -12,6 +12,7 @@ class User(AbstractUser):
     with additional fields for User model
 
     * username and email are unique
+    * storage_bytes, media_count and reserved_bytes are maintained by account.quota
     """
     first_name = models.CharField(max_length=20)
     last_name = models.CharField(max_length=20)
@@ -20,6 +21,12 @@ class User(AbstractUser):
     contact = models.CharField(max_length=10)
     password = models.CharField(max_length=255)
     token = models.CharField(max_length=255)
+    storage_bytes = models.BigIntegerField(default=0)
+    media_count = models.IntegerField(default=0)
+    # bytes the user can store, null for settings.STORAGE_QUOTA_BYTES
+    storage_quota = models.BigIntegerField(null=True, blank=True)
+    # bytes of the uploads in progress, counted in the quota until they complete or are aborted
+    reserved_bytes = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
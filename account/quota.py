@@ -0,0 +1,110 @@
+"""
+This module keeps the storage used by every user and gallery in denormalized counters.
+
+User, ImageGallery and VideoGallery carry `storage_bytes` and `media_count`, moved with F()
+expressions in the transaction creating or deleting an Image or Video. The usage of a user is
+then a primary key lookup instead of a walk of MEDIA_ROOT/<username> or a SUM over the media.
+The size of a video upload is reserved in User.reserved_bytes when it starts, with a conditional
+UPDATE, so parallel uploads cannot together exceed the quota.
+Counters drifted by a crash or a raw SQL change are repaired by `manage.py reconcile_storage`.
+"""
+from django.conf import settings
+from django.db.models import F, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .messages import STORAGE_QUOTA_ERROR
+from .models import User
+
+
+class QuotaExceeded(APIException):
+    """
+    raised when an upload does not fit in the quota of the user, answered with 413
+    """
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = STORAGE_QUOTA_ERROR['exceeded']
+    default_code = 'quota_exceeded'
+
+
+def quota_of(storage_quota):
+    """
+    :param storage_quota: User.storage_quota
+    :return: bytes the user can store, 0 for unlimited
+    """
+    return settings.STORAGE_QUOTA_BYTES if storage_quota is None else storage_quota
+
+
+def check_quota(user_id, size):
+    """
+    check, with the current counters, that `size` more bytes fit in the quota of a user
+    :raise QuotaExceeded: when they do not
+    """
+    usage = User.objects.filter(pk=user_id).values_list('storage_bytes', 'reserved_bytes', 'storage_quota').first()
+    if usage is None:
+        return
+    storage_bytes, reserved_bytes, storage_quota = usage
+    quota = quota_of(storage_quota)
+    if quota and storage_bytes + reserved_bytes + size > quota:
+        raise QuotaExceeded()
+
+
+def reserve(user_id, size):
+    """
+    reserve `size` bytes in the quota of a user, in one UPDATE matching only when they fit
+    :raise QuotaExceeded: when they do not
+    """
+    reserved = User.objects.filter(pk=user_id).alias(
+        quota=Coalesce('storage_quota', Value(settings.STORAGE_QUOTA_BYTES)),
+        usage=F('storage_bytes') + F('reserved_bytes') + size,
+    ).filter(Q(quota=0) | Q(quota__gte=F('usage'))).update(reserved_bytes=F('reserved_bytes') + size)
+    if not reserved:
+        raise QuotaExceeded()
+
+
+def unreserve(user_id, size):
+    """
+    give back bytes reserved by reserve, once the upload is completed or aborted
+    """
+    User.objects.filter(pk=user_id).update(reserved_bytes=F('reserved_bytes') - size)
+
+
+def charge(gallery_model, gallery_id, size, count=1):
+    """
+    add media to the counters of a gallery and of its owner, one UPDATE each.
+    Negative values release them.
+    :param gallery_model: ImageGallery or VideoGallery
+    :param gallery_id: id of the gallery holding the media
+    :param size: bytes added
+    :param count: media added
+    """
+    changes = {'storage_bytes': F('storage_bytes') + size, 'media_count': F('media_count') + count}
+    # the media of the gallery changed, so does its last modification
+    gallery_model.objects.filter(pk=gallery_id).update(updated_at=Now(), **changes)
+    User.objects.filter(pk=gallery_model.objects.filter(pk=gallery_id).values('user_id')[:1]).update(**changes)
+
+
+def release(gallery_model, gallery_id, size, count=1):
+    """
+    remove media from the counters of a gallery and of its owner
+    """
+    charge(gallery_model, gallery_id, -size, -count)
+
+
+def release_gallery(gallery_model, gallery_id):
+    """
+    remove all the media of a gallery about to be deleted from the counters of its owner,
+    in one UPDATE reading the current counters of the gallery
+    """
+    counters = gallery_model.objects.filter(pk=gallery_id)
+    User.objects.filter(pk=counters.values('user_id')[:1]).update(
+        storage_bytes=F('storage_bytes') - Subquery(counters.values('storage_bytes')[:1]),
+        media_count=F('media_count') - Subquery(counters.values('media_count')[:1]))
+
+
+def deleted_with(origin, *models):
+    """
+    whether a deletion cascades from an instance or a queryset of one of models.
+    Media deleted with their gallery are released by release_gallery, not one by one.
+    :param origin: `origin` argument of the post_delete signal
+    """
+    return isinstance(origin, models) or getattr(origin, 'model', None) in models
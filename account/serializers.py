@@ -1,13 +1,15 @@
-from django.contrib.auth import authenticate
 from rest_framework import serializers
 from .messages import SIGNUP_VALIDATION_ERROR, SIGNIN_VALIDATION_ERROR, EMAIL_VALIDATOR_VALIDATION_ERROR, \
-    USERNAME_VALIDATOR_VALIDATION_ERROR
+    USERNAME_VALIDATOR_VALIDATION_ERROR, BULK_SIGNUP_VALIDATION_ERROR
+from .hashing import authenticate_user, hash_password
+from .membership import username_index, email_index
 from .models import User
+from .quota import quota_of
 from rest_framework_simplejwt.tokens import RefreshToken
-import re
-from .constants import REGEX, MAX_LENGTH, MIN_LENGTH
-from django.conf import settings
-import os
+from .tokens import persist_token
+from .constants import MAX_LENGTH, MIN_LENGTH, BULK_SIGNUP
+from .validation import valid_first_name, valid_last_name, valid_username, valid_contact, \
+    valid_password
 
 
 class SignupSerializer(serializers.ModelSerializer):
@@ -23,7 +25,7 @@ class SignupSerializer(serializers.ModelSerializer):
     username = serializers.CharField(min_length=MIN_LENGTH['username'], max_length=MAX_LENGTH['username'],
                                      required=True, allow_blank=False, trim_whitespace=False,
                                      error_messages=SIGNUP_VALIDATION_ERROR['username'])
-    email = serializers.EmailField(required=True, allow_blank=False,
+    email = serializers.EmailField(max_length=MAX_LENGTH['email'], required=True, allow_blank=False,
                                    error_messages=SIGNUP_VALIDATION_ERROR['email'])
     contact = serializers.CharField(min_length=MIN_LENGTH['contact'], max_length=MAX_LENGTH['contact'],
                                     required=True, allow_blank=False, error_messages=SIGNUP_VALIDATION_ERROR['contact'])
@@ -38,7 +40,7 @@ class SignupSerializer(serializers.ModelSerializer):
         :param value:first_name
         :return:if valid return value ,else return Validation error
         """
-        if not re.match(REGEX["first_name"], value):
+        if not valid_first_name(value):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['first_name']['invalid'])
         return value
 
@@ -49,7 +51,7 @@ class SignupSerializer(serializers.ModelSerializer):
         :param value:last_name
         :return:if valid return value ,else return Validation error
         """
-        if not re.match(REGEX["last_name"], value):
+        if not valid_last_name(value):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['last_name']['invalid'])
         return value
 
@@ -61,7 +63,7 @@ class SignupSerializer(serializers.ModelSerializer):
         :param value: username
         :return: if valid return value ,else return Validation error
         """
-        if not re.match(REGEX["USERNAME"], value) or not any(char.isalpha() for char in value):
+        if not valid_username(value):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['username']['invalid'])
         return value
 
@@ -72,7 +74,7 @@ class SignupSerializer(serializers.ModelSerializer):
         :param value:contact
         :return:if valid return value ,else return Validation error
         """
-        if not re.match(REGEX["contact"], value):
+        if not valid_contact(value):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['contact']['invalid'])
         return value
 
@@ -82,7 +84,7 @@ class SignupSerializer(serializers.ModelSerializer):
         checks password if valid : return value,
         else : return validation error
         """
-        if not re.match(REGEX["PASSWORD"], value):
+        if not valid_password(value):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['password']['invalid'])
         return value
 
@@ -92,9 +94,7 @@ class SignupSerializer(serializers.ModelSerializer):
         """
         password = validated_data.pop('password')
         user = User(**validated_data)
-        user.set_password(password)
-        directory_path = os.path.join(settings.MEDIA_ROOT, user.username)
-        os.makedirs(directory_path)
+        user.password = hash_password(password)
         user.save()
         return user
 
@@ -125,7 +125,7 @@ class SigninSerializer(serializers.ModelSerializer):
         :param value: username
         :return: if valid return value ,else return Validation error
         """
-        if not re.match(REGEX["USERNAME"], value):
+        if not valid_username(value, require_letter=False):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['username']['invalid'])
         return value
 
@@ -135,7 +135,7 @@ class SigninSerializer(serializers.ModelSerializer):
         checks password if valid : return value,
         else : return validation error
         """
-        if not re.match(REGEX["PASSWORD"], value):
+        if not valid_password(value):
             raise serializers.ValidationError(SIGNUP_VALIDATION_ERROR['password']['invalid'])
         return value
 
@@ -146,7 +146,7 @@ class SigninSerializer(serializers.ModelSerializer):
         username = data.get('username')
         password = data.get('password')
 
-        user = authenticate(username=username, password=password)
+        user = authenticate_user(username, password)
         if not user:
             raise serializers.ValidationError(SIGNIN_VALIDATION_ERROR['invalid credentials'])
 
@@ -154,15 +154,17 @@ class SigninSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
+        """
+        issue the tokens of the authenticated user,
+        the access token is stored according to ACCOUNT_TOKEN_PERSISTENCE
+        """
         user = validated_data['user']
 
         refresh = RefreshToken.for_user(user)
+        access = str(refresh.access_token)
+        persist_token(user, access)
 
-        user_token = User.objects.get(id=user.id)
-        user_token.token = str(refresh.access_token)
-        user_token.save()
-
-        return {'access': str(refresh.access_token), 'refresh': str(refresh)}
+        return {'access': access, 'refresh': str(refresh)}
 
     class Meta:
         """
@@ -186,7 +188,7 @@ class EmailValidatorSerializer(serializers.ModelSerializer):
         :param value: email
         :return: if exists: return Validation error else return value
         """
-        if User.objects.filter(email=value).exists():
+        if email_index.exists(value):
             raise serializers.ValidationError(EMAIL_VALIDATOR_VALIDATION_ERROR['email']['exits'])
         return value
 
@@ -213,7 +215,7 @@ class UsernameValidatorSerializer(serializers.ModelSerializer):
         :param value: username
         :return: if exists return Validation error ,else return value
         """
-        if User.objects.filter(username=value).exists():
+        if username_index.exists(value):
             raise serializers.ValidationError(USERNAME_VALIDATOR_VALIDATION_ERROR['username']['exits'])
         return value
 
@@ -223,3 +225,36 @@ class UsernameValidatorSerializer(serializers.ModelSerializer):
         """
         model = User
         fields = ['username']
+
+
+class BulkSignupSerializer(serializers.Serializer):
+    """
+    serializer for registering many users in one request
+
+    * each row is validated with SignupSerializer by account.bulk
+    """
+    users = serializers.ListField(child=serializers.DictField(), allow_empty=False,
+                                  max_length=BULK_SIGNUP['max_rows'],
+                                  error_messages=BULK_SIGNUP_VALIDATION_ERROR['users'])
+
+
+class StorageSerializer(serializers.ModelSerializer):
+    """
+    serializer for the storage used by the requested user, read from the User counters
+    """
+    storage_quota = serializers.SerializerMethodField()
+
+    @staticmethod
+    def get_storage_quota(instance):
+        """
+        :return: bytes the user can store, 0 for unlimited
+        """
+        return quota_of(instance.storage_quota)
+
+    class Meta:
+        """
+        class Meta for StorageSerializer
+        """
+        model = User
+        fields = ['storage_bytes', 'media_count', 'storage_quota']
+        read_only_fields = fields
@@ -0,0 +1,47 @@
+"""
+This module defines signal receivers of the User model.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from galleria.routers import stick_to_primary
+from .authentication import user_cache
+from .membership import username_index, email_index
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, **kwargs):
+    """
+    keep the username and email membership indexes in step with saved users
+    """
+    for index, value in ((username_index, instance.username), (email_index, instance.email)):
+        if value:
+            index.add(value)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    """
+    forget cached answers for the username and email of a deleted user
+    """
+    for index, value in ((username_index, instance.username), (email_index, instance.email)):
+        if value:
+            index.discard(value)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    """
+    drop a changed or deleted user from the authentication cache of this worker
+    """
+    user_cache.discard(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def read_saved_user_from_primary(sender, instance, **kwargs):
+    """
+    a new or changed user may not be on the replicas yet, e.g. right after signup
+    """
+    transaction.on_commit(lambda: stick_to_primary(instance.pk))
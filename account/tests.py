@@ -1,3 +1,260 @@
-from django.test import TestCase
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from galleria.routers import sticky_key
+from .authentication import CachedJWTAuthentication, user_cache
+from .bulk import bulk_signup, insert_users
+from .constants import AUTH_USER_CACHE, MEMBERSHIP, REGEX, SWEEP_MEDIA
+from .hashing import authenticate_user, hash_password, hash_passwords, submit
+from .membership import BloomFilter, MembershipIndex
+from .messages import BULK_SIGNUP_VALIDATION_ERROR
+from .models import User
+from .serializers import SignupSerializer
+from .validation import check_records, valid_username, valid_password
 
-# Create your tests here.
+
+@skipUnless('replica' in settings.DATABASES, 'no replica database configured')
+@override_settings(DATABASE_REPLICAS=['replica'], PASSWORD_HASHING_OFFLOAD=False)
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    Reads of safe requests go to the replica, writes and the reads of a user who just wrote go to default.
+    The replica is a test mirror of default, see galleria.settings_test.
+    It is skipped under settings without a replica alias.
+    """
+    # the runner sets up the databases of skipped tests too
+    databases = {'default', 'replica'} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='replica@user', email='replica@user.com',
+                                             password='Replica@123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_storage(self):
+        with CaptureQueriesContext(connections['default']) as default, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('Storage-list'))
+        self.assertEqual(response.status_code, 200)
+        return len(default), len(replica)
+
+    def test_new_user_reads_from_primary(self):
+        self.assertEqual(self.get_storage(), (1, 0))
+
+    def test_reads_go_to_replica(self):
+        cache.delete(sticky_key(self.user.pk))
+        self.assertEqual(self.get_storage(), (0, 1))
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        cache.delete(sticky_key(self.user.pk))
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.post(reverse('ImageGallery-list'), {'gallery_name': 'gallery'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(replica), 0)
+        self.assertEqual(self.get_storage(), (1, 0))
+
+    def test_signup_writes_to_primary(self):
+        data = {'first_name': 'Replica', 'last_name': 'Signup', 'username': 'replica@signup',
+                'email': 'replica@signup.com', 'contact': '9876543210', 'password': 'Replica@123'}
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = APIClient().post(reverse('signup-list'), data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(User.objects.using('default').filter(username='replica@signup').exists())
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    """
+    A saved user is evicted at once, a user changed without signals is refused within the TTL
+    """
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(username='cached@user', email='cached@user.com', password='Cached@123')
+        self.authentication = CachedJWTAuthentication()
+        self.token = self.authentication.get_validated_token(str(AccessToken.for_user(self.user)))
+
+    def test_saved_user_is_evicted(self):
+        self.assertEqual(self.authentication.get_user(self.token), self.user)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_updated_user_is_refused_within_ttl(self):
+        self.assertEqual(self.authentication.get_user(self.token), self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authentication.get_user(self.token), self.user)
+        expired = time.monotonic() + AUTH_USER_CACHE['ttl'] + 1
+        with mock.patch('account.caching.time.monotonic', return_value=expired):
+            with self.assertRaises(AuthenticationFailed):
+                self.authentication.get_user(self.token)
+
+
+class MembershipIndexTest(SimpleTestCase):
+    """
+    A stale Bloom filter keeps answering while it is rebuilt in the background
+    """
+    def test_stale_filter_answers_during_rebuild(self):
+        index = MembershipIndex('username')
+        index.bloom = BloomFilter(100, MEMBERSHIP['error_rate'])
+        index.bloom.add('taken@user')
+        index.built_at = time.monotonic() - MEMBERSHIP['refresh_interval'] - 1
+        building, release = threading.Event(), threading.Event()
+
+        def build():
+            building.set()
+            release.wait(10)
+            index.bloom, index.built_at = BloomFilter(100, MEMBERSHIP['error_rate']), time.monotonic()
+
+        with mock.patch.object(index, 'build', build):
+            self.assertTrue(index.might_exist('taken@user'))
+            self.assertTrue(building.wait(10))
+            self.assertFalse(index.might_exist('free@user'))
+            release.set()
+            self.assertTrue(index.lock.acquire(timeout=10))
+        self.assertFalse(index.is_stale())
+
+
+@override_settings(PASSWORD_HASHING_OFFLOAD=True)
+class PasswordHashingPoolTest(TestCase):
+    """
+    Passwords are hashed and verified in the spawned processes of the hashing pool
+    """
+    def test_hash_in_pool(self):
+        encoded = hash_password('Pool@1234')
+        self.assertTrue(check_password('Pool@1234', encoded))
+        self.assertEqual([check_password(password, encoded) for password, encoded
+                          in zip(['Pool@1234', 'Pool@5678'], hash_passwords(['Pool@1234', 'Pool@5678']))], [True, True])
+
+    def test_bulk_hashing_leaves_slots_to_logins(self):
+        pending, peak = [], []
+
+        def tracked_submit(function, *args, blocking=False):
+            future = submit(function, *args, blocking=blocking)
+            pending.append(future)
+            peak.append(sum(not future.done() for future in pending))
+            return future
+
+        passwords = [f'Pool@{index:04}' for index in range(12)]
+        with mock.patch('account.hashing.submit', tracked_submit):
+            encoded = hash_passwords(passwords)
+        self.assertTrue(all(check_password(password, hashed) for password, hashed in zip(passwords, encoded)))
+        self.assertLessEqual(max(peak), settings.PASSWORD_HASHING_WORKERS)
+        self.assertLessEqual(max(peak), max(1, settings.PASSWORD_HASHING_QUEUE_DEPTH // 2))
+
+    def test_authenticate_in_pool(self):
+        user = User.objects.create_user(username='pool@user', email='pool@user.com', password='Pool@1234')
+        self.assertEqual(authenticate_user('pool@user', 'Pool@1234'), user)
+        self.assertIsNone(authenticate_user('pool@user', 'Pool@5678'))
+        self.assertIsNone(authenticate_user('unknown@user', 'Pool@1234'))
+
+
+@override_settings(PASSWORD_HASHING_OFFLOAD=False)
+class BulkSignupTest(TestCase):
+    """
+    Invalid rows of a batch are reported by index and the other rows are still created
+    """
+    @staticmethod
+    def row(index, **fields):
+        return dict({'first_name': 'Bulk', 'last_name': 'User', 'username': f'bulk@user{index}',
+                     'email': f'bulk{index}@user.com', 'contact': '9876543210', 'password': 'Bulk@1234'}, **fields)
+
+    def test_mixed_batch_reports_invalid_rows(self):
+        result = bulk_signup([self.row(0), self.row(1, first_name='A' * 25), self.row(2)])
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([(error['row'], list(error['errors'])) for error in result['errors']], [(1, ['first_name'])])
+        self.assertEqual(User.objects.filter(username__startswith='bulk@').count(), 2)
+
+    def test_rows_breaking_a_rule_get_the_serializer_errors(self):
+        rows = [self.row(0, username='bulkuser0'), self.row(1, first_name='Bulk1', password='bulk@1234'),
+                self.row(2, first_name=' Bulk '), self.row(3, contact='98765x3210'), self.row(4, password='B@1')]
+        for index, errors in check_records(rows).items():
+            serializer = SignupSerializer(data=rows[index])
+            self.assertFalse(serializer.is_valid())
+            self.assertEqual(errors, serializer.errors)
+        self.assertEqual(sorted(check_records(rows)), [0, 1, 3])
+        result = bulk_signup(rows)
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([(error['row'], sorted(error['errors'])) for error in result['errors']],
+                         [(0, ['username']), (1, ['first_name', 'password']), (3, ['contact']), (4, ['password'])])
+
+    def test_rows_refused_by_the_database_are_reported(self):
+        rows = [(0, self.row(0)), (1, self.row(1, first_name='A' * 25)), (2, self.row(2))]
+        created, errors = insert_users(rows)
+        self.assertEqual([user.username for user in created], ['bulk@user0', 'bulk@user2'])
+        self.assertEqual(errors, [{'row': 1,
+                                   'errors': {'non_field_errors': [BULK_SIGNUP_VALIDATION_ERROR['not_stored']]}}])
+
+
+class SweepMediaDirectoriesTest(TestCase):
+    """
+    Old directories without a user are removed, the others are kept
+    """
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        User.objects.create_user(username='sweep@user', email='sweep@user.com', password='Sweep@1234')
+
+    def make_directory(self, name, age):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(path)
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+
+    def test_sweep(self):
+        old = SWEEP_MEDIA['min_age'] + 60
+        ages = dict.fromkeys(SWEEP_MEDIA['reserved'], old)
+        ages.update({'orphan@user': old, 'sweep@user': old, 'signup@user': 0})
+        for name, age in ages.items():
+            self.make_directory(name, age)
+        with override_settings(MEDIA_ROOT=self.media_root):
+            call_command('sweep_media_directories', stdout=io.StringIO())
+        self.assertEqual(sorted(os.listdir(self.media_root)), sorted(['sweep@user', 'signup@user',
+                                                                      *SWEEP_MEDIA['reserved']]))
+
+
+class ValidationTest(SimpleTestCase):
+    """
+    The username and password validators accept what the REGEX patterns matched as a whole
+    """
+    USERNAMES = ['gallery@user1', 'galleryuser1', '12345678@', 'gal@1', 'gallery user@1', 'gällery@user1',
+                 '@@@@@@@@', 'a@' * 100, '', 'gallery@user1\n', '\ngallery@user1']
+    PASSWORDS = ['Gallery@123', 'Gallery@abc', 'gallery@123', 'GALLERY@123', 'Gallery123', 'Gal@1',
+                 'Gallery@12345678', 'Gallery@123456789', 'Gallery@12 3', 'Gallery~123', '', 'Gallery@123\n']
+
+    def test_username(self):
+        for value in self.USERNAMES:
+            with self.subTest(value=value):
+                matches = re.fullmatch(REGEX['USERNAME'], value) is not None
+                self.assertEqual(valid_username(value, require_letter=False), matches)
+                self.assertEqual(valid_username(value), matches and any(char.isalpha() for char in value))
+
+    def test_password(self):
+        for value in self.PASSWORDS:
+            with self.subTest(value=value):
+                self.assertEqual(valid_password(value), re.fullmatch(REGEX['PASSWORD'], value) is not None)
+
+    def test_trailing_newline_is_rejected(self):
+        # re.match with `$` accepted a value ending with a newline
+        self.assertTrue(re.match(REGEX['USERNAME'], 'gallery@user1\n'))
+        self.assertFalse(valid_username('gallery@user1\n'))
+        self.assertTrue(re.match(REGEX['PASSWORD'], 'Gallery@123\n'))
+        self.assertFalse(valid_password('Gallery@123\n'))
@@ -0,0 +1,96 @@
+"""
+This module stores the access token issued at signin in `User.token`.
+
+ACCOUNT_TOKEN_PERSISTENCE selects how:
+
+* 'update': one UPDATE of the token column, `updated_at` is left untouched
+* 'write_behind': tokens are queued and written by a background thread,
+  several signins of the same user are coalesced into one UPDATE
+* 'off': tokens are not stored, JWTs are verified from their signature only
+"""
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from .constants import TOKEN_WRITE_BEHIND
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class TokenWriter:
+    """
+    Background writer of the latest token of each user
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def enqueue(self, user_id, token):
+        with self.lock:
+            self.pending[user_id] = token
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='token-writer', daemon=True)
+                self.thread.start()
+            if len(self.pending) >= TOKEN_WRITE_BEHIND['max_pending']:
+                self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('could not write signin tokens')
+            finally:
+                connection.close()
+
+    def flush(self):
+        """
+        write the queued tokens in one transaction
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        with transaction.atomic():
+            for user_id, token in pending.items():
+                User.objects.filter(pk=user_id).update(token=token)
+
+
+writer = TokenWriter(TOKEN_WRITE_BEHIND['interval'])
+atexit.register(writer.flush)
+
+
+def persist_token(user, token):
+    """
+    store the access token issued to user according to ACCOUNT_TOKEN_PERSISTENCE
+    """
+    mode = settings.ACCOUNT_TOKEN_PERSISTENCE
+    if mode == 'off':
+        return
+    if mode == 'write_behind':
+        writer.enqueue(user.pk, token)
+        return
+    User.objects.filter(pk=user.pk).update(token=token)
+    user.token = token
+
+
+async def apersist_token(user, token):
+    """
+    async version of persist_token
+    """
+    mode = settings.ACCOUNT_TOKEN_PERSISTENCE
+    if mode == 'off':
+        return
+    if mode == 'write_behind':
+        writer.enqueue(user.pk, token)
+        return
+    await User.objects.filter(pk=user.pk).aupdate(token=token)
+    user.token = token
@@ -4,16 +4,26 @@ account URL Configuration
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, async_views
 
 router = DefaultRouter()
 """
 Routing for Signup and Signin
 """
 router.register('Signup', views.SignupView, basename='signup')
+router.register('BulkSignup', views.BulkSignupView, basename='BulkSignup')
 router.register('Signin', views.SigninView, basename='signin')
 router.register('EmailValidator', views.EmailValidatorView, basename='EmailValidator')
 router.register('UsernameValidator', views.UsernameValidatorView, basename='UsernameValidator')
+router.register('Storage', views.StorageView, basename='Storage')
+"""
+async versions of Signup, Signin and the validators, for ASGI deployments
+"""
 urlpatterns = [
+    path('async/Signup/', async_views.AsyncSignupView.as_view(), name='async-signup'),
+    path('async/Signin/', async_views.AsyncSigninView.as_view(), name='async-signin'),
+    path('async/EmailValidator/', async_views.AsyncEmailValidatorView.as_view(), name='async-EmailValidator'),
+    path('async/UsernameValidator/', async_views.AsyncUsernameValidatorView.as_view(),
+         name='async-UsernameValidator'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,111 @@
+"""
+This module validates the characters of the account fields, shared by the account serializers.
+
+* the name and contact patterns of REGEX are compiled once, at import
+* the username and password rules are checked in one pass building the set of the characters
+  of the value, compared with the allowed and the required character classes, instead of
+  a regex with one lookahead per required class
+* check_records validates many records at once, each distinct value of a field is checked once
+
+Values must match as a whole, a trailing newline is rejected.
+"""
+import re
+import string
+from .constants import REGEX, MIN_LENGTH, MAX_LENGTH, USERNAME_SPECIALS, PASSWORD_SPECIALS
+from .messages import SIGNUP_VALIDATION_ERROR
+
+PATTERNS = {field: re.compile(REGEX[field]) for field in ('first_name', 'last_name', 'contact')}
+
+LOWERCASE = frozenset(string.ascii_lowercase)
+UPPERCASE = frozenset(string.ascii_uppercase)
+LETTERS = LOWERCASE | UPPERCASE
+DIGITS = frozenset(string.digits)
+ALPHANUMERIC = LETTERS | DIGITS
+USERNAME_SPECIAL_CHARACTERS = frozenset(USERNAME_SPECIALS)
+USERNAME_CHARACTERS = ALPHANUMERIC | USERNAME_SPECIAL_CHARACTERS
+PASSWORD_SPECIAL_CHARACTERS = frozenset(PASSWORD_SPECIALS)
+PASSWORD_CHARACTERS = ALPHANUMERIC | PASSWORD_SPECIAL_CHARACTERS
+
+
+def valid_first_name(value):
+    return PATTERNS['first_name'].fullmatch(value) is not None
+
+
+def valid_last_name(value):
+    return PATTERNS['last_name'].fullmatch(value) is not None
+
+
+def valid_contact(value):
+    return PATTERNS['contact'].fullmatch(value) is not None
+
+
+def valid_username(value, require_letter=True):
+    """
+    at least 8 characters, alphanumeric or USERNAME_SPECIALS, with a special character
+    and a letter, or a digit when require_letter is False
+    :param value: username
+    """
+    if len(value) < MIN_LENGTH['username']:
+        return False
+    characters = set(value)
+    return (characters <= USERNAME_CHARACTERS
+            and not characters.isdisjoint(USERNAME_SPECIAL_CHARACTERS)
+            and not characters.isdisjoint(LETTERS if require_letter else ALPHANUMERIC))
+
+
+def valid_password(value):
+    """
+    8 to 16 characters, alphanumeric or PASSWORD_SPECIALS, with a digit, a lowercase
+    and an uppercase letter and a special character
+    :param value: password
+    """
+    if not MIN_LENGTH['password'] <= len(value) <= MAX_LENGTH['password']:
+        return False
+    characters = set(value)
+    return (characters <= PASSWORD_CHARACTERS
+            and not characters.isdisjoint(DIGITS)
+            and not characters.isdisjoint(LOWERCASE)
+            and not characters.isdisjoint(UPPERCASE)
+            and not characters.isdisjoint(PASSWORD_SPECIAL_CHARACTERS))
+
+
+
+SIGNUP_RULES = {
+    'first_name': valid_first_name,
+    'last_name': valid_last_name,
+    'username': valid_username,
+    'contact': valid_contact,
+    'password': valid_password,
+}
+
+
+def check_records(records, rules=None):
+    """
+    validate the fields of many records
+    :param records: iterable of dicts, other records are left to the serializer
+    :param rules: {field: function returning whether a value is valid}, SIGNUP_RULES by default
+    :return: {index of the record: {field: [message]}} of the records breaking a rule.
+             Missing and non string values, values with surrounding whitespace and values
+             outside the length bounds of the field are left to the serializer, so a reported
+             field gets the message SignupSerializer would give it
+    """
+    rules = SIGNUP_RULES if rules is None else rules
+    checked = {field: {} for field in rules}
+    errors = {}
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            continue
+        record_errors = {}
+        for field, rule in rules.items():
+            value = record.get(field)
+            if not isinstance(value, str) or value != value.strip() \
+                    or not MIN_LENGTH.get(field, 1) <= len(value) <= MAX_LENGTH.get(field, len(value)):
+                continue
+            valid = checked[field].get(value)
+            if valid is None:
+                valid = checked[field][value] = rule(value)
+            if not valid:
+                record_errors[field] = [SIGNUP_VALIDATION_ERROR[field]['invalid']]
+        if record_errors:
+            errors[index] = record_errors
+    return errors
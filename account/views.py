@@ -5,7 +5,10 @@ view for SignupView
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import SignupSerializer, SigninSerializer, UsernameValidatorSerializer, EmailValidatorSerializer
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from .bulk import bulk_signup
+from .serializers import SignupSerializer, SigninSerializer, UsernameValidatorSerializer, EmailValidatorSerializer, \
+    BulkSignupSerializer, StorageSerializer
 from .models import User
 
 
@@ -28,6 +31,30 @@ class SignupView(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkSignupView(viewsets.ModelViewSet):
+    """
+    BulkSignupView class to register many users in one request.
+    Only staff users can use it.
+
+    * invalid rows are reported by index and the other rows are still created
+    """
+    queryset = User
+    serializer_class = BulkSignupSerializer
+    permission_classes = [IsAdminUser]
+    http_method_names = ['post']
+
+    def create(self, request, *args, **kwargs):
+        """
+        creates the requested users
+        """
+        serializer = self.serializer_class(data=request.data)
+        if serializer.is_valid():
+            result = bulk_signup(serializer.validated_data['users'])
+            response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+            return Response(result, status=response_status)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class SigninView(viewsets.ModelViewSet):
     """
     Allow only authenticated user to signin.
@@ -92,3 +119,27 @@ class UsernameValidatorView(viewsets.ModelViewSet):
         if serializer.is_valid(raise_exception=True):
             return Response(serializer.validated_data, status=status.HTTP_200_OK)
         return Response(status=status.HTTP_400_BAD_REQUEST)
+
+
+class StorageView(viewsets.ModelViewSet):
+    """
+    StorageView class to show the storage used by the requested user and its quota
+    """
+    serializer_class = StorageSerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get']
+
+    def get_queryset(self):
+        """
+        get queryset of User Model for the requested user
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return User.objects.none()
+        return User.objects.filter(pk=self.request.user.pk)
+
+    def list(self, request, *args, **kwargs):
+        """
+        counters of the requested user, read fresh from the database
+        """
+        user = self.get_queryset().only('storage_bytes', 'media_count', 'storage_quota').get()
+        return Response(self.get_serializer(user).data, status=status.HTTP_200_OK)
@@ -0,0 +1,14 @@
+"""
+This module defines Django admin representing blob .
+This admin associated with its respective Blob model.
+"""
+from django.contrib import admin
+from blob.models import Blob
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    """
+    Class BlobAdmin display all the fields of Blob model in admin panel
+    """
+    list_display = ('digest', 'name', 'size', 'references', 'created_at', 'updated_at')
@@ -0,0 +1,97 @@
+"""
+This module streams ZIP archives of media files, used by the gallery download actions.
+
+The archive is written by zipfile into a sink that is drained after every chunk, so nothing
+is buffered beyond one chunk whatever the size of the gallery. Entries are stored without
+compression, images and videos are compressed already, and always carry ZIP64 sizes so
+files and archives above 4 GiB are valid. The output is not seekable, zipfile then writes
+the CRC and sizes of each entry in a data descriptor after its data.
+"""
+import os
+import time
+import zipfile
+from urllib.parse import quote
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import StreamingHttpResponse
+from django.utils.text import get_valid_filename
+from .constants import ARCHIVE_CHUNK_SIZE
+
+# earliest date representable in a ZIP entry
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+class StreamSink:
+    """
+    write only file object collecting what zipfile writes until it is drained
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def safe_name(name, default):
+    """
+    name usable as a file or directory name in an archive
+    :param name: e.g. the name of a gallery
+    :param default: used when nothing of name is usable
+    """
+    try:
+        return get_valid_filename(name)
+    except SuspiciousFileOperation:
+        return str(default)
+
+
+def zip_stream(entries, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    generate a ZIP archive chunk by chunk.
+    Missing files are skipped, a gallery can change while it is downloaded.
+    :param entries: iterable of (name in the archive, path of the file)
+    :return: generator of bytes
+    """
+    sink = StreamSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for arcname, path in entries:
+            try:
+                source = open(path, 'rb')
+            except OSError:
+                continue
+            with source:
+                modified = time.localtime(os.fstat(source.fileno()).st_mtime)[:6]
+                info = zipfile.ZipInfo(arcname, date_time=max(modified, ZIP_EPOCH))
+                info.compress_type = zipfile.ZIP_STORED
+                with archive.open(info, 'w', force_zip64=True) as target:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def zip_response(filename, entries):
+    """
+    response streaming the archive of entries as an attachment
+    :param filename: name of the archive offered to the client
+    :param entries: iterable of (name in the archive, path of the file)
+    """
+    response = StreamingHttpResponse((chunk for chunk in zip_stream(entries) if chunk),
+                                     content_type='application/zip')
+    response['Content-Disposition'] = f"attachment; filename*=utf-8''{quote(filename)}"
+    response['Cache-Control'] = 'private, no-store'
+    # let a buffering proxy pass the chunks through as they are produced
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,13 @@
+"""
+It contains all constant values
+"""
+# blobs are stored as MEDIA_ROOT/blobs/<digest[:2]>/<digest[2:4]>/<digest><extension>
+BLOB_DIRECTORY = 'blobs'
+TEMPORARY_DIRECTORY = 'tmp'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+MAX_EXTENSION_LENGTH = 10
+
+# bytes read from a media file per chunk of a streamed ZIP archive
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
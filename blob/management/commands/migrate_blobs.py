@@ -0,0 +1,54 @@
+"""
+Management command moving the files of Image and Video rows into the content addressed storage.
+"""
+import os
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from blob.storage import ContentAddressedStorage
+from image.models import Image
+from video.models import Video
+
+
+class Command(BaseCommand):
+    """
+    Move every legacy Image and Video file into blobs/, sharing the blob of identical files,
+    and report the space reclaimed by the deduplication. The content_hash of the Image rows
+    is set from the digest of their blob.
+    """
+    help = 'Move Image and Video files into the content addressed storage and report reclaimed space'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='only count the legacy files, do not move them')
+
+    def handle(self, *args, **options):
+        migrated = missing = reclaimed = 0
+        for model, field in ((Image, 'image'), (Video, 'video')):
+            legacy = (model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                      .exclude(**{f'{field}__startswith': 'blobs/'}))
+            names = legacy.order_by(field).values_list(field, flat=True).distinct()
+            for name in names.iterator():
+                path = default_storage.path(name)
+                if not os.path.exists(path):
+                    missing += 1
+                    self.stderr.write(f'missing file {name}')
+                    continue
+                migrated += 1
+                if options['dry_run']:
+                    continue
+                size = os.path.getsize(path)
+                with transaction.atomic():
+                    references = model.objects.filter(**{field: name}).count()
+                    blob_name, created = default_storage.ingest(path, name, references=references)
+                    values = {field: blob_name}
+                    if model is Image:
+                        # the digest of the blob is the key of the image derivatives
+                        values['content_hash'] = ContentAddressedStorage.digest(blob_name)
+                    model.objects.filter(**{field: name}).update(**values)
+                if not created:
+                    reclaimed += size
+
+        action = 'Found' if options['dry_run'] else 'Migrated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {migrated} files, {missing} missing, reclaimed {reclaimed} bytes'))
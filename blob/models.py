@@ -0,0 +1,30 @@
+"""
+This module defines Django model `Blob` representing a file stored once by its content.
+This model is associated with its respective database table specified in its `Meta` class.
+"""
+from django.db import models
+
+
+class Blob(models.Model):
+    """
+    The Blob model with the SHA-256 digest of a file and the number of
+    Image and Video rows referencing it.
+
+    * the file is removed when references drops to zero
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        """
+        Use the Meta class to specify the database table
+        for Blob model
+        """
+        db_table = 'Blob'
@@ -0,0 +1,69 @@
+"""
+This module contains the HTTP Range helpers used by `MediaView`.
+"""
+import re
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """
+    raised when a Range header points outside the file
+    """
+
+
+def parse_range(header, size):
+    """
+    parse a single byte range of a Range header
+    :param header: value of the Range header
+    :param size: size of the file
+    :return: (start, length), or None to serve the whole file
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # multiple or malformed ranges, the whole file is an allowed answer
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            raise RangeNotSatisfiable
+    else:
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiable
+        start = max(size - suffix, 0)
+        end = size - 1
+    return start, end - start + 1
+
+
+class RangeFile:
+    """
+    file like object exposing `length` bytes of a file from `start`.
+
+    `fileno` is kept, so a WSGI server implementing wsgi.file_wrapper with sendfile
+    sends the range from the current position without copying it through Python.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    @staticmethod
+    def seekable():
+        return False
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,167 @@
+"""
+This module defines the content addressed storage used for Image and Video files.
+
+Files are hashed while they are streamed to disk and stored once under their SHA-256,
+so uploading the same bytes again only adds a reference to the existing Blob.
+The reference is taken in the transaction of the caller and the file is only put in place
+once that transaction commits, so a rollback leaves neither a reference nor a file behind.
+"""
+import hashlib
+import os
+import tempfile
+import weakref
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+from .constants import BLOB_DIRECTORY, TEMPORARY_DIRECTORY, HASH_CHUNK_SIZE, MAX_EXTENSION_LENGTH
+from .models import Blob
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class PendingFile:
+    """
+    on_commit callback putting the source of a committed blob in place.
+    A temporary source is removed when the transaction rolls back, which drops the callback.
+    """
+
+    def __init__(self, storage, source, name, temporary):
+        self.storage, self.source, self.name = storage, source, name
+        self.finalizer = weakref.finalize(self, remove_file, source) if temporary else None
+
+    def __call__(self):
+        if self.finalizer is not None:
+            self.finalizer.detach()
+        self.storage.place(self.source, self.name)
+
+
+@deconstructible(path='blob.storage.ContentAddressedStorage')
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage storing every file as blobs/<digest[:2]>/<digest[2:4]>/<digest><extension>
+
+    * names outside the blobs directory are legacy files, handled like FileSystemStorage
+    * every save adds a reference to the Blob, every delete releases one
+    """
+
+    @staticmethod
+    def blob_name(digest, name):
+        """
+        name of the blob of a digest, keeping the extension of the original name
+        """
+        extension = os.path.splitext(name)[1].lower()
+        if len(extension) > MAX_EXTENSION_LENGTH or not extension[1:].isalnum():
+            extension = ''
+        return os.path.join(BLOB_DIRECTORY, digest[:2], digest[2:4], digest + extension)
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name) and name.startswith(BLOB_DIRECTORY + '/')
+
+    @staticmethod
+    def digest(name):
+        """
+        :return: SHA-256 of a blob name, or None for legacy names
+        """
+        if not ContentAddressedStorage.is_blob(name):
+            return None
+        return os.path.splitext(os.path.basename(name))[0]
+
+    def temporary_file(self):
+        directory = self.path(os.path.join(BLOB_DIRECTORY, TEMPORARY_DIRECTORY))
+        os.makedirs(directory, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=directory, delete=False)
+
+    def get_available_name(self, name, max_length=None):
+        """
+        blob names are derived from the content, there is nothing to make unique
+        """
+        return name
+
+    def _save(self, name, content):
+        """
+        stream content into a temporary file while hashing it, then commit it as a blob
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with self.temporary_file() as temporary:
+            for chunk in content.chunks(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+                temporary.write(chunk)
+                size += len(chunk)
+        name, _ = self.commit(temporary.name, digest.hexdigest(), size, name, temporary=True)
+        return name
+
+    def ingest(self, path, name, references=1):
+        """
+        move a file already on disk into the storage, reading it once to hash it
+        :param path: absolute path of the file, it is consumed once the transaction commits
+        :param name: original name, only its extension is kept
+        :param references: number of rows that will reference the blob
+        :return: blob name, and False when the same content was already stored
+        """
+        return self.commit(path, self.hash_file(path), os.path.getsize(path), name, references)
+
+    @staticmethod
+    def hash_file(path):
+        """
+        SHA-256 of a file on disk, read once by chunks
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def commit(self, source, digest, size, name, references=1, temporary=False):
+        """
+        add references to the blob of digest in the current transaction. Once it commits, source is
+        moved into place when the blob file does not exist yet, and discarded otherwise.
+        Callers must insert the rows referencing the blob in the same transaction.
+        :param temporary: source is a temporary file, removed if the transaction rolls back
+        :return: blob name, and False when the same content was already stored
+        """
+        with transaction.atomic():
+            blob, created = Blob.objects.select_for_update().get_or_create(
+                digest=digest, defaults={'name': self.blob_name(digest, name), 'size': size,
+                                         'references': references})
+            if not created:
+                Blob.objects.filter(digest=digest).update(references=F('references') + references)
+        transaction.on_commit(PendingFile(self, source, blob.name, temporary))
+        return blob.name, created
+
+    def place(self, source, name):
+        """
+        move source to the path of the blob name, or remove it when the blob file already exists
+        """
+        path = self.path(name)
+        if os.path.exists(path):
+            remove_file(source)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source, path)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+
+    def delete(self, name):
+        """
+        release a reference to a blob, the file is removed with its last reference
+        """
+        if not self.is_blob(name):
+            return super().delete(name)
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(digest=self.digest(name)).first()
+            if blob is None:
+                return None
+            if blob.references > 1:
+                Blob.objects.filter(digest=blob.digest).update(references=F('references') - 1)
+                return None
+            blob.delete()
+            super().delete(name)
+        return None
@@ -0,0 +1,129 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from account.models import User
+from image.models import ImageGallery, Image
+from .constants import BLOB_DIRECTORY, TEMPORARY_DIRECTORY
+from .models import Blob
+from .storage import ContentAddressedStorage
+
+
+class BlobCommitTest(TestCase):
+    """
+    The reference of a blob belongs to the transaction of the row, its file is placed when it commits
+    """
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        user = User.objects.create_user(username='blob@user', email='blob@user.com', password='Blob@1234')
+        self.gallery = ImageGallery.objects.create(gallery_name='gallery', user=user)
+
+    def temporary_files(self):
+        return os.listdir(default_storage.path(os.path.join(BLOB_DIRECTORY, TEMPORARY_DIRECTORY)))
+
+    def test_file_is_placed_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(image_gallery=self.gallery, image=ContentFile(b'content', name='a.png'))
+        self.assertTrue(os.path.exists(default_storage.path(image.image.name)))
+        with self.captureOnCommitCallbacks(execute=True):
+            Image.objects.create(image_gallery=self.gallery, image=ContentFile(b'content', name='b.png'))
+        self.assertEqual(Blob.objects.get().references, 2)
+        self.assertEqual(self.temporary_files(), [])
+
+    def test_migrate_blobs_sets_the_content_hash(self):
+        name = os.path.join('blob@user', 'images', 'legacy.png')
+        os.makedirs(os.path.dirname(default_storage.path(name)))
+        with open(default_storage.path(name), 'wb') as legacy:
+            legacy.write(b'legacy content')
+        images = [Image.objects.create(image_gallery=self.gallery, image=name) for _ in range(2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('migrate_blobs', stdout=io.StringIO())
+        digest = hashlib.sha256(b'legacy content').hexdigest()
+        for image in images:
+            image.refresh_from_db()
+            self.assertEqual(image.content_hash, digest)
+            self.assertEqual(ContentAddressedStorage.digest(image.image.name), digest)
+        self.assertEqual(Blob.objects.get().references, 2)
+        self.assertTrue(os.path.exists(default_storage.path(images[0].image.name)))
+
+    def test_rollback_leaves_no_reference_nor_file(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                image = Image.objects.create(image_gallery=self.gallery, image=ContentFile(b'content', name='a.png'))
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(os.path.exists(default_storage.path(image.image.name)))
+        self.assertEqual(self.temporary_files(), [])
+
+
+@override_settings(MEDIA_ACCEL_REDIRECT='')
+class MediaViewTest(APITestCase):
+    """
+    A media file is served to the owner of its gallery only, with Range and conditional requests
+    """
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create_user(username='media@user', email='media@user.com', password='Media@1234')
+        self.content = b'0123456789abcdefghij'
+        gallery = ImageGallery.objects.create(gallery_name='gallery', user=self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.image = Image.objects.create(image_gallery=gallery, image=ContentFile(self.content, name='a.png'))
+        self.url = reverse('media', args=[self.image.image.name])
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_other_user_is_refused(self):
+        other = User.objects.create_user(username='other@user', email='other@user.com', password='Other@1234')
+        self.client.force_authenticate(other)
+        response, _ = self.get()
+        self.assertIn(response.status_code, (403, 404))
+        self.client.force_authenticate(None)
+        self.assertIn(self.get()[0].status_code, (401, 403))
+
+    def test_owner_gets_the_file(self):
+        self.client.force_authenticate(self.owner)
+        response, content = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range(self):
+        self.client.force_authenticate(self.owner)
+        response, content = self.get(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(content, self.content[:10])
+        self.assertEqual(response['Content-Range'], f'bytes 0-9/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_unsatisfiable_range(self):
+        self.client.force_authenticate(self.owner)
+        response, _ = self.get(HTTP_RANGE='bytes=100-200')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_none_match(self):
+        self.client.force_authenticate(self.owner)
+        etag = self.get()[0]['ETag']
+        response, content = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(content, b'')
@@ -0,0 +1,73 @@
+"""
+This module defines the upload handler streaming multipart files into the blob storage.
+
+Each part is written to a temporary file next to the blobs while it is hashed, so a
+validated upload is committed with a rename and no second read of its bytes.
+"""
+import hashlib
+import os
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashedUploadedFile(UploadedFile):
+    """
+    uploaded file kept in the temporary directory of the blob storage
+
+    * `digest` is the SHA-256 of the content
+    * `temporary_file_path()` is consumed by ContentAddressedStorage.commit, `committed` is set once it is
+      handed to it and the storage removes it instead
+    """
+
+    def __init__(self, file, name, content_type, size, charset, digest, content_type_extra=None):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.digest = digest
+        self.committed = False
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def discard(self):
+        """
+        remove the temporary file unless it was handed to the storage
+        """
+        self.close()
+        if self.committed:
+            return
+        try:
+            os.remove(self.temporary_file_path())
+        except FileNotFoundError:
+            pass
+
+
+class BlobUploadHandler(FileUploadHandler):
+    """
+    upload handler hashing every file while it is written to the blob storage.
+    It has to be the only handler of the request.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = default_storage.temporary_file()
+        self.hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.flush()
+        self.file.seek(0)
+        uploaded = HashedUploadedFile(self.file, self.file_name, self.content_type, file_size, self.charset,
+                                      self.hash.hexdigest(), self.content_type_extra)
+        self.file = None
+        return uploaded
+
+    def upload_interrupted(self):
+        if self.file is not None:
+            self.file.close()
+            try:
+                os.remove(self.file.name)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,112 @@
+"""
+view for MediaView
+
+"""
+import mimetypes
+import os
+import posixpath
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from image.models import Image
+from video.constants import UPLOAD_DIRECTORY
+from video.models import Video
+from .serving import parse_range, RangeFile, RangeNotSatisfiable
+from .storage import ContentAddressedStorage
+
+# HLS playlists and segments, unknown to some platforms' mime types
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/mp2t', '.ts')
+
+
+def can_access(user, name):
+    """
+    check that the user owns a gallery holding the file
+    :param user: requested user
+    :param name: name of the file relative to MEDIA_ROOT
+    :return: True if the user may read the file
+    """
+    directory = name.split('/', 1)[0]
+    if directory == user.username:
+        # derived files of the user, part files of uploads in progress are private to the upload
+        return name.split('/')[1:2] != [UPLOAD_DIRECTORY]
+    return (Image.objects.filter(image=name, image_gallery__user=user).exists() or
+            Video.objects.filter(video=name, video_gallery__user=user).exists())
+
+
+class MediaView(APIView):
+    """
+    MediaView class serving the media files of the requested user.
+
+    * supports Range requests, answering 206 with the requested bytes
+    * answers 304 to If-None-Match / If-Modified-Since
+    * files are sent with wsgi.file_wrapper so the server can use sendfile
+    * with MEDIA_ACCEL_REDIRECT set, only an X-Accel-Redirect header is returned
+      and the front proxy sends the file
+    """
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        """
+        media are requested with any Accept header, errors are rendered with the first renderer
+        """
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, name):
+        """
+        send the file, or the requested range of it
+        """
+        name = posixpath.normpath(name)
+        if name.startswith(('.', '/')) or not can_access(request.user, name):
+            raise NotFound()
+        path = default_storage.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise NotFound()
+
+        digest = ContentAddressedStorage.digest(name)
+        etag = quote_etag(digest or f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            response = self.file_response(request, name, path, stat.st_size, etag)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = 'private, max-age=31536000, immutable' if digest else 'private, no-cache'
+        return response
+
+    @staticmethod
+    def file_response(request, name, path, size, etag):
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if settings.MEDIA_ACCEL_REDIRECT:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT + name
+            return response
+
+        byte_range = None
+        range_header = request.META.get('HTTP_RANGE')
+        if range_header and request.META.get('HTTP_IF_RANGE', etag) == etag:
+            try:
+                byte_range = parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        file = open(path, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, length = byte_range
+            response = FileResponse(RangeFile(file, start, length), content_type=content_type,
+                                    status=status.HTTP_206_PARTIAL_CONTENT)
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
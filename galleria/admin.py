@@ -0,0 +1,144 @@
+"""
+This module defines `LargeTableAdmin`, the base ModelAdmin of the tables holding millions of rows.
+
+* the changelist count is estimated from the pg statistics instead of a COUNT(*)
+* the changelist loads only the `list_only` columns, relations come from list_select_related
+* `?before=<pk>` pages by primary key, the "Older" link replaces deep OFFSET pages
+* search matches the `search_fields` exactly, so the lookups use their indexes
+"""
+import json
+from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR, PAGE_VAR
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, transaction, DatabaseError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+KEYSET_VAR = 'before'
+
+# below this estimate the exact count is cheap enough
+EXACT_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting large querysets from the planner estimate
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        try:
+            # in a savepoint, a failed estimate must not abort the transaction of the request
+            with transaction.atomic(using=queryset.db):
+                estimate = self.estimate(queryset)
+        except DatabaseError:
+            estimate = None
+        if estimate is None or estimate < EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+    @staticmethod
+    def estimate(queryset):
+        """
+        rows of the table from pg_class when the queryset is not filtered,
+        otherwise the rows the planner expects for the query
+        """
+        if queryset.query.is_empty():
+            # queryset.none(), e.g. an invalid ?before= or search term, has no SQL to explain
+            return 0
+        connection = connections[queryset.db]
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                # the table names are mixed case, regclass folds unquoted names to lower case
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                               [connection.ops.quote_name(queryset.model._meta.db_table)])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList loading `list_only` columns and accepting `?before=<pk>`
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.before = request.GET.get(KEYSET_VAR)
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(KEYSET_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.model_admin.list_only:
+            queryset = queryset.only(*self.model_admin.list_only)
+        if self.before:
+            try:
+                before = self.model._meta.pk.to_python(self.before)
+            except ValidationError:
+                return queryset.none()
+            queryset = queryset.filter(pk__lt=before)
+        return queryset
+
+    def get_next_url(self):
+        """
+        query string of the rows after the current page, None when it is the last one
+        or when the list is sorted on a column
+        """
+        if ORDER_VAR in self.params or not self.result_list or not self.multi_page:
+            return None
+        last = self.result_list[len(self.result_list) - 1]
+        return self.get_query_string({KEYSET_VAR: last.pk}, [PAGE_VAR])
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for tables with millions of rows, see the module docstring
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    list_per_page = 50
+    list_only = None
+    change_list_template = 'admin/keyset_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        exact matches of the term on search_fields, integer fields only for integer terms
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        query = Q()
+        for field in self.search_fields:
+            name = field.lstrip('=^@')
+            model_field = get_fields_from_path(queryset.model, name)[-1]
+            try:
+                value = model_field.to_python(term)
+            except ValidationError:
+                continue
+            query |= Q(**{name: value})
+        if not query:
+            return queryset.none(), False
+        return queryset.filter(query), False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if isinstance(changelist, KeysetChangeList):
+            response.context_data['keyset_next_url'] = changelist.get_next_url()
+        return response
@@ -0,0 +1,108 @@
+"""
+This module caches the gallery listing responses and answers conditional GETs.
+
+Every user and every gallery has a stamp in the django cache, replaced when the galleries
+of the user or the media of the gallery change. The ETag of a response is derived from the
+stamp and the request, so a matching If-None-Match is answered 304 and a known ETag is
+answered from the cached data, in both cases without a database query.
+Stamps are only shared between workers through a shared CACHE_BACKEND (redis, memcached),
+with a process local backend GALLERY_RESPONSE_CACHE is off and the responses are rendered
+on every request without an ETag.
+"""
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .routers import primary_reads
+
+
+def user_stamp_key(namespace, user_id):
+    return f'galleria:stamp:{namespace}:user:{user_id}'
+
+
+def gallery_stamp_key(namespace, gallery_id):
+    return f'galleria:stamp:{namespace}:gallery:{gallery_id}'
+
+
+def bump_stamps(namespace, user_id, gallery_id=None):
+    """
+    replace the stamps of a user and of one of its galleries once the transaction commits,
+    the responses cached under the previous stamps are never served again
+    :param namespace: 'image' or 'video'
+    """
+    keys = [user_stamp_key(namespace, user_id)]
+    if gallery_id is not None:
+        keys.append(gallery_stamp_key(namespace, gallery_id))
+    transaction.on_commit(lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, None))
+
+
+def get_stamp(key):
+    """
+    current stamp of key, a new one when it is missing or was evicted
+    """
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        stamp = cache.get(key)
+    return stamp
+
+
+class StampedCacheMixin:
+    """
+    Cache list and retrieve responses of a viewset under an ETag versioned by stamps.
+
+    * `cache_namespace` names the stamps of the viewset
+    * list is versioned by the stamp of the user, retrieve by the stamp of the gallery
+      whose id is the `gallery_lookup` kwarg, or by the stamp of the user when it is None
+    * only 200 responses are cached, for GALLERY_RESPONSE_CACHE_TIMEOUT seconds
+    * nothing is cached without GALLERY_RESPONSE_CACHE
+    """
+    cache_namespace = None
+    gallery_lookup = 'pk'
+
+    def get_etag(self, request, stamp_key):
+        """
+        strong ETag of the response to request under the current stamp
+        """
+        key = '|'.join([stamp_key, get_stamp(stamp_key), str(request.user.pk),
+                        request.build_absolute_uri(), request.META.get('HTTP_ACCEPT', '')])
+        return quote_etag(hashlib.sha256(key.encode()).hexdigest())
+
+    def cached_response(self, request, stamp_key, render, *args, **kwargs):
+        if not settings.GALLERY_RESPONSE_CACHE:
+            return render(request, *args, **kwargs)
+        etag = self.get_etag(request, stamp_key)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data_key = f'galleria:response:{etag}'
+            data = cache.get(data_key)
+            if data is not None:
+                response = Response(data, status=status.HTTP_200_OK)
+            else:
+                # a lagging replica would cache stale data under the new stamp
+                with primary_reads():
+                    response = render(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(data_key, response.data, settings.GALLERY_RESPONSE_CACHE_TIMEOUT)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        stamp_key = user_stamp_key(self.cache_namespace, request.user.pk)
+        return self.cached_response(request, stamp_key, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.gallery_lookup is None:
+            stamp_key = user_stamp_key(self.cache_namespace, request.user.pk)
+        else:
+            stamp_key = gallery_stamp_key(self.cache_namespace, kwargs[self.gallery_lookup])
+        return self.cached_response(request, stamp_key, super().retrieve, *args, **kwargs)
@@ -0,0 +1,66 @@
+"""
+This module defines the metadata filters and orderings shared by the media listing APIs.
+Every filter is a plain column lookup, so it is answered by SQL on the indexed metadata
+columns without opening any file.
+"""
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def parse_datetime_value(value):
+    """
+    parse an ISO 8601 datetime, naive values are in the current timezone
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class MetadataFilterMixin:
+    """
+    Filter and sort a media listing on its metadata columns.
+
+    * `metadata_filters` maps a query parameter to a (lookup, parser) pair, e.g. `?min_duration=300`
+    * `?ordering=` accepts the columns of `metadata_orderings`, prefixed with `-` for descending
+    * rows without a value for the ordering column are left out, NULL cannot be paged by keyset
+    """
+    metadata_filters = {}
+    metadata_orderings = ()
+    default_ordering = ('-created_at', '-id')
+    invalid_filter_message = 'Invalid value for {param}.'
+    invalid_ordering_message = 'Ordering must be one of {choices}.'
+
+    @property
+    def pagination_ordering(self):
+        """
+        ordering used by KeysetPagination, the id always breaks the ties
+        """
+        ordering = self.request.query_params.get('ordering')
+        if not ordering:
+            return self.default_ordering
+        if ordering.lstrip('-') not in self.metadata_orderings:
+            choices = ', '.join(self.metadata_orderings)
+            raise ValidationError({'ordering': [self.invalid_ordering_message.format(choices=choices)]})
+        return ordering, '-id' if ordering.startswith('-') else 'id'
+
+    def filter_metadata(self, queryset):
+        """
+        apply the metadata filters and the ordering requested in the query string
+        """
+        for param, (lookup, parser) in self.metadata_filters.items():
+            value = self.request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                value = parser(value)
+            except (TypeError, ValueError):
+                raise ValidationError({param: [self.invalid_filter_message.format(param=param)]})
+            queryset = queryset.filter(**{lookup: value})
+        column = self.pagination_ordering[0].lstrip('-')
+        if column in self.metadata_orderings:
+            queryset = queryset.filter(**{f'{column}__isnull': False})
+        return queryset
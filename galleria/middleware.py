@@ -0,0 +1,25 @@
+"""
+This module defines the middleware of the project.
+"""
+import asyncio
+from django.utils.decorators import sync_and_async_middleware
+from .routers import routing
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@sync_and_async_middleware
+def replica_read_middleware(get_response):
+    """
+    let ReplicaRouter send the reads of GET and HEAD requests to the read replicas,
+    and keep the users who wrote on the primary for a while
+    """
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            with routing(request, request.method in SAFE_METHODS):
+                return await get_response(request)
+    else:
+        def middleware(request):
+            with routing(request, request.method in SAFE_METHODS):
+                return get_response(request)
+    return middleware
@@ -0,0 +1,145 @@
+"""
+This module routes the reads of GET requests to the read replicas.
+
+`replica_read_middleware` opens a `RequestRouting` for every request. The reads of safe
+requests on the models of DATABASE_REPLICA_APPS, outside a transaction, are sent to a random
+alias of DATABASE_REPLICAS. A user who wrote in the last DATABASE_REPLICA_STICKY_SECONDS
+reads from `default`, so they see their own writes whatever the replication lag. That window
+is kept in the cache, the settings refuse replicas without a shared CACHE_BACKEND.
+Everything else, writes, transactions and management commands, uses `default`.
+"""
+import base64
+import binascii
+import json
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+def sticky_key(user_id):
+    return f'galleria:primary:{user_id}'
+
+
+def stick_to_primary(user_id):
+    """
+    send the reads of a user to default for DATABASE_REPLICA_STICKY_SECONDS
+    """
+    if settings.DATABASE_REPLICAS and user_id is not None:
+        cache.set(sticky_key(user_id), True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def token_user_id(request):
+    """
+    user id claim of the bearer token of a request, read without verifying the token.
+    It only chooses a database, the token is verified by the authentication.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(header) != 2 or header[1].count('.') != 2:
+        return None
+    payload = header[1].split('.')[1]
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    return claims.get(settings.SIMPLE_JWT['USER_ID_CLAIM']) if isinstance(claims, dict) else None
+
+
+class RequestRouting:
+    """
+    routing state of one request
+    """
+
+    def __init__(self, request, read_only):
+        self.request = request
+        self.read_only = read_only
+        self.wrote = False
+        self.sticky = None
+        self.token_user_id = token_user_id(request)
+
+    def user_id(self):
+        """
+        id of the user of the token, or of the user authenticated by the view
+        """
+        if self.token_user_id is not None:
+            return self.token_user_id
+        user = self.request.__dict__.get('user')
+        return user.pk if getattr(user, 'is_authenticated', False) else None
+
+    def is_sticky(self):
+        """
+        whether the user wrote recently, read once per request when the user is known
+        """
+        if self.sticky is None:
+            user_id = self.user_id()
+            if user_id is None:
+                return False
+            self.sticky = cache.get(sticky_key(user_id)) is not None
+        return self.sticky
+
+
+@contextmanager
+def routing(request, read_only):
+    """
+    route the queries of the block for request
+    """
+    state = RequestRouting(request, read_only)
+    token = current_routing.set(state)
+    try:
+        yield state
+    finally:
+        current_routing.reset(token)
+    if state.wrote:
+        stick_to_primary(state.user_id())
+
+
+@contextmanager
+def primary_reads():
+    """
+    send the reads of the block to default, e.g. when their result is cached
+    """
+    token = current_routing.set(None)
+    try:
+        yield
+    finally:
+        current_routing.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of safe requests to a replica
+    """
+
+    @staticmethod
+    def db_for_read(model, **hints):
+        state = current_routing.get()
+        if not settings.DATABASE_REPLICAS or state is None or not state.read_only:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label not in settings.DATABASE_REPLICA_APPS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block or state.is_sticky():
+            # reads in a transaction or after a write must see the writes
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    @staticmethod
+    def db_for_write(model, **hints):
+        state = current_routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    @staticmethod
+    def allow_relation(obj1, obj2, **hints):
+        """
+        replicas hold the same data as default
+        """
+        return True
+
+    @staticmethod
+    def allow_migrate(db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
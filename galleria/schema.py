@@ -0,0 +1,162 @@
+"""
+This module serves the swagger UI and the OpenAPI document of the api at the root path.
+
+drf_yasg is only imported on the first request instead of at URLconf load, and the generated
+document is written to SCHEMA_CACHE_DIR under the version of the code, so the workers of a
+deployment introspect the viewsets once between them instead of once per request.
+`prerender_schema` writes the documents at build time, so no worker generates them at all.
+Documents are answered with a strong ETag and cached for SCHEMA_CACHE_MAX_AGE seconds,
+their cache files are only replaced when the code version changes.
+"""
+import functools
+import hashlib
+import os
+import tempfile
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+# renderer format: (extension of the cached document, content type)
+DOCUMENT_FORMATS = {
+    'openapi': ('json', 'application/openapi+json'),
+    'json': ('json', 'application/json'),
+    'yaml': ('yaml', 'application/yaml'),
+}
+
+
+def api_info():
+    from drf_yasg import openapi
+    return openapi.Info(
+        title="Project Galleria",
+        default_version='Galleria',
+        description="This Api is created to provide gallery images and videos for the authenticated user.",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@snippets.local"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def source_directories():
+    """
+    directories of the project apps, whose sources make the code version
+    """
+    base_dir = str(settings.BASE_DIR)
+    directories = {app_config.path for app_config in apps.get_app_configs() if app_config.path.startswith(base_dir)}
+    directories.add(os.path.dirname(os.path.abspath(__file__)))
+    return sorted(directories)
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """
+    CODE_VERSION, or a digest of the python sources of the project when it is not set
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    digest = hashlib.sha256()
+    for directory in source_directories():
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, settings.BASE_DIR).encode())
+                    with open(path, 'rb') as source:
+                        digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(extension):
+    return os.path.join(settings.SCHEMA_CACHE_DIR, f'openapi-{code_version()}.{extension}')
+
+
+def render_schema(extension):
+    """
+    generate the OpenAPI document of every endpoint
+    :param extension: 'json' or 'yaml'
+    :return: the encoded document
+    """
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    schema = OpenAPISchemaGenerator(api_info()).get_schema(request=None, public=True)
+    codec = OpenAPICodecYaml if extension == 'yaml' else OpenAPICodecJson
+    return codec(validators=[]).encode(schema)
+
+
+def write_schema(extension, content):
+    """
+    write a document to its cache file, replaced atomically so a concurrent reader never sees half of it
+    """
+    path = schema_path(extension)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as target:
+            target.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return path
+
+
+@functools.lru_cache(maxsize=None)
+def schema_document(extension):
+    """
+    the document cached on disk for the current code version, generated and cached when missing
+    """
+    try:
+        with open(schema_path(extension), 'rb') as cached:
+            return cached.read()
+    except FileNotFoundError:
+        content = render_schema(extension)
+        write_schema(extension, content)
+        return content
+
+
+@functools.lru_cache(maxsize=None)
+def schema_etag(extension, content_type):
+    digest = hashlib.sha256(content_type.encode() + b'\0' + schema_document(extension))
+    return quote_etag(digest.hexdigest())
+
+
+def document_response(request, renderer_format):
+    """
+    the cached document of a renderer format, 304 when If-None-Match carries its ETag
+    """
+    extension, content_type = DOCUMENT_FORMATS[renderer_format]
+    etag = schema_etag(extension, content_type)
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(schema_document(extension), content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.SCHEMA_CACHE_MAX_AGE}'
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+@functools.lru_cache(maxsize=None)
+def swagger_view():
+    """
+    the drf_yasg swagger view, built on first use and answering documents from schema_document
+    """
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+    from rest_framework.response import Response
+
+    class CachedSchemaView(get_schema_view(api_info(), public=True, permission_classes=[permissions.AllowAny])):
+        def get(self, request, version='', format=None):
+            if request.accepted_renderer.format in DOCUMENT_FORMATS:
+                return document_response(request, request.accepted_renderer.format)
+            # the UI page only reads the title and version, its document is fetched with ?format=openapi
+            return Response(openapi.Swagger(info=api_info(), _prefix='', _version=version))
+
+    return CachedSchemaView.with_ui('swagger', cache_timeout=0)
+
+
+def swagger(request, *args, **kwargs):
+    return swagger_view()(request, *args, **kwargs)
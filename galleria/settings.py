@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 import os
 from datetime import timedelta
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'drf_yasg',
     'account',
+    'blob',
     'image',
     'video',
 ]
@@ -57,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'galleria.middleware.replica_read_middleware',
 
 ]
 
@@ -65,7 +68,7 @@ ROOT_URLCONF = 'galleria.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / 'galleria' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -83,6 +86,12 @@ WSGI_APPLICATION = 'galleria.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Connections are kept open DATABASE_CONN_MAX_AGE seconds and checked before reuse.
+# DATABASE_POOL='pgbouncer' when connecting through a transaction pooler, server side cursors are disabled.
+# DATABASE_REPLICA_HOSTS is a comma separated list of read replicas, see galleria.routers
+
+DATABASE_POOL = os.getenv('DATABASE_POOL', '')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -90,8 +99,46 @@ DATABASES = {
         'USER': os.getenv('DATABASE_USER'),
         'PASSWORD': os.getenv('DATABASE_PASS'),
         'HOST': os.getenv('DATABASE_HOST'),
+        'PORT': os.getenv('DATABASE_PORT', ''),
+        'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+        'DISABLE_SERVER_SIDE_CURSORS': DATABASE_POOL == 'pgbouncer',
+        'OPTIONS': {},
+    }
+}
+
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DATABASE_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica{index}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host.strip(), TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+# apps whose reads can be served by a replica
+DATABASE_REPLICA_APPS = ('image', 'video', 'account')
+# seconds a user who wrote reads from the primary
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', 5))
+DATABASE_ROUTERS = ['galleria.routers.ReplicaRouter']
+
+# Cache
+# Use a shared backend (redis, memcached) in production so that workers see each other's
+# username and email registrations before their membership indexes are rebuilt.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
+# whether the entries of the default cache are seen by every worker
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+if DATABASE_REPLICAS and not SHARED_CACHE:
+    # a user who wrote through one worker must read from default in every worker
+    raise ImproperlyConfigured('DATABASE_REPLICA_HOSTS requires a shared CACHE_BACKEND, '
+                               'the users reading from the primary after a write are kept in the cache')
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -135,17 +182,66 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # user model configuration
 AUTH_USER_MODEL = 'account.User'
 
+MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
-if not os.path.exists(MEDIA_ROOT):
-    os.makedirs(MEDIA_ROOT)
+
+# Image and Video files are stored once per content, see blob.storage
+DEFAULT_FILE_STORAGE = 'blob.storage.ContentAddressedStorage'
+
+# internal location prefix of MEDIA_ROOT in the front proxy, e.g. '/protected-media/'.
+# When set, media files are sent by the proxy through X-Accel-Redirect.
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
+
+# Password hashing
+# Hashes are computed in a pool of PASSWORD_HASHING_WORKERS processes per web worker.
+# Requests arriving while PASSWORD_HASHING_QUEUE_DEPTH hashes are pending are answered 429.
+PASSWORD_HASHING_OFFLOAD = os.getenv('PASSWORD_HASHING_OFFLOAD', 'true').lower() == 'true'
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASHING_QUEUE_DEPTH = int(os.getenv('PASSWORD_HASHING_QUEUE_DEPTH', PASSWORD_HASHING_WORKERS * 4))
+# PBKDF2 iterations, 0 keeps the Django default
+PASSWORD_HASHER_ITERATIONS = int(os.getenv('PASSWORD_HASHER_ITERATIONS', 0))
+
+PASSWORD_HASHERS = [
+    'account.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# bytes of media a user can store unless User.storage_quota is set, 0 means unlimited
+STORAGE_QUOTA_BYTES = int(os.getenv('STORAGE_QUOTA_BYTES', 10 * 1024 ** 3))
+
+# cache the gallery listings under their ETag, see galleria.caching. The stamps must be
+# seen by every worker, with a process local cache a worker would answer 304 or cached
+# data after another worker changed the gallery.
+GALLERY_RESPONSE_CACHE = SHARED_CACHE
+# seconds the gallery listings are cached under their ETag
+GALLERY_RESPONSE_CACHE_TIMEOUT = int(os.getenv('GALLERY_RESPONSE_CACHE_TIMEOUT', 300))
+
+# files of one multipart request, the batch image upload accepts up to 500
+DATA_UPLOAD_MAX_NUMBER_FILES = 500
+
+# processes rendering image thumbnails in each web worker
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', 2))
+
+# HLS transcoding, see `manage.py transcode_videos`
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+VIDEO_TRANSCODE_CONCURRENCY = int(os.getenv('VIDEO_TRANSCODE_CONCURRENCY', 1))
+VIDEO_TRANSCODE_THREADS = int(os.getenv('VIDEO_TRANSCODE_THREADS', 2))
+VIDEO_TRANSCODE_NICENESS = int(os.getenv('VIDEO_TRANSCODE_NICENESS', 10))
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.CachedJWTAuthentication',
     )
 
 }
 
+# how signin stores the access token in User.token: 'update', 'write_behind' or 'off'
+ACCOUNT_TOKEN_PERSISTENCE = os.getenv('ACCOUNT_TOKEN_PERSISTENCE', 'update')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -192,6 +288,13 @@ SWAGGER_SETTINGS = {
     }
 }
 
+# generated OpenAPI documents, see galleria.schema
+SCHEMA_CACHE_DIR = os.environ.get('SCHEMA_CACHE_DIR', os.path.join(BASE_DIR, '.schema'))
+# version of the deployed code (e.g. the git sha), a digest of the sources is used when empty
+CODE_VERSION = os.environ.get('CODE_VERSION', '')
+# seconds clients and proxies may reuse the OpenAPI document before revalidating its ETag
+SCHEMA_CACHE_MAX_AGE = int(os.environ.get('SCHEMA_CACHE_MAX_AGE', 86400))
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_HEADERS = (
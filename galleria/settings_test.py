@@ -0,0 +1,8 @@
+"""
+Settings of the test suite, `python manage.py test --settings=galleria.settings_test`
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+# the replica of the routing tests, a mirror of the test database
+DATABASES['replica'] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
@@ -0,0 +1,34 @@
+import json
+import shutil
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from . import schema
+
+
+class SchemaViewTest(SimpleTestCase):
+    """
+    The root path serves the swagger UI, and the OpenAPI document under a strong ETag
+    """
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(SCHEMA_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for cached in (schema.schema_document, schema.schema_etag):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def test_ui(self):
+        response = self.client.get(reverse('swagger'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Project Galleria')
+
+    def test_document_not_modified(self):
+        response = self.client.get(reverse('swagger'), {'format': 'openapi'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/openapi+json')
+        self.assertIn('/video/VideoUpload/', json.loads(response.content)['paths'])
+        response = self.client.get(reverse('swagger'), {'format': 'openapi'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
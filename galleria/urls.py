@@ -15,27 +15,15 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 from django.conf import settings
-from django.conf.urls.static import static
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Project Galleria",
-        default_version='Galleria',
-        description="This Api is created to provide gallery images and videos for the authenticated user.",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@snippets.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+from blob.views import MediaView
+from galleria.schema import swagger
 
 urlpatterns = [
                   path('admin/', admin.site.urls),
                   path('user/', include('account.urls')),
-                  path('', schema_view.with_ui('swagger', cache_timeout=0), name='swagger'),
-              ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+                  path('image/', include('image.urls')),
+                  path('video/', include('video.urls')),
+                  path(f"{settings.MEDIA_URL.lstrip('/')}<path:name>", MediaView.as_view(), name='media'),
+                  path('', swagger, name='swagger'),
+              ]
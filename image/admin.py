@@ -2,23 +2,38 @@
 This module defines two Django admin `ImageGalleryAdmin` and 'ImageAdmin' representing
 ImageGallery and Image.
 These are associated with their respective models ImageGallery and Image.
+Both tables grow without bound, so they are listed through `LargeTableAdmin`.
 """
 from django.contrib import admin
+from galleria.admin import LargeTableAdmin
 from image.models import ImageGallery, Image
 
 
 @admin.register(ImageGallery)
-class ImageGalleryAdmin(admin.ModelAdmin):
+class ImageGalleryAdmin(LargeTableAdmin):
     """
     Class ImageGalleryAdmin display all the fields of ImageGallery model in admin panel
     """
-    list_display = ('id', 'gallery_name', 'created_at', 'updated_at')
+    list_display = ('id', 'gallery_name', 'user', 'media_count', 'storage_bytes', 'created_at', 'updated_at')
+    list_select_related = ('user',)
+    list_only = ('id', 'gallery_name', 'user', 'user__username', 'media_count', 'storage_bytes',
+                 'created_at', 'updated_at')
+    search_fields = ('=id', '=user__username')
+    raw_id_fields = ('user',)
 
 
 @admin.register(Image)
-class ImageAdmin(admin.ModelAdmin):
+class ImageAdmin(LargeTableAdmin):
     """
-    Class ImageGalleryAdmin display all the fields of ImageGallery model in admin panel
+    Class ImageAdmin display all the fields of Image model in admin panel
     """
-    list_display = ('id', 'image', 'created_at', 'updated_at')
+    list_display = ('id', 'image', 'image_gallery', 'owner', 'byte_size', 'mime_type', 'created_at', 'updated_at')
+    list_select_related = ('image_gallery__user',)
+    list_only = ('id', 'image', 'byte_size', 'mime_type', 'created_at', 'updated_at', 'image_gallery',
+                 'image_gallery__gallery_name', 'image_gallery__user', 'image_gallery__user__username')
+    search_fields = ('=id', '=image')
+    raw_id_fields = ('image_gallery',)
 
+    @admin.display(description='owner')
+    def owner(self, image):
+        return image.image_gallery.user
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ImageConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'image'
+
+    def ready(self):
+        from . import signals  # noqa: F401
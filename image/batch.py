@@ -0,0 +1,77 @@
+"""
+This module stores the images of a batch upload, used by `ImageGalleryViewSet.upload`.
+
+The files are already hashed on disk by BlobUploadHandler. Every valid file is committed to
+the blob storage with a rename, then all the Image rows are inserted with one bulk_create
+and the storage counters moved with one UPDATE each, in a single transaction.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework import serializers
+from account.quota import charge, check_quota
+from galleria.caching import bump_stamps
+from .derivatives import schedule_derivatives
+from .messages import IMAGE_VALIDATION_ERROR
+from .metadata import image_metadata
+from .models import ImageGallery, Image
+
+
+def validate_files(files):
+    """
+    check that every file is an image
+    :param files: list of HashedUploadedFile
+    :return: (list of (index, file), list of {'file': index, 'name': name, 'errors': [...]})
+    """
+    field = serializers.ImageField(error_messages=IMAGE_VALIDATION_ERROR['image'])
+    valid, errors = [], []
+    for index, file in enumerate(files):
+        try:
+            field.run_validation(file)
+        except serializers.ValidationError as error:
+            errors.append({'file': index, 'name': file.name, 'errors': error.detail})
+            file.discard()
+        except DjangoValidationError as error:
+            # the file is checked by the django ImageField, which raises its own ValidationError
+            errors.append({'file': index, 'name': file.name, 'errors': error.messages})
+            file.discard()
+        else:
+            valid.append((index, file))
+    return valid, errors
+
+
+def batch_upload(gallery, files, username):
+    """
+    store the images of a batch upload in a gallery
+    :param gallery: ImageGallery of the requested user
+    :param files: list of HashedUploadedFile
+    :param username: owner of the gallery
+    :return: (list of (index, Image) created, list of errors by file index)
+    :raise QuotaExceeded: when the valid files do not fit in the quota, nothing is stored
+    """
+    valid, errors = validate_files(files)
+    try:
+        check_quota(gallery.user_id, sum(file.size for _, file in valid))
+        rows = []
+        for _, file in valid:
+            rows.append(Image(image_gallery=gallery, content_hash=file.digest, **image_metadata(file)))
+            file.close()
+
+        with transaction.atomic():
+            for row, (_, file) in zip(rows, valid):
+                row.image, _ = default_storage.commit(file.temporary_file_path(), file.digest, file.size, file.name,
+                                                      temporary=True)
+                file.committed = True
+            images = Image.objects.bulk_create(rows)
+            # bulk_create sends no post_save, count the images here
+            charge(ImageGallery, gallery.pk, sum(image.byte_size or 0 for image in images), len(images))
+            bump_stamps('image', gallery.user_id, gallery.pk)
+
+            def schedule():
+                for image in images:
+                    schedule_derivatives(image, username)
+            transaction.on_commit(schedule)
+    finally:
+        for _, file in valid:
+            file.discard()
+    return [(index, image) for (index, _), image in zip(valid, images)], errors
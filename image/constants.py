@@ -0,0 +1,26 @@
+"""
+It contains all constant values
+"""
+# sub directories of MEDIA_ROOT/<username>
+IMAGE_DIRECTORY = 'images'
+DERIVATIVE_DIRECTORY = 'derivatives'
+
+# widths of the thumbnails generated for every image, never upscaled
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+
+# file extension: (Pillow format, save options)
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# EXIF tags read for the capture time of an image
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME = 0x0132
+EXIF_DATETIME_FORMAT = '%Y:%m:%d %H:%M:%S'
+
+# files accepted by one request of the batch upload API
+BATCH_UPLOAD_MAX_FILES = 500
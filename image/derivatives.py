@@ -0,0 +1,113 @@
+"""
+This module generates the thumbnails of an Image off the request path.
+
+Derivatives are rendered in a process pool and stored under
+MEDIA_ROOT/<username>/derivatives/<hash[:2]>/<hash>/<width>.<extension>.
+They are keyed by the SHA-256 of the original so uploading identical bytes again
+finds them already rendered and costs nothing.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.files.storage import default_storage
+from .constants import DERIVATIVE_DIRECTORY, DERIVATIVE_WIDTHS, DERIVATIVE_FORMATS
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def derivative_directory(username, digest):
+    """
+    name of the directory holding the derivatives of an original, relative to MEDIA_ROOT
+    """
+    return os.path.join(username, DERIVATIVE_DIRECTORY, digest[:2], digest)
+
+
+def derivative_names(username, digest):
+    """
+    :return: {extension: {width: name relative to MEDIA_ROOT}}
+    """
+    directory = derivative_directory(username, digest)
+    return {
+        extension: {width: os.path.join(directory, f'{width}.{extension}') for width in DERIVATIVE_WIDTHS}
+        for extension in DERIVATIVE_FORMATS
+    }
+
+
+def derivative_urls(username, digest):
+    """
+    :return: {extension: {width: url}} of the derivatives of an original
+    """
+    return {
+        extension: {width: default_storage.url(name) for width, name in names.items()}
+        for extension, names in derivative_names(username, digest).items()
+    }
+
+
+def render_derivatives(source, target_directory):
+    """
+    render every missing derivative of source into target_directory.
+    Runs in a worker process, it must not touch the database.
+    :param source: path of the original image
+    :param target_directory: absolute directory of the derivatives
+    :return: number of derivatives written
+    """
+    from PIL import Image as PillowImage, ImageOps
+
+    targets = [
+        (width, extension, os.path.join(target_directory, f'{width}.{extension}'))
+        for width in DERIVATIVE_WIDTHS for extension in DERIVATIVE_FORMATS
+    ]
+    targets = [target for target in targets if not os.path.exists(target[2])]
+    if not targets:
+        return 0
+
+    os.makedirs(target_directory, exist_ok=True)
+    with PillowImage.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+        # render from the largest width down, each thumbnail is made from the previous one
+        thumbnail = original
+        for width in sorted({width for width, _, _ in targets}, reverse=True):
+            thumbnail = thumbnail.copy()
+            thumbnail.thumbnail((width, width * 10), PillowImage.LANCZOS)
+            for target_width, extension, path in targets:
+                if target_width != width:
+                    continue
+                image_format, options = DERIVATIVE_FORMATS[extension]
+                frame = thumbnail.convert('RGB') if image_format == 'JPEG' else thumbnail
+                temporary = f'{path}.{os.getpid()}.tmp'
+                frame.save(temporary, image_format, **options)
+                os.replace(temporary, path)
+    return len(targets)
+
+
+def get_executor():
+    """
+    process pool shared by the requests of this worker, created on first use
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def schedule_derivatives(image, username):
+    """
+    queue the rendering of the derivatives of an image unless they already exist
+    :param image: Image with content_hash set
+    :param username: owner of the image
+    :return: Future, or None when nothing has to be rendered
+    """
+    if not image.content_hash or not image.image:
+        return None
+    target_directory = default_storage.path(derivative_directory(username, image.content_hash))
+    names = derivative_names(username, image.content_hash)
+    if all(default_storage.exists(name) for widths in names.values() for name in widths.values()):
+        return None
+    return get_executor().submit(render_derivatives, image.image.path, target_directory)
@@ -0,0 +1,70 @@
+"""
+Management command comparing the throughput of the batch image upload with one request per image.
+"""
+import io
+import time
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from rest_framework.test import APIClient
+from account.models import User
+from image.models import ImageGallery
+
+USERNAME = 'bench@upload'
+
+
+def make_images(count, offset, size):
+    """
+    distinct JPEG files, so every upload stores a new blob
+    """
+    from PIL import Image as PillowImage
+
+    files = []
+    for index in range(offset, offset + count):
+        buffer = io.BytesIO()
+        PillowImage.new('RGB', (size, size), (index % 256, index // 256 % 256, index // 65536 % 256)).save(
+            buffer, 'JPEG')
+        files.append(SimpleUploadedFile(f'{index}.jpg', buffer.getvalue(), content_type='image/jpeg'))
+    return files
+
+
+class Command(BaseCommand):
+    """
+    Upload --files images into a gallery once with one request per image and once
+    with batch requests, and print the files per second of both paths.
+    Thumbnails are rendered by the derivative pool in the background for both.
+    """
+    help = 'Benchmark the batch image upload against one request per image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=500)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--size', type=int, default=256, help='width and height of the images')
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(f'{label:>6}: {count} files in {elapsed:.2f} s, {count / elapsed:.1f} files/s')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': 'bench@upload.local'})
+        gallery = ImageGallery.objects.create(user=user, gallery_name='bench')
+        client = APIClient()
+        client.force_authenticate(user)
+        count, batch_size = options['files'], options['batch_size']
+        try:
+            files = make_images(count, 0, options['size'])
+            started = time.perf_counter()
+            for file in files:
+                response = client.post(reverse('Image-list'), {'image_gallery': gallery.id, 'image': file},
+                                       format='multipart')
+                assert response.status_code == 201, response.content
+            self.report('single', count, time.perf_counter() - started)
+
+            files = make_images(count, count, options['size'])
+            started = time.perf_counter()
+            for offset in range(0, count, batch_size):
+                response = client.post(reverse('ImageGallery-upload', args=[gallery.id]),
+                                       {'images': files[offset:offset + batch_size]}, format='multipart')
+                assert response.status_code == 201, response.content
+            self.report('batch', count, time.perf_counter() - started)
+        finally:
+            user.delete()
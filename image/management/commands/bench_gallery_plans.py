@@ -0,0 +1,130 @@
+"""
+Management command seeding a large gallery dataset and printing the query plans of the gallery listings.
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from account.models import User
+from image.models import ImageGallery, Image
+from video.models import VideoGallery, Video
+
+PREFIX = 'bench@plans'
+INDEXES = ['imagegallery_user_created_idx', 'image_gallery_created_idx', 'image_image_notnull_idx',
+           'videogallery_user_created_idx', 'video_gallery_created_idx', 'video_video_notnull_idx']
+
+
+class Rollback(Exception):
+    """
+    raised to roll back the transaction in which the indexes are dropped
+    """
+
+
+class Command(BaseCommand):
+    """
+    Seed users, galleries and millions of images and videos, then EXPLAIN ANALYZE
+    the listing queries with the gallery indexes and, with --compare, without them.
+    The indexes are dropped inside a transaction which is rolled back.
+    """
+    help = 'Seed a large dataset and print the plans of the gallery listing queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--galleries', type=int, default=100000)
+        parser.add_argument('--media', type=int, default=2000000,
+                            help='images and videos created each')
+        parser.add_argument('--compare', action='store_true', help='also explain without the indexes')
+        parser.add_argument('--keep', action='store_true', help='keep the seeded rows')
+
+    @staticmethod
+    def bulk(model, rows, batch_size=10000):
+        for offset in range(0, len(rows), batch_size):
+            model.objects.bulk_create(rows[offset:offset + batch_size])
+
+    def seed(self, options):
+        started = time.perf_counter()
+        users = [User(username=f'{PREFIX}{index}', email=f'{index}@{PREFIX}.local', password='!')
+                 for index in range(options['users'])]
+        self.bulk(User, users)
+        users = list(User.objects.filter(username__startswith=PREFIX).values_list('id', flat=True))
+
+        for gallery_model, name_field in ((ImageGallery, 'gallery_name'), (VideoGallery, 'name')):
+            self.bulk(gallery_model, [gallery_model(**{name_field: f'g{index}', 'user_id': users[index % len(users)]})
+                                      for index in range(options['galleries'])])
+
+        image_galleries = list(ImageGallery.objects.filter(user_id__in=users).values_list('id', flat=True))
+        video_galleries = list(VideoGallery.objects.filter(user_id__in=users).values_list('id', flat=True))
+        for offset in range(0, options['media'], 50000):
+            count = min(50000, options['media'] - offset)
+            Image.objects.bulk_create(
+                [Image(image_gallery_id=image_galleries[(offset + index) % len(image_galleries)],
+                       image=f'bench/{offset + index}.jpg' if index % 10 else None)
+                 for index in range(count)], batch_size=10000)
+            Video.objects.bulk_create(
+                [Video(video_gallery_id=video_galleries[(offset + index) % len(video_galleries)],
+                       video=f'bench/{offset + index}.mp4' if index % 10 else None)
+                 for index in range(count)], batch_size=10000)
+
+        # spread the creation dates of the seeded rows, bulk_create stamps them with the same time
+        spread = "created_at = now() - mod(id, 1000003) * interval '1 second'"
+        users = 'SELECT id FROM "User" WHERE username LIKE %s'
+        with connection.cursor() as cursor:
+            for table, gallery_table, column in (('Image', 'ImageGallery', 'image_gallery_id'),
+                                                 ('Video', 'VideoGallery', 'video_gallery_id')):
+                cursor.execute(f'UPDATE "{gallery_table}" SET {spread} WHERE user_id IN ({users})', [PREFIX + '%'])
+                cursor.execute(f'UPDATE "{table}" SET {spread} WHERE {column} IN '
+                               f'(SELECT id FROM "{gallery_table}" WHERE user_id IN ({users}))', [PREFIX + '%'])
+                cursor.execute(f'ANALYZE "{gallery_table}"')
+                cursor.execute(f'ANALYZE "{table}"')
+        self.stdout.write(f'seeded in {time.perf_counter() - started:.0f} s')
+        return users[0]
+
+    def explain(self, label, user_id):
+        image_gallery = ImageGallery.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+        video_gallery = VideoGallery.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+        queries = {
+            'galleries of user': ImageGallery.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:20],
+            'images of gallery': Image.objects.filter(image_gallery_id=image_gallery).order_by('-created_at',
+                                                                                                '-id')[:20],
+            'image by name': Image.objects.filter(image='bench/12345.jpg'),
+            'video galleries of user': VideoGallery.objects.filter(user_id=user_id).order_by('-created_at',
+                                                                                              '-id')[:20],
+            'videos of gallery': Video.objects.filter(video_gallery_id=video_gallery).order_by('-created_at',
+                                                                                                '-id')[:20],
+            'video by name': Video.objects.filter(video='bench/12345.mp4'),
+        }
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_LABEL(name))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+
+    def handle(self, *args, **options):
+        user_id = self.seed(options)
+        try:
+            self.explain('with indexes', user_id)
+            if options['compare']:
+                try:
+                    with transaction.atomic():
+                        with connection.cursor() as cursor:
+                            for index in INDEXES:
+                                cursor.execute(f'DROP INDEX IF EXISTS "{index}"')
+                        self.explain('without indexes', user_id)
+                        raise Rollback
+                except Rollback:
+                    pass
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    @staticmethod
+    def cleanup():
+        """
+        delete the seeded rows with plain SQL, the ORM would load every row to cascade
+        """
+        users = 'SELECT id FROM "User" WHERE username LIKE %s'
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table, gallery_table, column in (('Image', 'ImageGallery', 'image_gallery_id'),
+                                                 ('Video', 'VideoGallery', 'video_gallery_id')):
+                cursor.execute(f'DELETE FROM "{table}" WHERE {column} IN '
+                               f'(SELECT id FROM "{gallery_table}" WHERE user_id IN ({users}))', [PREFIX + '%'])
+                cursor.execute(f'DELETE FROM "{gallery_table}" WHERE user_id IN ({users})', [PREFIX + '%'])
+            cursor.execute('DELETE FROM "User" WHERE username LIKE %s', [PREFIX + '%'])
@@ -0,0 +1,67 @@
+"""
+Management command filling the metadata columns of images and videos uploaded before they existed.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection
+from image.metadata import image_metadata
+from image.models import Image
+from video.metadata import video_metadata
+from video.models import Video
+
+
+def read_image(image):
+    if not default_storage.exists(image.image.name):
+        return image, {}
+    with default_storage.open(image.image.name, 'rb') as file:
+        return image, image_metadata(file)
+
+
+def read_video(video):
+    path = default_storage.path(video.video.name)
+    if not os.path.exists(path):
+        return video, {}
+    return video, video_metadata(path, video.video.name, os.path.getsize(path))
+
+
+class Command(BaseCommand):
+    """
+    Read the metadata of every image and video whose byte_size is still empty,
+    with the files read in a thread pool and the rows saved with bulk_update.
+    """
+    help = 'Extract the metadata of media uploaded before the metadata columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def backfill(self, model, field, read, fields, options):
+        queryset = model.objects.filter(byte_size__isnull=True, **{f'{field}__isnull': False}).exclude(**{field: ''})
+        updated = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(queryset.filter(id__gt=last_id).order_by('id').only('id', field)[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                rows = []
+                for row, metadata in executor.map(read, batch):
+                    if metadata:
+                        for name, value in metadata.items():
+                            setattr(row, name, value)
+                        rows.append(row)
+                model.objects.bulk_update(rows, fields)
+                updated += len(rows)
+        self.stdout.write(f'{model.__name__}: {updated} rows updated')
+
+    def handle(self, *args, **options):
+        try:
+            self.backfill(Image, 'image', read_image,
+                          ['width', 'height', 'byte_size', 'mime_type', 'captured_at'], options)
+            self.backfill(Video, 'video', read_video,
+                          ['width', 'height', 'byte_size', 'mime_type', 'duration', 'codec', 'captured_at'], options)
+        finally:
+            connection.close()
@@ -0,0 +1,25 @@
+IMAGE_GALLERY_VALIDATION_ERROR = {
+    'gallery_name': {
+        "blank": "gallery name can not be blank",
+        "required": "gallery name required",
+        "max_length": "gallery name can not be more than 20 characters",
+    },
+}
+
+IMAGE_VALIDATION_ERROR = {
+    'image_gallery': {
+        "required": "image gallery required",
+        "does_not_exist": "image gallery does not exist",
+        "invalid": "image gallery does not belong to user",
+    },
+    'image': {
+        "required": "image required",
+        "invalid": "upload a valid image",
+        "invalid_image": "upload a valid image",
+    },
+}
+
+BATCH_UPLOAD_VALIDATION_ERROR = {
+    "required": "images required",
+    "max_files": "too many images in one request",
+}
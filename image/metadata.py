@@ -0,0 +1,51 @@
+"""
+This module extracts the metadata of an uploaded image once, when it is uploaded.
+
+Pillow only parses the header to open an image, the pixels are never decoded,
+so dimensions, format and EXIF capture time cost a few kilobytes of reading.
+"""
+from datetime import datetime
+from django.utils import timezone
+from .constants import EXIF_DATETIME_FORMAT, EXIF_IFD, EXIF_DATETIME_ORIGINAL, EXIF_DATETIME
+
+
+def parse_exif_datetime(value):
+    """
+    EXIF datetimes have no timezone, they are taken in the current timezone
+    :return: aware datetime, or None when value is missing or malformed
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return timezone.make_aware(datetime.strptime(value.strip('\x00 '), EXIF_DATETIME_FORMAT))
+    except (ValueError, OverflowError):
+        return None
+
+
+def image_metadata(file):
+    """
+    metadata columns of an image
+    :param file: django File, left at position 0
+    :return: dict of Image fields, without the ones that could not be read
+    """
+    from PIL import Image as PillowImage, UnidentifiedImageError
+
+    metadata = {'byte_size': file.size}
+    try:
+        file.seek(0)
+        with PillowImage.open(file) as image:
+            # EXIF orientations 5 to 8 are displayed rotated by 90 degrees
+            exif = image.getexif()
+            width, height = image.size
+            if exif.get(0x0112) in (5, 6, 7, 8):
+                width, height = height, width
+            metadata.update(width=width, height=height, mime_type=PillowImage.MIME.get(image.format, ''))
+            captured_at = (parse_exif_datetime(exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL))
+                           or parse_exif_datetime(exif.get(EXIF_DATETIME)))
+            if captured_at:
+                metadata['captured_at'] = captured_at
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        pass
+    finally:
+        file.seek(0)
+    return metadata
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.7 on 2026-10-17 10:04
+
+from django.db import migrations, models
+import image.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='image',
+            name='image',
+            field=models.ImageField(null=True, upload_to=image.models.image_upload_path),
+        ),
+    ]
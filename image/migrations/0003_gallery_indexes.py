@@ -0,0 +1,29 @@
+# Generated by Django 4.1.7 on 2026-10-17 12:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently so large tables are not locked
+    atomic = False
+
+    dependencies = [
+        ('image', '0002_image_content_hash_alter_image_image'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='imagegallery',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='imagegallery_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='image',
+            index=models.Index(fields=['image_gallery', '-created_at', '-id'], name='image_gallery_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='image',
+            index=models.Index(condition=models.Q(('image__isnull', False)), fields=['image'],
+                               name='image_image_notnull_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.7 on 2026-10-17 13:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently so large tables are not locked
+    atomic = False
+
+    dependencies = [
+        ('image', '0003_gallery_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='byte_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='mime_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='captured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='image',
+            index=models.Index(fields=['image_gallery', 'captured_at', 'id'], name='image_gallery_captured_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='image',
+            index=models.Index(fields=['image_gallery', 'byte_size', 'id'], name='image_gallery_size_idx'),
+        ),
+    ]
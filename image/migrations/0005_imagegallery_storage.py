@@ -0,0 +1,23 @@
+# Generated by Django 4.1.7 on 2026-10-17 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image', '0004_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagegallery',
+            name='storage_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='imagegallery',
+            name='media_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -2,8 +2,17 @@
 This module defines Django models `ImageGallery` and 'Image' representing gallery and image .
 This model is associated with its respective database table specified in its `Meta` class.
 """
-from django.db import models
+import os
+from django.db import models, transaction
 from account.models import User
+from .constants import IMAGE_DIRECTORY
+
+
+def image_upload_path(instance, filename):
+    """
+    store originals under MEDIA_ROOT/<username>/images
+    """
+    return os.path.join(instance.image_gallery.user.username, IMAGE_DIRECTORY, filename)
 
 
 class ImageGallery(models.Model):
@@ -14,6 +23,9 @@ class ImageGallery(models.Model):
     gallery_name = models.CharField(max_length=20)
     user = models.ForeignKey(User, on_delete=models.CASCADE,
                              related_name='image_gallery_user_set')
+    # maintained by account.quota
+    storage_bytes = models.BigIntegerField(default=0)
+    media_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -26,6 +38,10 @@ class ImageGallery(models.Model):
         for ImageGallery model
         """
         db_table = 'ImageGallery'
+        indexes = [
+            # galleries of a user, newest first
+            models.Index(fields=['user', 'created_at', 'id'], name='imagegallery_user_created_idx'),
+        ]
 
 
 class Image(models.Model):
@@ -35,12 +51,27 @@ class Image(models.Model):
     """
     image_gallery = models.ForeignKey(ImageGallery, on_delete=models.CASCADE,
                                       related_name='image_gallery_set')
-    image = models.ImageField(upload_to='media/', null=True)
+    image = models.ImageField(upload_to=image_upload_path, null=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    # metadata read once at upload time, see image.metadata
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    byte_size = models.BigIntegerField(null=True, blank=True)
+    mime_type = models.CharField(max_length=100, blank=True, default='')
+    captured_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.image
+        return self.image.name or ''
+
+    def save(self, *args, **kwargs):
+        """
+        the blob reference of a new file is taken in the transaction inserting the row,
+        see blob.storage
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     class Meta:
         """
@@ -48,3 +79,12 @@ class Image(models.Model):
         for Image model
         """
         db_table = 'Image'
+        indexes = [
+            # images of a gallery, newest first
+            models.Index(fields=['image_gallery', '-created_at', '-id'], name='image_gallery_created_idx'),
+            # lookups by file name, e.g. the ownership check of MediaView
+            models.Index(fields=['image'], name='image_image_notnull_idx', condition=models.Q(image__isnull=False)),
+            # filters and orderings on the metadata within a gallery
+            models.Index(fields=['image_gallery', 'captured_at', 'id'], name='image_gallery_captured_idx'),
+            models.Index(fields=['image_gallery', 'byte_size', 'id'], name='image_gallery_size_idx'),
+        ]
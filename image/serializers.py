@@ -0,0 +1,78 @@
+"""
+This module defines serializers `ImageGallerySerializer` and 'ImageSerializer'
+for the ImageGallery and Image models.
+"""
+from rest_framework import serializers
+from account.quota import check_quota
+from .derivatives import derivative_urls
+from .messages import IMAGE_GALLERY_VALIDATION_ERROR, IMAGE_VALIDATION_ERROR
+from .models import ImageGallery, Image
+
+
+class ImageSerializer(serializers.ModelSerializer):
+    """
+    serializer for an image uploaded in a gallery of the requested user
+    """
+    image_gallery = serializers.PrimaryKeyRelatedField(queryset=ImageGallery.objects.all(),
+                                                       error_messages=IMAGE_VALIDATION_ERROR['image_gallery'])
+    image = serializers.ImageField(error_messages=IMAGE_VALIDATION_ERROR['image'])
+    thumbnails = serializers.SerializerMethodField()
+
+    def validate_image_gallery(self, value):
+        """
+        check that the gallery belongs to the requested user
+        :param value: image_gallery
+        :return: if valid return value ,else return Validation error
+        """
+        if value.user_id != self.context['request'].user.id:
+            raise serializers.ValidationError(IMAGE_VALIDATION_ERROR['image_gallery']['invalid'])
+        return value
+
+    def validate(self, attrs):
+        """
+        check that the image fits in the storage quota of the requested user
+        """
+        check_quota(self.context['request'].user.id, attrs['image'].size)
+        return attrs
+
+    def get_thumbnails(self, instance):
+        """
+        urls of the derivatives of the image by format and width.
+        Images are only listed to their owner, so the owner is the requested user.
+        :return: {extension: {width: url}}, empty until the image is hashed
+        """
+        if not instance.content_hash:
+            return {}
+        request = self.context['request']
+        return {
+            extension: {width: request.build_absolute_uri(url) for width, url in urls.items()}
+            for extension, urls in derivative_urls(request.user.username, instance.content_hash).items()
+        }
+
+    class Meta:
+        """
+        class Meta for ImageSerializer
+        """
+        model = Image
+        fields = ['id', 'image_gallery', 'image', 'thumbnails', 'width', 'height', 'byte_size', 'mime_type',
+                  'captured_at', 'created_at', 'updated_at']
+        read_only_fields = ['width', 'height', 'byte_size', 'mime_type', 'captured_at']
+
+
+class ImageGallerySerializer(serializers.ModelSerializer):
+    """
+    serializer for an image gallery with its images nested
+
+    * images are read from the prefetched `image_gallery_set`
+    """
+    gallery_name = serializers.CharField(max_length=20, required=True, allow_blank=False,
+                                         error_messages=IMAGE_GALLERY_VALIDATION_ERROR['gallery_name'])
+    images = ImageSerializer(source='image_gallery_set', many=True, read_only=True)
+
+    class Meta:
+        """
+        class Meta for ImageGallerySerializer
+        """
+        model = ImageGallery
+        fields = ['id', 'gallery_name', 'images', 'storage_bytes', 'media_count', 'created_at', 'updated_at']
+        read_only_fields = ['storage_bytes', 'media_count']
@@ -0,0 +1,67 @@
+"""
+This module defines signal receivers of the ImageGallery and Image models.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from account.models import User
+from account.quota import charge, release, release_gallery, deleted_with
+from galleria.caching import bump_stamps
+from .models import ImageGallery, Image
+
+
+@receiver(post_delete, sender=Image)
+def release_image_file(sender, instance, **kwargs):
+    """
+    release the stored file once the deletion of the image is committed
+    """
+    if instance.image:
+        storage, name = instance.image.storage, instance.image.name
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_save, sender=Image)
+def charge_image(sender, instance, created, **kwargs):
+    """
+    count a new image in the storage of its gallery and owner
+    """
+    if created:
+        charge(ImageGallery, instance.image_gallery_id, instance.byte_size or 0)
+
+
+@receiver(post_delete, sender=Image)
+def release_image(sender, instance, origin=None, **kwargs):
+    """
+    remove a deleted image from the storage of its gallery and owner,
+    images deleted with their gallery are released by release_image_gallery
+    """
+    if not deleted_with(origin, ImageGallery, User):
+        release(ImageGallery, instance.image_gallery_id, instance.byte_size or 0)
+        bump_stamps('image', instance.image_gallery.user_id, instance.image_gallery_id)
+
+
+@receiver(pre_delete, sender=ImageGallery)
+def release_image_gallery(sender, instance, origin=None, **kwargs):
+    """
+    remove the images of a deleted gallery from the storage of its owner
+    """
+    if not deleted_with(origin, User):
+        release_gallery(ImageGallery, instance.pk)
+
+
+@receiver(post_save, sender=Image)
+def bump_image_stamps(sender, instance, **kwargs):
+    """
+    invalidate the cached listings showing a saved image
+    """
+    bump_stamps('image', instance.image_gallery.user_id, instance.image_gallery_id)
+
+
+@receiver(post_save, sender=ImageGallery)
+@receiver(post_delete, sender=ImageGallery)
+def bump_image_gallery_stamps(sender, instance, origin=None, **kwargs):
+    """
+    invalidate the cached listings showing a saved or deleted gallery
+    """
+    if not deleted_with(origin, User):
+        bump_stamps('image', instance.user_id, instance.pk)
@@ -1,3 +1,244 @@
-from django.test import TestCase
+import base64
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image as PillowImage
+from rest_framework.test import APITestCase
+from account.models import User
+from blob.storage import ContentAddressedStorage
+from galleria.admin import EstimatedCountPaginator
+from .derivatives import derivative_names, schedule_derivatives
+from .models import ImageGallery, Image
 
-# Create your tests here.
+
+class ImageGalleryListTest(APITestCase):
+    """
+    Listing galleries must cost the same number of queries whatever the page size
+    """
+    def setUp(self):
+        self.url = reverse('ImageGallery-list')
+        self.user = User.objects.create_user(username='gallery@user', email='gallery@user.com',
+                                             password='Gallery@123')
+        self.client.force_authenticate(self.user)
+
+    def create_galleries(self, count, images=3):
+        for index in range(count):
+            gallery = ImageGallery.objects.create(gallery_name=f'gallery{index}', user=self.user)
+            for _ in range(images):
+                Image.objects.create(image_gallery=gallery, image='media/image.png')
+
+    def test_list_query_count_is_constant(self):
+        self.create_galleries(2)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.create_galleries(30)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'page_size': 30})
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertEqual(len(response.data['results'][0]['images']), 3)
+
+    def test_cursor_walks_every_gallery_once(self):
+        self.create_galleries(7, images=0)
+        seen = []
+        response = self.client.get(self.url, {'page_size': 3})
+        while True:
+            seen.extend(gallery['id'] for gallery in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        expected = list(ImageGallery.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_tampered_cursor_is_not_found(self):
+        self.create_galleries(1, images=0)
+        for position in (['x', 'y'], [1, 2], [None, 1], ['2026-01-01T00:00:00+00:00']):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_list_only_returns_own_galleries(self):
+        other = User.objects.create_user(username='other@user', email='other@user.com', password='Other@123')
+        ImageGallery.objects.create(gallery_name='private', user=other)
+        self.create_galleries(1, images=0)
+        response = self.client.get(self.url)
+        self.assertEqual([gallery['gallery_name'] for gallery in response.data['results']], ['gallery0'])
+
+
+@override_settings(GALLERY_RESPONSE_CACHE=True)
+class ImageGalleryConditionalGetTest(APITestCase):
+    """
+    A listing whose ETag is still current is answered 304 without a query.
+    The local memory cache is shared by the test, which runs in one process.
+    """
+    def setUp(self):
+        self.url = reverse('ImageGallery-list')
+        self.user = User.objects.create_user(username='etag@user', email='etag@user.com', password='Etag@1234')
+        self.client.force_authenticate(self.user)
+        self.gallery = ImageGallery.objects.create(gallery_name='gallery', user=self.user)
+
+    def test_not_modified_until_an_image_changes(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Image.objects.create(image_gallery=self.gallery, image='media/image.png')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['results'][0]['images']), 1)
+
+    @override_settings(GALLERY_RESPONSE_CACHE=False)
+    def test_process_local_cache_is_not_used(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ImageGalleryAdminTest(APITestCase):
+    """
+    The admin changelist pages by primary key through `?before=`
+    """
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='admin@user', email='admin@user.com',
+                                                  password='Admin@1234')
+        self.client.force_login(self.user)
+        self.galleries = [ImageGallery.objects.create(gallery_name=f'gallery{index}', user=self.user)
+                          for index in range(3)]
+
+    def test_before_lists_older_galleries(self):
+        url = reverse('admin:image_imagegallery_changelist')
+        response = self.client.get(url, {'before': self.galleries[2].pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([gallery.pk for gallery in response.context['cl'].result_list],
+                         [self.galleries[1].pk, self.galleries[0].pk])
+
+    def test_invalid_before_lists_nothing(self):
+        response = self.client.get(reverse('admin:image_imagegallery_changelist'), {'before': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_unfiltered_changelist(self):
+        response = self.client.get(reverse('admin:image_imagegallery_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 3)
+
+    def test_estimate_reads_the_table_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(ImageGallery._meta.db_table)}')
+        self.assertEqual(EstimatedCountPaginator.estimate(ImageGallery.objects.all()), 3)
+
+
+class MediaRootMixin:
+    """
+    Store the files written by a test in a temporary MEDIA_ROOT
+    """
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ImageBatchUploadTest(MediaRootMixin, APITestCase):
+    """
+    The valid images of a batch are created, every invalid file is reported by index
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='batch@user', email='batch@user.com', password='Batch@123')
+        self.client.force_authenticate(self.user)
+        self.gallery = ImageGallery.objects.create(gallery_name='gallery', user=self.user)
+
+    @staticmethod
+    def png(name):
+        content = io.BytesIO()
+        PillowImage.new('RGB', (4, 4), 'red').save(content, 'PNG')
+        return SimpleUploadedFile(name, content.getvalue(), content_type='image/png')
+
+    def test_mixed_batch_reports_invalid_files(self):
+        text = SimpleUploadedFile('notes.png', b'not an image', content_type='image/png')
+        response = self.client.post(reverse('ImageGallery-upload', args=[self.gallery.pk]),
+                                    {'images': [self.png('first.png'), text, self.png('second.png')]},
+                                    format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([(result['file'], result['name']) for result in response.data['created']],
+                         [(0, 'first.png'), (2, 'second.png')])
+        self.assertEqual(response.data['errors'],
+                         [{'file': 1, 'name': 'notes.png', 'errors': ['upload a valid image']}])
+        self.assertEqual(Image.objects.filter(image_gallery=self.gallery).count(), 2)
+
+    def test_batch_without_image_is_refused(self):
+        text = SimpleUploadedFile('notes.txt', b'not an image', content_type='text/plain')
+        response = self.client.post(reverse('ImageGallery-upload', args=[self.gallery.pk]), {'images': [text]},
+                                    format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['file'], 0)
+        self.assertFalse(Image.objects.exists())
+
+
+class ImageUploadTest(MediaRootMixin, APITestCase):
+    """
+    An uploaded image is hashed once by the storage, its content_hash is the digest of its blob
+    and keys the thumbnails rendered in the derivatives pool
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='single@user', email='single@user.com', password='Single@123')
+        self.client.force_authenticate(self.user)
+        self.gallery = ImageGallery.objects.create(gallery_name='gallery', user=self.user)
+
+    def test_content_hash_is_the_blob_digest(self):
+        file = ImageBatchUploadTest.png('photo.png')
+        expected = hashlib.sha256(file.read()).hexdigest()
+        file.seek(0)
+        response = self.client.post(reverse('Image-list'), {'image_gallery': self.gallery.pk, 'image': file},
+                                    format='multipart')
+        self.assertEqual(response.status_code, 201)
+        image = Image.objects.get(pk=response.data['id'])
+        self.assertEqual(image.content_hash, expected)
+        self.assertEqual(ContentAddressedStorage.digest(image.image.name), expected)
+        self.assertEqual((image.width, image.height), (4, 4))
+
+    def test_derivatives_are_rendered_and_listed(self):
+        content = io.BytesIO()
+        PillowImage.new('RGB', (400, 200), 'blue').save(content, 'PNG')
+        file = SimpleUploadedFile('wide.png', content.getvalue(), content_type='image/png')
+        futures = []
+
+        def schedule(image, username):
+            futures.append(schedule_derivatives(image, username))
+
+        with mock.patch('image.views.schedule_derivatives', schedule), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('Image-list'), {'image_gallery': self.gallery.pk, 'image': file},
+                                        format='multipart')
+        self.assertEqual([future.result(timeout=60) for future in futures], [6])
+        image = Image.objects.get(pk=response.data['id'])
+        self.assertIsNone(schedule_derivatives(image, self.user.username))
+
+        names = derivative_names(self.user.username, image.content_hash)
+        for width, name in names['webp'].items():
+            with PillowImage.open(default_storage.path(name)) as derivative:
+                self.assertEqual(derivative.format, 'WEBP')
+                # never upscaled, the aspect ratio is kept
+                self.assertEqual(derivative.size, (min(width, 400), min(width, 400) // 2))
+
+        thumbnails = self.client.get(reverse('Image-detail', args=[image.pk])).data['thumbnails']
+        self.assertEqual(thumbnails['webp'], {width: f'http://testserver{default_storage.url(name)}'
+                                              for width, name in names['webp'].items()})
+        response = self.client.get(thumbnails['webp'][320])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
@@ -0,0 +1,17 @@
+"""
+image URL Configuration
+"""
+
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+"""
+Routing for ImageGallery and Image
+"""
+router.register('ImageGallery', views.ImageGalleryViewSet, basename='ImageGallery')
+router.register('Image', views.ImageViewSet, basename='Image')
+urlpatterns = [
+    path('', include(router.urls)),
+]
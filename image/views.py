@@ -1,3 +1,164 @@
-from django.shortcuts import render
+"""
+views for ImageGalleryViewSet and ImageViewSet
 
-# Create your views here.
+"""
+import os
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework import status
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from blob.archive import safe_name, zip_response
+from blob.storage import ContentAddressedStorage
+from blob.uploadhandler import BlobUploadHandler
+from galleria.caching import StampedCacheMixin
+from galleria.filters import MetadataFilterMixin, parse_datetime_value
+from galleria.pagination import KeysetPagination
+from .batch import batch_upload
+from .constants import BATCH_UPLOAD_MAX_FILES
+from .derivatives import schedule_derivatives
+from .messages import BATCH_UPLOAD_VALIDATION_ERROR
+from .metadata import image_metadata
+from .models import ImageGallery, Image
+from .serializers import ImageGallerySerializer, ImageSerializer
+
+
+class ImageGalleryViewSet(StampedCacheMixin, viewsets.ModelViewSet):
+    """
+    ImageGalleryViewSet class to list, create, rename and delete
+    the image galleries of the requested user.
+
+    * images of a page of galleries are fetched with a single prefetch query
+    * list and retrieve answer If-None-Match with 304 without querying, see galleria.caching
+    * `<id>/download/` streams the images of a gallery as a ZIP archive
+    * `<id>/upload/` adds many images, sent as multipart `images` parts, in one request
+    """
+    serializer_class = ImageGallerySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespace = 'image'
+    http_method_names = ['get', 'post', 'patch', 'delete']
+
+    def get_queryset(self):
+        """
+        get queryset of ImageGallery Model for the requested user
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return ImageGallery.objects.none()
+        if self.action in ('download', 'upload'):
+            return ImageGallery.objects.filter(user=self.request.user)
+        images = Image.objects.order_by('-created_at', '-id')
+        return ImageGallery.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('image_gallery_set', queryset=images))
+
+    def perform_create(self, serializer):
+        """
+        creates a gallery owned by the requested user
+        """
+        serializer.save(user=self.request.user)
+
+    def perform_content_negotiation(self, request, force=False):
+        """
+        the archive is sent whatever the Accept header asks for
+        """
+        return super().perform_content_negotiation(request, force=force or self.action == 'download')
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        streams the images of the gallery as a ZIP archive, one chunk at a time
+        """
+        gallery = self.get_object()
+        names = list(Image.objects.filter(image_gallery=gallery, image__isnull=False).exclude(image='')
+                     .order_by('created_at', 'id').values_list('id', 'image'))
+        directory = safe_name(gallery.gallery_name, gallery.pk)
+        entries = ((f'{directory}/{image_id}{os.path.splitext(name)[1]}', default_storage.path(name))
+                   for image_id, name in names)
+        return zip_response(f'{directory}.zip', entries)
+
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser])
+    def upload(self, request, pk=None):
+        """
+        uploads the images of the multipart `images` parts into the gallery.
+        Parts are streamed into the blob storage and the rows are inserted together.
+        Invalid files are reported by index and the other files are still created.
+        """
+        gallery = self.get_object()
+        request.upload_handlers = [BlobUploadHandler(request)]
+        files = request.FILES.getlist('images')
+        if not files:
+            return Response({'images': [BATCH_UPLOAD_VALIDATION_ERROR['required']]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > BATCH_UPLOAD_MAX_FILES:
+            for file in files:
+                file.discard()
+            return Response({'images': [BATCH_UPLOAD_VALIDATION_ERROR['max_files']]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        created, errors = batch_upload(gallery, files, request.user.username)
+        context = self.get_serializer_context()
+        results = [{'file': index, 'name': files[index].name, 'image': ImageSerializer(image, context=context).data}
+                   for index, image in created]
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        return Response({'created': results, 'errors': errors}, status=response_status)
+
+
+class ImageViewSet(MetadataFilterMixin, StampedCacheMixin, viewsets.ModelViewSet):
+    """
+    ImageViewSet class to list, upload and delete images
+    in the galleries of the requested user.
+
+    * `?image_gallery=<id>` limits the listing to one gallery
+    * `?min_width=`, `?captured_after=`, `?mime_type=`... filter on the metadata columns
+    * `?ordering=-captured_at` sorts on a metadata column
+    * thumbnails are rendered in a process pool after the upload is committed
+    """
+    serializer_class = ImageSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespace = 'image'
+    gallery_lookup = None
+    http_method_names = ['get', 'post', 'delete']
+    metadata_filters = {
+        'min_width': ('width__gte', int),
+        'max_width': ('width__lte', int),
+        'min_height': ('height__gte', int),
+        'max_height': ('height__lte', int),
+        'min_size': ('byte_size__gte', int),
+        'max_size': ('byte_size__lte', int),
+        'mime_type': ('mime_type', str),
+        'captured_after': ('captured_at__gte', parse_datetime_value),
+        'captured_before': ('captured_at__lt', parse_datetime_value),
+    }
+    metadata_orderings = ('captured_at', 'byte_size')
+
+    def get_queryset(self):
+        """
+        get queryset of Image Model for the requested user
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Image.objects.none()
+        queryset = Image.objects.filter(image_gallery__user=self.request.user)
+        image_gallery = self.request.query_params.get('image_gallery')
+        if image_gallery and image_gallery.isdigit():
+            queryset = queryset.filter(image_gallery_id=image_gallery)
+        return self.filter_metadata(queryset)
+
+    def perform_create(self, serializer):
+        """
+        saves the image with the hash of its content and its metadata,
+        and renders its thumbnails once the row is committed.
+        The file is hashed once, while the storage writes it, its blob name carries the digest.
+        """
+        file = serializer.validated_data['image']
+        metadata = image_metadata(file)
+        username = self.request.user.username
+        with transaction.atomic():
+            name = default_storage.save(file.name, file)
+            # the storage counters are updated in the same transaction, see account.quota
+            image = serializer.save(image=name, content_hash=ContentAddressedStorage.digest(name) or '', **metadata)
+            transaction.on_commit(lambda: schedule_derivatives(image, username))
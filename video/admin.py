@@ -2,22 +2,51 @@
 This module defines two Django admin `VideoGalleryAdmin` and 'VideoAdmin' representing
 VideoGallery and Video.
 These are associated with their respective models ImageGallery and Image.
+The tables grow without bound, so they are listed through `LargeTableAdmin`.
 """
 from django.contrib import admin
-from video.models import VideoGallery, Video
+from galleria.admin import LargeTableAdmin
+from video.models import VideoGallery, Video, TranscodeJob
 
 
 @admin.register(VideoGallery)
-class VideoGalleryAdmin(admin.ModelAdmin):
+class VideoGalleryAdmin(LargeTableAdmin):
     """
     Class VideoGalleryAdmin display all the fields of VideoGallery model in admin panel
     """
-    list_display = ('id', 'name', 'created_at', 'updated_at')
+    list_display = ('id', 'name', 'user', 'media_count', 'storage_bytes', 'created_at', 'updated_at')
+    list_select_related = ('user',)
+    list_only = ('id', 'name', 'user', 'user__username', 'media_count', 'storage_bytes',
+                 'created_at', 'updated_at')
+    search_fields = ('=id', '=user__username')
+    raw_id_fields = ('user',)
 
 
 @admin.register(Video)
-class VideoAdmin(admin.ModelAdmin):
+class VideoAdmin(LargeTableAdmin):
     """
     Class VideoAdmin display all the fields of Video model in admin panel
     """
-    list_display = ('id', 'video', 'created_at', 'updated_at')
+    list_display = ('id', 'video', 'video_gallery', 'owner', 'byte_size', 'duration', 'created_at', 'updated_at')
+    list_select_related = ('video_gallery__user',)
+    list_only = ('id', 'video', 'byte_size', 'duration', 'created_at', 'updated_at', 'video_gallery',
+                 'video_gallery__name', 'video_gallery__user', 'video_gallery__user__username')
+    search_fields = ('=id', '=video')
+    raw_id_fields = ('video_gallery',)
+
+    @admin.display(description='owner')
+    def owner(self, video):
+        return video.video_gallery.user
+
+
+@admin.register(TranscodeJob)
+class TranscodeJobAdmin(LargeTableAdmin):
+    """
+    Class TranscodeJobAdmin display all the fields of TranscodeJob model in admin panel
+    """
+    list_display = ('id', 'video', 'status', 'attempts', 'started_at', 'finished_at', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('video',)
+    list_only = ('id', 'video', 'video__video', 'status', 'attempts', 'started_at', 'finished_at', 'created_at')
+    search_fields = ('=id', '=video__id')
+    raw_id_fields = ('video',)
@@ -0,0 +1,50 @@
+"""
+It contains all constant values
+"""
+# bytes read from the request body per write, bounds the memory used by an upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+UPLOAD_MAX_SIZE = 20 * 1024 ** 3
+
+UPLOAD_CONTENT_TYPE = 'application/offset+octet-stream'
+
+# seconds without a chunk after which `manage.py expire_uploads` aborts an upload
+UPLOAD_EXPIRE_AFTER = 7 * 24 * 60 * 60
+
+# seconds after which the claim of a request writing an upload is released, e.g. when its worker died
+UPLOAD_CLAIM_TIMEOUT = 30 * 60
+
+# sub directories of MEDIA_ROOT/<username>
+UPLOAD_DIRECTORY = 'uploads'
+VIDEO_DIRECTORY = 'videos'
+
+MAX_LENGTH = {
+    'name': 20,
+    'file_name': 100,
+}
+
+HLS_DIRECTORY = 'hls'
+
+# renditions of the HLS ladder: (height, video bitrate, audio bitrate)
+HLS_LADDER = (
+    (360, '800k', '96k'),
+    (720, '2800k', '128k'),
+    (1080, '5000k', '160k'),
+)
+
+HLS_SEGMENT_SECONDS = 6
+
+TRANSCODE_STATUS = {
+    'pending': 'pending',
+    'running': 'running',
+    'done': 'done',
+    'failed': 'failed',
+}
+
+TRANSCODE_MAX_ATTEMPTS = 3
+
+# seconds after which a running job whose worker died is claimed again
+TRANSCODE_STALE_AFTER = 6 * 60 * 60
+
+# seconds allowed to ffprobe for reading the metadata of an upload
+PROBE_TIMEOUT = 60
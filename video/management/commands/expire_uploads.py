@@ -0,0 +1,35 @@
+"""
+Management command aborting the video uploads abandoned by their clients.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from video.constants import UPLOAD_EXPIRE_AFTER
+from video.models import VideoUpload
+from video.uploads import abort_upload, unclaimed
+
+
+class Command(BaseCommand):
+    """
+    Abort the uploads that received no chunk for --max-age seconds, removing their part file
+    and giving back the quota they reserved. Uploads claimed by a PATCH in progress are skipped.
+    """
+    help = 'Abort abandoned video uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=UPLOAD_EXPIRE_AFTER,
+                            help='seconds since the last chunk')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options['max_age'])
+        expired = 0
+        expirable = VideoUpload.objects.filter(unclaimed(), updated_at__lt=cutoff)
+        for pk in expirable.values_list('pk', flat=True).iterator():
+            with transaction.atomic():
+                upload = (expirable.select_for_update(skip_locked=True, of=('self',))
+                          .select_related('user').filter(pk=pk).first())
+                if upload is not None:
+                    abort_upload(upload)
+                    expired += 1
+        self.stdout.write(f'{expired} uploads expired')
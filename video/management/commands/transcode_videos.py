@@ -0,0 +1,57 @@
+"""
+Management command running the HLS transcoding workers.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, DatabaseError
+from video.transcoding import claim_job, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Claim and run TranscodeJob rows until stopped, with --concurrency jobs at a time.
+    Run it on hosts, or with a concurrency, that leave the web workers their CPU.
+    """
+    help = 'Transcode uploaded videos into HLS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.VIDEO_TRANSCODE_CONCURRENCY,
+                            help='jobs transcoded at the same time')
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help='seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+
+    def work(self, stop, options):
+        try:
+            while not stop.is_set():
+                try:
+                    job = claim_job()
+                    if job is None:
+                        if options['once']:
+                            return
+                        stop.wait(options['poll_interval'])
+                        continue
+                    job = run_job(job)
+                    self.stdout.write(f'video {job.video_id}: {job.status} {job.error}'.rstrip())
+                except DatabaseError:
+                    # e.g. the video was deleted while it was transcoded
+                    logger.exception('transcode job failed')
+                    time.sleep(options['poll_interval'])
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            workers = [executor.submit(self.work, stop, options) for _ in range(options['concurrency'])]
+            try:
+                for worker in workers:
+                    worker.result()
+            except KeyboardInterrupt:
+                stop.set()
@@ -0,0 +1,38 @@
+VIDEO_GALLERY_VALIDATION_ERROR = {
+    'name': {
+        "blank": "gallery name can not be blank",
+        "required": "gallery name required",
+        "max_length": "gallery name can not be more than 20 characters",
+    },
+}
+
+VIDEO_UPLOAD_VALIDATION_ERROR = {
+    'video_gallery': {
+        "required": "video gallery required",
+        "does_not_exist": "video gallery does not exist",
+        "invalid": "video gallery does not belong to user",
+    },
+    'file_name': {
+        "blank": "file name can not be blank",
+        "required": "file name required",
+        "invalid": "invalid file name",
+    },
+    'size': {
+        "required": "size required",
+        "invalid": "size must be a number",
+        "min_value": "size must be greater than zero",
+        "max_value": "video is too large",
+    },
+}
+
+VIDEO_UPLOAD_ERROR = {
+    "content_type": "chunks must be sent as application/offset+octet-stream",
+    "offset": "Upload-Offset header must match the current offset of the upload",
+    "length": "chunk is larger than the remaining size of the upload",
+    "conflict": "another request is writing this upload",
+    "path": "the username can not be used in a file path",
+}
+
+TRANSCODE_ERROR = {
+    "abandoned": "worker stopped while transcoding, no attempts left",
+}
@@ -0,0 +1,65 @@
+"""
+This module extracts the metadata of an uploaded video once, when its upload completes.
+
+ffprobe only reads the container headers, the frames are not decoded, so even
+a video of several gigabytes is described in a fraction of a second.
+"""
+import json
+import mimetypes
+import subprocess
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .constants import PROBE_TIMEOUT
+
+
+def probe_metadata(path):
+    """
+    run ffprobe on a video file
+    :return: parsed ffprobe output, empty when ffprobe fails
+    """
+    try:
+        result = subprocess.run(
+            [settings.FFPROBE_BINARY, '-v', 'error',
+             '-show_entries', 'format=duration:format_tags=creation_time:stream=codec_type,codec_name,width,height',
+             '-of', 'json', path], capture_output=True, text=True, check=False, timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if result.returncode:
+        return {}
+    try:
+        return json.loads(result.stdout or '{}')
+    except ValueError:
+        return {}
+
+
+def video_metadata(path, file_name, byte_size):
+    """
+    metadata columns of a video
+    :param path: path of the video file
+    :param file_name: name given by the client, for the MIME type
+    :param byte_size: size of the file
+    :return: dict of Video fields, without the ones that could not be read
+    """
+    metadata = {'byte_size': byte_size}
+    mime_type, _ = mimetypes.guess_type(file_name)
+    if mime_type:
+        metadata['mime_type'] = mime_type
+
+    probe = probe_metadata(path)
+    stream = next((stream for stream in probe.get('streams', []) if stream.get('codec_type') == 'video'), None)
+    if stream:
+        metadata.update(width=stream.get('width'), height=stream.get('height'),
+                        codec=stream.get('codec_name', ''))
+    container = probe.get('format', {})
+    try:
+        metadata['duration'] = float(container['duration'])
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        captured_at = parse_datetime(container.get('tags', {}).get('creation_time') or '')
+    except ValueError:
+        captured_at = None
+    if captured_at:
+        metadata['captured_at'] = captured_at if timezone.is_aware(captured_at) else timezone.make_aware(captured_at)
+    return {field: value for field, value in metadata.items() if value is not None}
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.7 on 2026-10-17 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('video', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=100)),
+                ('size', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_upload_user_set', to=settings.AUTH_USER_MODEL)),
+                ('video_gallery', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_upload_set', to='video.videogallery')),
+            ],
+            options={
+                'db_table': 'VideoUpload',
+            },
+        ),
+    ]
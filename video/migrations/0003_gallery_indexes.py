@@ -0,0 +1,29 @@
+# Generated by Django 4.1.7 on 2026-10-17 12:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently so large tables are not locked
+    atomic = False
+
+    dependencies = [
+        ('video', '0002_videoupload'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='videogallery',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='videogallery_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='video',
+            index=models.Index(fields=['video_gallery', '-created_at', '-id'], name='video_gallery_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='video',
+            index=models.Index(condition=models.Q(('video__isnull', False)), fields=['video'],
+                               name='video_video_notnull_idx'),
+        ),
+    ]
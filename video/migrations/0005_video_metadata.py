@@ -0,0 +1,63 @@
+# Generated by Django 4.1.7 on 2026-10-17 13:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently so large tables are not locked
+    atomic = False
+
+    dependencies = [
+        ('video', '0004_transcodejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='byte_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='mime_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='codec',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='captured_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='video',
+            index=models.Index(fields=['video_gallery', 'duration', 'id'], name='video_gallery_duration_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='video',
+            index=models.Index(fields=['video_gallery', 'captured_at', 'id'], name='video_gallery_captured_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='video',
+            index=models.Index(fields=['video_gallery', 'byte_size', 'id'], name='video_gallery_size_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.7 on 2026-10-17 18:20
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def reserve_upload_sizes(apps, schema_editor):
+    """
+    reserve the size of the uploads already in progress
+    """
+    User = apps.get_model('account', 'User')
+    VideoUpload = apps.get_model('video', 'VideoUpload')
+    sizes = (VideoUpload.objects.filter(user=OuterRef('pk')).order_by().values('user')
+             .annotate(total=Sum('size')).values('total')[:1])
+    User.objects.filter(pk__in=VideoUpload.objects.values('user')).update(
+        reserved_bytes=Coalesce(Subquery(sizes), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_user_reserved_bytes'),
+        ('video', '0006_videogallery_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(reserve_upload_sizes, migrations.RunPython.noop),
+    ]
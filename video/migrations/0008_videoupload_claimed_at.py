@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-17 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video', '0007_reserve_upload_sizes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoupload',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,9 +1,12 @@
 """
-This module defines Django models `VideoGallery` and 'Video' representing gallery and video .
+This module defines Django models `VideoGallery`, 'Video', 'VideoUpload' and 'TranscodeJob' representing
+gallery, video, an upload in progress and the HLS transcoding of a video.
 These models are associated with their respective database tables specified in their `Meta` class.
 """
-from django.db import models
+import uuid
+from django.db import models, transaction
 from account.models import User
+from .constants import TRANSCODE_STATUS
 
 
 class VideoGallery(models.Model):
@@ -13,6 +16,9 @@ class VideoGallery(models.Model):
     """
     name = models.CharField(max_length=20)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='video_gallery_user_set')
+    # maintained by account.quota
+    storage_bytes = models.BigIntegerField(default=0)
+    media_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -25,6 +31,10 @@ class VideoGallery(models.Model):
         for ImageGallery model
         """
         db_table = 'VideoGallery'
+        indexes = [
+            # galleries of a user, newest first
+            models.Index(fields=['user', 'created_at', 'id'], name='videogallery_user_created_idx'),
+        ]
 
 
 class Video(models.Model):
@@ -34,11 +44,27 @@ class Video(models.Model):
     """
     video_gallery = models.ForeignKey(VideoGallery, on_delete=models.CASCADE, related_name='video_gallery_set')
     video = models.FileField(upload_to='media/', null=True)
+    # metadata read once when the upload completes, see video.metadata
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    byte_size = models.BigIntegerField(null=True, blank=True)
+    mime_type = models.CharField(max_length=100, blank=True, default='')
+    duration = models.FloatField(null=True, blank=True)
+    codec = models.CharField(max_length=32, blank=True, default='')
+    captured_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.video
+        return self.video.name or ''
+
+    def save(self, *args, **kwargs):
+        """
+        the blob reference of a new file is taken in the transaction inserting the row,
+        see blob.storage
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     class Meta:
         """
@@ -46,3 +72,76 @@ class Video(models.Model):
         for Video model
         """
         db_table = 'Video'
+        indexes = [
+            # videos of a gallery, newest first
+            models.Index(fields=['video_gallery', '-created_at', '-id'], name='video_gallery_created_idx'),
+            # lookups by file name, e.g. the ownership check of MediaView
+            models.Index(fields=['video'], name='video_video_notnull_idx', condition=models.Q(video__isnull=False)),
+            # filters and orderings on the metadata within a gallery
+            models.Index(fields=['video_gallery', 'duration', 'id'], name='video_gallery_duration_idx'),
+            models.Index(fields=['video_gallery', 'captured_at', 'id'], name='video_gallery_captured_idx'),
+            models.Index(fields=['video_gallery', 'byte_size', 'id'], name='video_gallery_size_idx'),
+        ]
+
+
+class VideoUpload(models.Model):
+    """
+    The VideoUpload model tracks a resumable upload of a video into a VideoGallery.
+
+    * `offset` is the number of bytes received so far
+    * `claimed_at` is set while a request writes a chunk or completes the upload, see video.uploads
+    * the Video row is created only when `offset` reaches `size`
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='video_upload_user_set')
+    video_gallery = models.ForeignKey(VideoGallery, on_delete=models.CASCADE, related_name='video_upload_set')
+    file_name = models.CharField(max_length=100)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.file_name
+
+    class Meta:
+        """
+        Use the Meta class to specify the database table
+        for VideoUpload model
+        """
+        db_table = 'VideoUpload'
+
+
+class TranscodeJob(models.Model):
+    """
+    The TranscodeJob model queues the transcoding of a Video into an HLS ladder.
+    Jobs are claimed by the transcode_videos workers with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    * `playlist` is the name of the master playlist once the job is done
+    """
+    STATUS_CHOICES = [(status, status) for status in TRANSCODE_STATUS.values()]
+
+    video = models.OneToOneField(Video, on_delete=models.CASCADE, related_name='transcode_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=TRANSCODE_STATUS['pending'])
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    playlist = models.CharField(max_length=255, blank=True, default='')
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.video_id} {self.status}'
+
+    class Meta:
+        """
+        Use the Meta class to specify the database table
+        for TranscodeJob model
+        """
+        db_table = 'TranscodeJob'
+        indexes = [
+            # oldest claimable jobs first
+            models.Index(fields=['status', 'created_at'], name='transcodejob_status_idx'),
+        ]
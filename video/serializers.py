@@ -0,0 +1,107 @@
+"""
+This module defines serializers `VideoGallerySerializer`, 'VideoSerializer' and 'VideoUploadSerializer'
+for the VideoGallery, Video and VideoUpload models.
+"""
+import os
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+from rest_framework import serializers
+from .constants import MAX_LENGTH, UPLOAD_MAX_SIZE, TRANSCODE_STATUS
+from .messages import VIDEO_GALLERY_VALIDATION_ERROR, VIDEO_UPLOAD_VALIDATION_ERROR
+from .models import VideoGallery, Video, VideoUpload
+
+
+class VideoSerializer(serializers.ModelSerializer):
+    """
+    serializer for a video of the requested user
+
+    * videos are created by completing a VideoUpload
+    * `transcode_job` must be fetched with select_related
+    """
+    transcode_status = serializers.SerializerMethodField()
+    hls = serializers.SerializerMethodField()
+
+    @staticmethod
+    def get_transcode_status(instance):
+        job = getattr(instance, 'transcode_job', None)
+        return job.status if job else None
+
+    def get_hls(self, instance):
+        """
+        url of the HLS master playlist once the video is transcoded
+        """
+        job = getattr(instance, 'transcode_job', None)
+        if not job or job.status != TRANSCODE_STATUS['done']:
+            return None
+        return self.context['request'].build_absolute_uri(default_storage.url(job.playlist))
+
+    class Meta:
+        """
+        class Meta for VideoSerializer
+        """
+        model = Video
+        fields = ['id', 'video_gallery', 'video', 'transcode_status', 'hls', 'width', 'height', 'byte_size',
+                  'mime_type', 'duration', 'codec', 'captured_at', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class VideoGallerySerializer(serializers.ModelSerializer):
+    """
+    serializer for a video gallery with its videos nested
+
+    * videos are read from the prefetched `video_gallery_set`
+    """
+    name = serializers.CharField(max_length=MAX_LENGTH['name'], required=True, allow_blank=False,
+                                 error_messages=VIDEO_GALLERY_VALIDATION_ERROR['name'])
+    videos = VideoSerializer(source='video_gallery_set', many=True, read_only=True)
+
+    class Meta:
+        """
+        class Meta for VideoGallerySerializer
+        """
+        model = VideoGallery
+        fields = ['id', 'name', 'videos', 'storage_bytes', 'media_count', 'created_at', 'updated_at']
+        read_only_fields = ['storage_bytes', 'media_count']
+
+
+class VideoUploadSerializer(serializers.ModelSerializer):
+    """
+    serializer for starting a resumable upload of a video
+    """
+    video_gallery = serializers.PrimaryKeyRelatedField(queryset=VideoGallery.objects.all(),
+                                                       error_messages=VIDEO_UPLOAD_VALIDATION_ERROR['video_gallery'])
+    file_name = serializers.CharField(max_length=MAX_LENGTH['file_name'], required=True, allow_blank=False,
+                                      error_messages=VIDEO_UPLOAD_VALIDATION_ERROR['file_name'])
+    size = serializers.IntegerField(min_value=1, max_value=UPLOAD_MAX_SIZE, required=True,
+                                    error_messages=VIDEO_UPLOAD_VALIDATION_ERROR['size'])
+
+    def validate_video_gallery(self, value):
+        """
+        check that the gallery belongs to the requested user
+        :param value: video_gallery
+        :return: if valid return value ,else return Validation error
+        """
+        if value.user_id != self.context['request'].user.id:
+            raise serializers.ValidationError(VIDEO_UPLOAD_VALIDATION_ERROR['video_gallery']['invalid'])
+        return value
+
+    @staticmethod
+    def validate_file_name(value):
+        """
+        strip directories and unsafe characters from the file name
+        :param value: file_name
+        :return: if valid return cleaned value ,else return Validation error
+        """
+        try:
+            return get_valid_filename(os.path.basename(value))
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError(VIDEO_UPLOAD_VALIDATION_ERROR['file_name']['invalid'])
+
+    class Meta:
+        """
+        class Meta for VideoUploadSerializer
+        """
+        model = VideoUpload
+        fields = ['id', 'video_gallery', 'file_name', 'size', 'offset', 'created_at', 'updated_at']
+        read_only_fields = ['offset']
@@ -0,0 +1,102 @@
+"""
+This module defines signal receivers of the VideoGallery, Video and TranscodeJob models.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from account.models import User
+from account.quota import charge, release, release_gallery, deleted_with, unreserve
+from galleria.caching import bump_stamps
+from .models import VideoGallery, Video, VideoUpload, TranscodeJob
+from .transcoding import remove_output
+
+
+@receiver(post_delete, sender=Video)
+def release_video_file(sender, instance, **kwargs):
+    """
+    release the stored file once the deletion of the video is committed
+    """
+    if instance.video:
+        storage, name = instance.video.storage, instance.video.name
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_save, sender=Video)
+def queue_transcode_job(sender, instance, created, **kwargs):
+    """
+    queue the HLS transcoding of a new video
+    """
+    if created and instance.video:
+        TranscodeJob.objects.create(video=instance)
+
+
+@receiver(post_save, sender=Video)
+def charge_video(sender, instance, created, **kwargs):
+    """
+    count a new video in the storage of its gallery and owner
+    """
+    if created:
+        charge(VideoGallery, instance.video_gallery_id, instance.byte_size or 0)
+
+
+@receiver(post_delete, sender=Video)
+def release_video(sender, instance, origin=None, **kwargs):
+    """
+    remove a deleted video from the storage of its gallery and owner,
+    videos deleted with their gallery are released by release_video_gallery
+    """
+    if not deleted_with(origin, VideoGallery, User):
+        release(VideoGallery, instance.video_gallery_id, instance.byte_size or 0)
+        bump_stamps('video', instance.video_gallery.user_id, instance.video_gallery_id)
+
+
+@receiver(pre_delete, sender=VideoGallery)
+def release_video_gallery(sender, instance, origin=None, **kwargs):
+    """
+    remove the videos of a deleted gallery from the storage of its owner
+    """
+    if not deleted_with(origin, User):
+        release_gallery(VideoGallery, instance.pk)
+
+
+@receiver(post_delete, sender=VideoUpload)
+def release_upload_reservation(sender, instance, origin=None, **kwargs):
+    """
+    give back the quota reserved by an upload once it is completed, aborted or expired
+    """
+    if not deleted_with(origin, User):
+        unreserve(instance.user_id, instance.size)
+
+
+@receiver(post_delete, sender=TranscodeJob)
+def remove_transcode_output(sender, instance, **kwargs):
+    """
+    remove the HLS files once the deletion of the job is committed
+    """
+    transaction.on_commit(lambda: remove_output(instance))
+
+
+@receiver(post_save, sender=Video)
+def bump_video_stamps(sender, instance, **kwargs):
+    """
+    invalidate the cached listings showing a saved video
+    """
+    bump_stamps('video', instance.video_gallery.user_id, instance.video_gallery_id)
+
+
+@receiver(post_save, sender=TranscodeJob)
+def bump_transcode_job_stamps(sender, instance, **kwargs):
+    """
+    invalidate the cached listings showing the transcoding status of a video
+    """
+    bump_stamps('video', instance.video.video_gallery.user_id, instance.video.video_gallery_id)
+
+
+@receiver(post_save, sender=VideoGallery)
+@receiver(post_delete, sender=VideoGallery)
+def bump_video_gallery_stamps(sender, instance, origin=None, **kwargs):
+    """
+    invalidate the cached listings showing a saved or deleted gallery
+    """
+    if not deleted_with(origin, User):
+        bump_stamps('video', instance.user_id, instance.pk)
@@ -1,3 +1,316 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from account.models import User
+from .constants import UPLOAD_CONTENT_TYPE, UPLOAD_EXPIRE_AFTER, TRANSCODE_STATUS, TRANSCODE_MAX_ATTEMPTS, \
+    TRANSCODE_STALE_AFTER, UPLOAD_CLAIM_TIMEOUT
+from .messages import TRANSCODE_ERROR
+from .metadata import video_metadata
+from .models import VideoGallery, Video, VideoUpload, TranscodeJob
+from .transcoding import claim_job, run_job
+from .uploads import part_path, write_chunk
 
-# Create your tests here.
+
+class MediaRootMixin:
+    """
+    Store the files written by a test in a temporary MEDIA_ROOT
+    """
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class VideoUploadTest(MediaRootMixin, APITestCase):
+    """
+    A video is uploaded in chunks at the offset of the upload, and created with the last chunk
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='upload@user', email='upload@user.com', password='Upload@123')
+        self.client.force_authenticate(self.user)
+        self.gallery = VideoGallery.objects.create(name='gallery', user=self.user)
+        self.content = b'0123456789'
+
+    def start(self):
+        response = self.client.post(reverse('VideoUpload-list'), {'video_gallery': self.gallery.pk,
+                                                                   'file_name': 'clip.mp4', 'size': 10})
+        self.assertEqual(response.status_code, 201)
+        return reverse('VideoUpload-detail', args=[response.data['id']])
+
+    def send(self, url, offset, chunk):
+        return self.client.patch(url, chunk, content_type=UPLOAD_CONTENT_TYPE, HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_resume_and_complete(self):
+        url = self.start()
+        response = self.send(url, 0, self.content[:4])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Upload-Offset'], '4')
+        self.assertEqual(self.client.get(url)['Upload-Offset'], '4')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.send(url, 4, self.content[4:])
+        self.assertEqual(response.status_code, 201)
+        video = Video.objects.get(pk=response.data['id'])
+        with video.video.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertEqual(video.byte_size, 10)
+        self.assertFalse(VideoUpload.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.storage_bytes, self.user.reserved_bytes), (10, 0))
+
+    def test_offset_mismatch_conflicts(self):
+        url = self.start()
+        response = self.send(url, 3, self.content[3:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertEqual(VideoUpload.objects.get().offset, 0)
+        self.assertFalse(Video.objects.exists())
+
+    def test_upload_reserves_quota_until_aborted(self):
+        User.objects.filter(pk=self.user.pk).update(storage_quota=15)
+        url = self.start()
+        self.assertEqual(User.objects.get(pk=self.user.pk).reserved_bytes, 10)
+        response = self.client.post(reverse('VideoUpload-list'), {'video_gallery': self.gallery.pk,
+                                                                   'file_name': 'other.mp4', 'size': 10})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(VideoUpload.objects.count(), 1)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(User.objects.get(pk=self.user.pk).reserved_bytes, 0)
+        self.start()
+
+    def test_username_leaving_media_root_is_refused(self):
+        user = User.objects.create_user(username='../x1', email='escape@user.com', password='Escape@123')
+        gallery = VideoGallery.objects.create(name='gallery', user=user)
+        self.client.force_authenticate(user)
+        with override_settings(MEDIA_ROOT=os.path.join(settings.MEDIA_ROOT, 'media')):
+            response = self.client.post(reverse('VideoUpload-list'), {'video_gallery': gallery.pk,
+                                                                       'file_name': 'clip.mp4', 'size': 10})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(VideoUpload.objects.filter(user=user).exists())
+        self.assertEqual(User.objects.get(pk=user.pk).reserved_bytes, 0)
+        self.assertFalse(os.path.exists(os.path.join(settings.MEDIA_ROOT, 'x1')))
+
+    def test_expired_upload_releases_reservation(self):
+        self.start()
+        VideoUpload.objects.update(updated_at=timezone.now() - timedelta(seconds=UPLOAD_EXPIRE_AFTER + 1))
+        call_command('expire_uploads', stdout=io.StringIO())
+        self.assertFalse(VideoUpload.objects.exists())
+        self.assertEqual(User.objects.get(pk=self.user.pk).reserved_bytes, 0)
+
+
+class VideoUploadLockTest(MediaRootMixin, TransactionTestCase):
+    """
+    A chunk sent while another request writes the same upload is refused without writing,
+    and no transaction is held while the chunk is streamed
+    """
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='locked@user', email='locked@user.com', password='Locked@123')
+        gallery = VideoGallery.objects.create(name='gallery', user=user)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse('VideoUpload-list'), {'video_gallery': gallery.pk,
+                                                                   'file_name': 'clip.mp4', 'size': 10})
+        self.url = reverse('VideoUpload-detail', args=[response.data['id']])
+        self.upload_id = response.data['id']
+
+    def send(self, offset, chunk):
+        return self.client.patch(self.url, chunk, content_type=UPLOAD_CONTENT_TYPE, HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_concurrent_chunk_conflicts(self):
+        VideoUpload.objects.filter(pk=self.upload_id).update(claimed_at=timezone.now())
+        response = self.send(0, b'0123')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.delete(self.url).status_code, 409)
+        upload = VideoUpload.objects.select_related('user').get(pk=self.upload_id)
+        self.assertEqual(upload.offset, 0)
+        self.assertEqual(os.path.getsize(part_path(upload)), 0)
+
+    def test_stale_claim_is_taken_over(self):
+        VideoUpload.objects.filter(pk=self.upload_id).update(
+            claimed_at=timezone.now() - timedelta(seconds=UPLOAD_CLAIM_TIMEOUT + 1))
+        response = self.send(0, b'0123')
+        self.assertEqual(response.status_code, 200)
+        upload = VideoUpload.objects.get(pk=self.upload_id)
+        self.assertEqual((upload.offset, upload.claimed_at), (4, None))
+
+    def test_chunk_is_written_outside_transaction(self):
+        in_transaction = []
+
+        def write(upload, stream, length):
+            in_transaction.append(connection.in_atomic_block)
+            return write_chunk(upload, stream, length)
+
+        with mock.patch('video.views.write_chunk', write):
+            self.assertEqual(self.send(0, b'0123').status_code, 200)
+            self.assertEqual(self.send(4, b'456789').status_code, 201)
+        self.assertEqual(in_transaction, [False, False])
+        self.assertFalse(VideoUpload.objects.exists())
+        self.assertEqual(Video.objects.get().byte_size, 10)
+
+    def test_parallel_uploads_stay_within_quota(self):
+        user = User.objects.create_user(username='quota@user', email='quota@user.com', password='Quota@123',
+                                        storage_quota=25)
+        gallery = VideoGallery.objects.create(name='gallery', user=user)
+        barrier = threading.Barrier(4)
+        statuses = []
+
+        def start():
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait(10)
+            response = client.post(reverse('VideoUpload-list'), {'video_gallery': gallery.pk,
+                                                                  'file_name': 'clip.mp4', 'size': 10})
+            statuses.append(response.status_code)
+            connection.close()
+
+        threads = [threading.Thread(target=start) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(statuses), [201, 201, 413, 413])
+        self.assertEqual(User.objects.get(pk=user.pk).reserved_bytes, 20)
+
+
+class TranscodeQueueTest(MediaRootMixin, TestCase):
+    """
+    Jobs are claimed once, retried on failure and abandoned jobs are claimed again until out of attempts
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='transcode@user', email='transcode@user.com',
+                                             password='Transcode@123')
+        gallery = VideoGallery.objects.create(name='gallery', user=self.user)
+        self.video = Video.objects.create(video_gallery=gallery, video='transcode@user/media/clip.mp4', byte_size=10)
+
+    def abandon(self, attempts):
+        started_at = timezone.now() - timedelta(seconds=TRANSCODE_STALE_AFTER + 1)
+        TranscodeJob.objects.update(status=TRANSCODE_STATUS['running'], started_at=started_at, attempts=attempts)
+
+    def test_pending_job_is_claimed_once(self):
+        job = claim_job()
+        self.assertEqual(job.video, self.video)
+        self.assertEqual((job.status, job.attempts), (TRANSCODE_STATUS['running'], 1))
+        self.assertIsNone(claim_job())
+
+    def test_abandoned_job_is_claimed_until_out_of_attempts(self):
+        self.abandon(TRANSCODE_MAX_ATTEMPTS - 1)
+        self.assertEqual(claim_job().attempts, TRANSCODE_MAX_ATTEMPTS)
+        self.abandon(TRANSCODE_MAX_ATTEMPTS)
+        self.assertIsNone(claim_job())
+        job = TranscodeJob.objects.get()
+        self.assertEqual((job.status, job.error), (TRANSCODE_STATUS['failed'], TRANSCODE_ERROR['abandoned']))
+
+    @override_settings(FFPROBE_BINARY='/nonexistent/ffprobe')
+    def test_failed_job_is_retried_then_failed(self):
+        job = run_job(claim_job())
+        self.assertEqual(job.status, TRANSCODE_STATUS['pending'])
+        self.assertTrue(job.error)
+        TranscodeJob.objects.update(attempts=TRANSCODE_MAX_ATTEMPTS - 1)
+        job = run_job(claim_job())
+        self.assertEqual((job.status, job.attempts), (TRANSCODE_STATUS['failed'], TRANSCODE_MAX_ATTEMPTS))
+        self.assertIsNone(claim_job())
+
+    def test_admin_lists_jobs(self):
+        self.client.force_login(User.objects.create_superuser(username='admin@user', email='admin@user.com',
+                                                              password='Admin@1234'))
+        response = self.client.get(reverse('admin:video_transcodejob_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.video.video.name)
+
+    def test_admin_unparsable_filters_list_nothing(self):
+        self.client.force_login(User.objects.create_superuser(username='admin@user', email='admin@user.com',
+                                                              password='Admin@1234'))
+        url = reverse('admin:video_transcodejob_changelist')
+        for params in ({'q': 'abc'}, {'before': 'abc'}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['cl'].result_count, 0)
+
+
+class VideoMetadataTest(APITestCase):
+    """
+    Listings filter and sort on the metadata columns, metadata ffprobe cannot read is left empty
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='metadata@user', email='metadata@user.com',
+                                             password='Metadata@123')
+        self.client.force_authenticate(self.user)
+        gallery = VideoGallery.objects.create(name='gallery', user=self.user)
+        self.videos = [Video.objects.create(video_gallery=gallery, duration=duration, codec=codec)
+                       for duration, codec in [(60, 'h264'), (600, 'h264'), (300, 'hevc'), (None, '')]]
+
+    def test_filter_and_order_on_metadata(self):
+        response = self.client.get(reverse('Video-list'), {'min_duration': '120', 'ordering': '-duration'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([video['id'] for video in response.data['results']], [self.videos[1].pk, self.videos[2].pk])
+        response = self.client.get(reverse('Video-list'), {'codec': 'h264', 'ordering': 'duration'})
+        self.assertEqual([video['id'] for video in response.data['results']], [self.videos[0].pk, self.videos[1].pk])
+
+    def test_invalid_filter_and_ordering(self):
+        response = self.client.get(reverse('Video-list'), {'min_duration': 'long'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('min_duration', response.data)
+        response = self.client.get(reverse('Video-list'), {'ordering': 'codec'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+
+    @override_settings(FFPROBE_BINARY='/nonexistent/ffprobe')
+    def test_unreadable_metadata_is_left_empty(self):
+        self.assertEqual(video_metadata('/nonexistent/clip.mp4', 'clip.mp4', 10),
+                         {'byte_size': 10, 'mime_type': 'video/mp4'})
+
+
+
+class VideoGalleryDownloadTest(MediaRootMixin, APITestCase):
+    """
+    A gallery is streamed as a ZIP archive of its videos, missing files are skipped
+    """
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='download@user', email='download@user.com',
+                                             password='Download@123')
+        self.client.force_authenticate(self.user)
+        self.gallery = VideoGallery.objects.create(name='holidays', user=self.user)
+
+    def add_video(self, name, content=None):
+        if content is not None:
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(content)
+        return Video.objects.create(video_gallery=self.gallery, video=name, byte_size=len(content or b''))
+
+    def test_download_streams_the_videos(self):
+        first = self.add_video('download@user/videos/first.mp4', b'first video')
+        self.add_video('download@user/videos/missing.mp4')
+        second = self.add_video('download@user/videos/second.webm', b'second video')
+        response = self.client.get(reverse('VideoGallery-download', args=[self.gallery.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), [f'holidays/{first.pk}.mp4', f'holidays/{second.pk}.webm'])
+            self.assertEqual(archive.read(f'holidays/{second.pk}.webm'), b'second video')
+
+    def test_download_of_another_user_gallery(self):
+        other = User.objects.create_user(username='other@user', email='other@user.com', password='Other@123')
+        gallery = VideoGallery.objects.create(name='private', user=other)
+        response = self.client.get(reverse('VideoGallery-download', args=[gallery.pk]))
+        self.assertEqual(response.status_code, 404)
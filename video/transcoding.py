@@ -0,0 +1,171 @@
+"""
+This module transcodes videos into an adaptive HLS ladder with ffmpeg.
+
+Jobs are TranscodeJob rows claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+of transcode_videos workers can share the queue without a broker. Each job decodes the
+original once and writes every rendition, segments and playlists to
+MEDIA_ROOT/<username>/hls/<video id>/, published with a rename when complete.
+"""
+import json
+import os
+import shutil
+import subprocess
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .constants import HLS_DIRECTORY, HLS_LADDER, HLS_SEGMENT_SECONDS, TRANSCODE_STATUS, \
+    TRANSCODE_MAX_ATTEMPTS, TRANSCODE_STALE_AFTER
+from .messages import TRANSCODE_ERROR
+from .models import TranscodeJob
+
+MASTER_PLAYLIST = 'master.m3u8'
+
+
+class TranscodeError(Exception):
+    """
+    raised when ffmpeg or ffprobe fails
+    """
+
+
+def claim_job():
+    """
+    mark the oldest pending job, or a running job abandoned by a dead worker, as running.
+    Abandoned jobs out of attempts are marked failed.
+    :return: TranscodeJob, or None when the queue is empty
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=TRANSCODE_STALE_AFTER)
+    TranscodeJob.objects.filter(status=TRANSCODE_STATUS['running'], started_at__lt=stale,
+                                attempts__gte=TRANSCODE_MAX_ATTEMPTS).update(
+        status=TRANSCODE_STATUS['failed'], error=TRANSCODE_ERROR['abandoned'], finished_at=now, updated_at=now)
+    with transaction.atomic():
+        job = (TranscodeJob.objects.select_for_update(skip_locked=True, of=('self',))
+               .select_related('video__video_gallery__user')
+               .filter(Q(status=TRANSCODE_STATUS['pending']) |
+                       Q(status=TRANSCODE_STATUS['running'], started_at__lt=stale,
+                         attempts__lt=TRANSCODE_MAX_ATTEMPTS))
+               .order_by('created_at').first())
+        if job is None:
+            return None
+        job.status = TRANSCODE_STATUS['running']
+        job.attempts += 1
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'started_at', 'updated_at'])
+    return job
+
+
+def probe(source):
+    """
+    read the height of the first video stream and whether there is an audio stream
+    :return: (height, has_audio)
+    """
+    result = subprocess.run(
+        [settings.FFPROBE_BINARY, '-v', 'error', '-show_entries', 'stream=codec_type,height',
+         '-of', 'json', source], capture_output=True, text=True, check=False)
+    if result.returncode:
+        raise TranscodeError(result.stderr.strip()[-2000:])
+    streams = json.loads(result.stdout or '{}').get('streams', [])
+    heights = [stream.get('height') for stream in streams if stream.get('codec_type') == 'video']
+    if not heights or not heights[0]:
+        raise TranscodeError('no video stream')
+    return heights[0], any(stream.get('codec_type') == 'audio' for stream in streams)
+
+
+def ladder_for(height):
+    """
+    renditions not taller than the source, at least the smallest one
+    """
+    ladder = [rendition for rendition in HLS_LADDER if rendition[0] <= height]
+    return ladder or [HLS_LADDER[0]]
+
+
+def ffmpeg_command(source, output, ladder, has_audio):
+    """
+    one ffmpeg invocation decoding the source once and encoding every rendition
+    """
+    split = f'[0:v]split={len(ladder)}' + ''.join(f'[v{index}]' for index in range(len(ladder)))
+    scales = [f'[v{index}]scale=-2:{height}[v{index}out]' for index, (height, _, _) in enumerate(ladder)]
+    command = [settings.FFMPEG_BINARY, '-nostdin', '-y', '-v', 'error', '-i', source,
+               '-threads', str(settings.VIDEO_TRANSCODE_THREADS),
+               '-filter_complex', ';'.join([split] + scales)]
+    stream_map = []
+    for index, (_, video_bitrate, audio_bitrate) in enumerate(ladder):
+        command += ['-map', f'[v{index}out]', f'-c:v:{index}', 'libx264', '-preset', 'veryfast',
+                    f'-b:v:{index}', video_bitrate, f'-maxrate:v:{index}', video_bitrate,
+                    f'-bufsize:v:{index}', video_bitrate]
+        if has_audio:
+            command += ['-map', '0:a:0', f'-c:a:{index}', 'aac', f'-b:a:{index}', audio_bitrate]
+            stream_map.append(f'v:{index},a:{index},name:{ladder[index][0]}p')
+        else:
+            stream_map.append(f'v:{index},name:{ladder[index][0]}p')
+    command += ['-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})',
+                '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+                '-hls_segment_filename', os.path.join(output, '%v', '%05d.ts'),
+                '-master_pl_name', MASTER_PLAYLIST, '-var_stream_map', ' '.join(stream_map),
+                os.path.join(output, '%v', 'index.m3u8')]
+    return command
+
+
+def lower_priority(command):
+    """
+    run a command at a lower CPU priority than the web workers, through nice(1)
+    since the workers are threads and preexec_fn is not safe in them
+    """
+    if not settings.VIDEO_TRANSCODE_NICENESS:
+        return command
+    return ['nice', '-n', str(settings.VIDEO_TRANSCODE_NICENESS)] + command
+
+
+def transcode(job):
+    """
+    transcode the video of a job into MEDIA_ROOT/<username>/hls/<video id>/
+    :return: name of the master playlist relative to MEDIA_ROOT
+    """
+    video = job.video
+    source = video.video.path
+    directory = os.path.join(video.video_gallery.user.username, HLS_DIRECTORY, str(video.id))
+    output = default_storage.path(directory)
+    working = f'{output}.{job.attempts}.tmp'
+    shutil.rmtree(working, ignore_errors=True)
+    os.makedirs(working)
+
+    height, has_audio = probe(source)
+    result = subprocess.run(lower_priority(ffmpeg_command(source, working, ladder_for(height), has_audio)),
+                            capture_output=True, text=True, check=False)
+    if result.returncode:
+        shutil.rmtree(working, ignore_errors=True)
+        raise TranscodeError(result.stderr.strip()[-2000:])
+
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(working, output)
+    return os.path.join(directory, MASTER_PLAYLIST)
+
+
+def run_job(job):
+    """
+    transcode the video of a claimed job and record the outcome.
+    A failed job is queued again until TRANSCODE_MAX_ATTEMPTS.
+    """
+    try:
+        job.playlist = transcode(job)
+    except (TranscodeError, OSError) as error:
+        job.error = str(error)
+        job.status = (TRANSCODE_STATUS['failed'] if job.attempts >= TRANSCODE_MAX_ATTEMPTS
+                      else TRANSCODE_STATUS['pending'])
+    else:
+        job.error = ''
+        job.status = TRANSCODE_STATUS['done']
+    job.finished_at = timezone.now()
+    job.save(update_fields=['playlist', 'error', 'status', 'finished_at', 'updated_at'])
+    return job
+
+
+def remove_output(job):
+    """
+    removes the HLS directory of a job
+    """
+    if job.playlist:
+        shutil.rmtree(os.path.dirname(default_storage.path(job.playlist)), ignore_errors=True)
@@ -0,0 +1,125 @@
+"""
+This module implements the resumable upload used by `VideoUploadViewSet`.
+Chunks are streamed from the request body into a part file at their offset,
+so the memory used by an upload is bounded by UPLOAD_CHUNK_SIZE whatever the size of the video.
+
+A request writing a chunk first claims the upload at its offset with a conditional UPDATE,
+then streams the body and completes the upload outside any transaction, and releases the
+claim with the new offset. No database transaction or row lock is held while the body is
+received or the video is hashed and probed, a second request is refused while the claim is held.
+"""
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils._os import safe_join
+from .constants import UPLOAD_CHUNK_SIZE, UPLOAD_DIRECTORY, VIDEO_DIRECTORY, UPLOAD_CLAIM_TIMEOUT
+from .metadata import video_metadata
+from .models import Video, VideoUpload
+
+
+def part_path(upload):
+    """
+    path of the file receiving the chunks of an upload
+    :param upload: VideoUpload
+    :return: MEDIA_ROOT/<username>/uploads/<id>.part
+    :raise SuspiciousFileOperation: when the username leads out of MEDIA_ROOT
+    """
+    return safe_join(settings.MEDIA_ROOT, upload.user.username, UPLOAD_DIRECTORY, f'{upload.id}.part')
+
+
+def start_upload(upload):
+    """
+    creates the empty part file of a new upload
+    """
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+
+
+def unclaimed():
+    """
+    filter of the uploads no request is writing
+    """
+    return Q(claimed_at__isnull=True) | Q(claimed_at__lt=timezone.now() - timedelta(seconds=UPLOAD_CLAIM_TIMEOUT))
+
+
+def claim_upload(upload):
+    """
+    claim an upload at its current offset, in one UPDATE matching only when it is not claimed
+    :return: whether the upload was claimed, on success upload.claimed_at is set
+    """
+    claimed_at = timezone.now()
+    claimed = VideoUpload.objects.filter(unclaimed(), pk=upload.pk, offset=upload.offset).update(
+        claimed_at=claimed_at)
+    if claimed:
+        upload.claimed_at = claimed_at
+    return bool(claimed)
+
+
+def release_upload(upload):
+    """
+    store the offset reached under the claim and release it
+    :return: False when the claim had timed out and was taken by another request
+    """
+    return bool(VideoUpload.objects.filter(pk=upload.pk, claimed_at=upload.claimed_at).update(
+        offset=upload.offset, claimed_at=None, updated_at=timezone.now()))
+
+
+def write_chunk(upload, stream, length):
+    """
+    copy up to `length` bytes from stream into the part file at the current offset.
+    Bytes past the offset left by an interrupted request are discarded first.
+    :param upload: VideoUpload
+    :param stream: file like object, the request body
+    :param length: number of bytes expected in the body
+    :return: number of bytes written, less than length when the client went away
+    """
+    written = 0
+    with open(part_path(upload), 'r+b') as part:
+        part.truncate(upload.offset)
+        part.seek(upload.offset)
+        while written < length:
+            try:
+                chunk = stream.read(min(UPLOAD_CHUNK_SIZE, length - written))
+            except OSError:
+                break
+            if not chunk:
+                break
+            part.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def complete_upload(upload):
+    """
+    move the assembled part file into the media storage and create the Video row
+    with the metadata of the file. The file is probed and hashed before the transaction.
+    :param upload: claimed VideoUpload with offset equal to size
+    :return: Video, or None when the claim was lost meanwhile
+    """
+    source = part_path(upload)
+    metadata = video_metadata(source, upload.file_name, upload.size)
+    digest = default_storage.hash_file(source)
+    with transaction.atomic():
+        if not VideoUpload.objects.select_for_update().filter(pk=upload.pk, claimed_at=upload.claimed_at).exists():
+            return None
+        name, _ = default_storage.commit(source, digest, upload.size,
+                                         os.path.join(upload.user.username, VIDEO_DIRECTORY, upload.file_name))
+        video = Video.objects.create(video_gallery_id=upload.video_gallery_id, video=name, **metadata)
+        upload.delete()
+    return video
+
+
+def abort_upload(upload):
+    """
+    removes the part file and the upload row
+    """
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
@@ -0,0 +1,18 @@
+"""
+video URL Configuration
+"""
+
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+"""
+Routing for VideoGallery, Video and VideoUpload
+"""
+router.register('VideoGallery', views.VideoGalleryViewSet, basename='VideoGallery')
+router.register('Video', views.VideoViewSet, basename='Video')
+router.register('VideoUpload', views.VideoUploadViewSet, basename='VideoUpload')
+urlpatterns = [
+    path('', include(router.urls)),
+]
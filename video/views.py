@@ -1,3 +1,239 @@
-from django.shortcuts import render
+"""
+views for VideoGalleryViewSet, VideoViewSet and VideoUploadViewSet
 
-# Create your views here.
+"""
+import os
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from account.quota import reserve
+from blob.archive import safe_name, zip_response
+from galleria.caching import StampedCacheMixin
+from galleria.filters import MetadataFilterMixin, parse_datetime_value
+from galleria.pagination import KeysetPagination
+from .constants import UPLOAD_CONTENT_TYPE
+from .messages import VIDEO_UPLOAD_ERROR
+from .models import VideoGallery, Video, VideoUpload
+from .serializers import VideoGallerySerializer, VideoSerializer, VideoUploadSerializer
+from .uploads import start_upload, claim_upload, release_upload, write_chunk, complete_upload, abort_upload
+
+
+class VideoGalleryViewSet(StampedCacheMixin, viewsets.ModelViewSet):
+    """
+    VideoGalleryViewSet class to list, create, rename and delete
+    the video galleries of the requested user.
+
+    * videos of a page of galleries are fetched with a single prefetch query
+    * list and retrieve answer If-None-Match with 304 without querying, see galleria.caching
+    * `<id>/download/` streams the videos of a gallery as a ZIP archive
+    """
+    serializer_class = VideoGallerySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespace = 'video'
+    http_method_names = ['get', 'post', 'patch', 'delete']
+
+    def get_queryset(self):
+        """
+        get queryset of VideoGallery Model for the requested user
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return VideoGallery.objects.none()
+        if self.action == 'download':
+            return VideoGallery.objects.filter(user=self.request.user)
+        videos = Video.objects.select_related('transcode_job').order_by('-created_at', '-id')
+        return VideoGallery.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('video_gallery_set', queryset=videos))
+
+    def perform_create(self, serializer):
+        """
+        creates a gallery owned by the requested user
+        """
+        serializer.save(user=self.request.user)
+
+    def perform_content_negotiation(self, request, force=False):
+        """
+        the archive is sent whatever the Accept header asks for
+        """
+        return super().perform_content_negotiation(request, force=force or self.action == 'download')
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        streams the videos of the gallery as a ZIP archive, one chunk at a time
+        """
+        gallery = self.get_object()
+        names = list(Video.objects.filter(video_gallery=gallery, video__isnull=False).exclude(video='')
+                     .order_by('created_at', 'id').values_list('id', 'video'))
+        directory = safe_name(gallery.name, gallery.pk)
+        entries = ((f'{directory}/{video_id}{os.path.splitext(name)[1]}', default_storage.path(name))
+                   for video_id, name in names)
+        return zip_response(f'{directory}.zip', entries)
+
+
+class VideoViewSet(MetadataFilterMixin, StampedCacheMixin, viewsets.ModelViewSet):
+    """
+    VideoViewSet class to list and delete videos in the galleries of the requested user.
+    Videos are uploaded through VideoUploadViewSet.
+
+    * `?video_gallery=<id>` limits the listing to one gallery
+    * `?min_duration=300`, `?codec=h264`, `?captured_after=`... filter on the metadata columns
+    * `?ordering=-duration` sorts on a metadata column
+    """
+    serializer_class = VideoSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespace = 'video'
+    gallery_lookup = None
+    http_method_names = ['get', 'delete']
+    metadata_filters = {
+        'min_duration': ('duration__gte', float),
+        'max_duration': ('duration__lte', float),
+        'min_width': ('width__gte', int),
+        'max_width': ('width__lte', int),
+        'min_height': ('height__gte', int),
+        'max_height': ('height__lte', int),
+        'min_size': ('byte_size__gte', int),
+        'max_size': ('byte_size__lte', int),
+        'mime_type': ('mime_type', str),
+        'codec': ('codec', str),
+        'captured_after': ('captured_at__gte', parse_datetime_value),
+        'captured_before': ('captured_at__lt', parse_datetime_value),
+    }
+    metadata_orderings = ('duration', 'captured_at', 'byte_size')
+
+    def get_queryset(self):
+        """
+        get queryset of Video Model for the requested user
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Video.objects.none()
+        queryset = Video.objects.filter(video_gallery__user=self.request.user).select_related('transcode_job')
+        video_gallery = self.request.query_params.get('video_gallery')
+        if video_gallery and video_gallery.isdigit():
+            queryset = queryset.filter(video_gallery_id=video_gallery)
+        return self.filter_metadata(queryset)
+
+
+class VideoUploadViewSet(viewsets.ModelViewSet):
+    """
+    VideoUploadViewSet class for resumable uploads of large videos.
+
+    * POST creates an upload with the video_gallery, file_name and size of the video
+    * HEAD/GET returns the current offset in the `Upload-Offset` header
+    * PATCH appends the body, sent as application/offset+octet-stream, at `Upload-Offset`
+    * the Video is created when the last byte is received
+    * the size of the video is reserved in the storage quota when the upload starts, 413 when it does not fit
+    * DELETE aborts the upload
+    """
+    serializer_class = VideoUploadSerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'head', 'post', 'patch', 'delete']
+
+    def get_queryset(self):
+        """
+        get queryset of VideoUpload Model for the requested user
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return VideoUpload.objects.none()
+        return VideoUpload.objects.filter(user=self.request.user).select_related('user')
+
+    @staticmethod
+    def upload_headers(upload):
+        return {'Upload-Offset': str(upload.offset), 'Upload-Length': str(upload.size),
+                'Cache-Control': 'no-store'}
+
+    def create(self, request, *args, **kwargs):
+        """
+        starts a new upload, reserving its size in the storage quota
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            reserve(request.user.id, serializer.validated_data['size'])
+            upload = serializer.save(user=request.user)
+            try:
+                start_upload(upload)
+            except SuspiciousFileOperation:
+                raise ValidationError({'detail': VIDEO_UPLOAD_ERROR['path']})
+        headers = self.upload_headers(upload)
+        headers['Location'] = request.build_absolute_uri(f'{upload.id}/')
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        returns the offset to resume the upload from
+        """
+        upload = self.get_object()
+        serializer = self.get_serializer(upload)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers=self.upload_headers(upload))
+
+    def partial_update(self, request, *args, **kwargs):
+        """
+        streams the request body into the upload at `Upload-Offset`.
+        The upload is claimed while the chunk is written, a concurrent PATCH
+        of the same upload is answered 409 instead of writing into the part file.
+        """
+        upload = self.get_object()
+        if request.content_type != UPLOAD_CONTENT_TYPE:
+            return Response({'detail': VIDEO_UPLOAD_ERROR['content_type']},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        if request.META.get('HTTP_UPLOAD_OFFSET') != str(upload.offset):
+            return self.conflict(upload, 'offset')
+
+        remaining = upload.size - upload.offset
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or remaining)
+        except ValueError:
+            length = remaining
+        if length > remaining:
+            return Response({'detail': VIDEO_UPLOAD_ERROR['length']}, status=status.HTTP_400_BAD_REQUEST,
+                            headers=self.upload_headers(upload))
+
+        if not claim_upload(upload):
+            upload = get_object_or_404(self.get_queryset(), pk=upload.pk)
+            return self.conflict(upload, 'conflict' if request.META['HTTP_UPLOAD_OFFSET'] == str(upload.offset)
+                                 else 'offset')
+        video = None
+        try:
+            if length:
+                upload.offset += write_chunk(upload, request.stream, length)
+            if upload.offset == upload.size:
+                video = complete_upload(upload)
+        finally:
+            released = video is not None or release_upload(upload)
+        if not released or (upload.offset == upload.size and video is None):
+            return self.conflict(upload, 'conflict')
+        if video is not None:
+            return Response(VideoSerializer(video, context=self.get_serializer_context()).data,
+                            status=status.HTTP_201_CREATED, headers=self.upload_headers(upload))
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK,
+                        headers=self.upload_headers(upload))
+
+    def conflict(self, upload, reason):
+        return Response({'detail': VIDEO_UPLOAD_ERROR[reason]}, status=status.HTTP_409_CONFLICT,
+                        headers=self.upload_headers(upload))
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        aborts the upload, 409 while a request writes it
+        """
+        upload = self.get_object()
+        if not claim_upload(upload):
+            return self.conflict(upload, 'conflict')
+        self.perform_destroy(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_destroy(self, instance):
+        """
+        aborts the upload and removes the received bytes
+        """
+        abort_upload(instance)